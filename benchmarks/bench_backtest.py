@@ -0,0 +1,68 @@
+"""Backtesting the reference strategy (a limit buy at the low of every bar) bar by bar with ``BacktestEngine`` vs
+over the whole history at once with ``run_vectorized_backtest``.
+
+Usage: python benchmarks/bench_backtest.py [vectorized_bars] [event_driven_bars]
+"""
+
+import asyncio
+import sys
+import time
+
+import numpy as np
+import polars as pl
+
+from firengine.features.async_stream.base_stream import BaseStream
+from firengine.features.sandbox.backtest.backtest_trader import BacktestEngine
+from firengine.features.sandbox.backtest.vectorized import OrderIntents, run_vectorized_backtest
+from firengine.model.data_model import OHLCV, Order
+
+
+def make_bars(n: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    return pl.DataFrame(
+        {
+            "timestamp": 60_000 * np.arange(n),
+            "open": close,
+            "high": close + rng.random(n) * 0.1,
+            "low": close - rng.random(n) * 0.1,
+            "close": close,
+            "volume": rng.random(n),
+            "trades": rng.integers(1, 50, n),
+            "symbol": "XBTUSD",
+        }
+    )
+
+
+async def event_driven(bars: pl.DataFrame):
+    order_stream = BaseStream[Order]()
+    engine = BacktestEngine(order_stream)
+    await order_stream.subscribe_async(engine.handle_order)
+    for row in bars.iter_rows():
+        ohlcv = OHLCV(*row)
+        await engine.handle_ohlcv(ohlcv)
+        await engine.match_open_order(ohlcv)
+
+
+def report(label: str, n: int, seconds: float):
+    print(f"{label:<14} {n:>12,} bars {seconds:8.3f} s {n / seconds:>14,.0f} bars/s")
+
+
+def main(*args):
+    n_vectorized = int(args[0]) if args else 5_000_000
+    n_event_driven = int(args[1]) if len(args) > 1 else 20_000
+
+    bars = make_bars(n_event_driven)
+    start = time.perf_counter()
+    asyncio.run(event_driven(bars))
+    report("event-driven", n_event_driven, time.perf_counter() - start)
+
+    bars = make_bars(n_vectorized)
+    intents = OrderIntents(side=pl.lit("buy"), amount=0.01, price=pl.col("low"))
+    start = time.perf_counter()
+    run_vectorized_backtest(bars, intents)
+    report("vectorized", n_vectorized, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,75 @@
+"""End-to-end event throughput of a stream under each event loop configuration.
+
+A synthetic stream emits batches of trades to two concurrent handlers, a batch handler and a queued subscriber, all
+run by ``EngineRunner``; every configuration runs in a fresh loop. The last line shows the cost of the per-item latency
+recording by turning it off.
+
+Usage: python benchmarks/bench_engine.py [n_events] [batch_size]
+"""
+
+import asyncio
+import sys
+import time
+
+from firengine.features.engine.runner import EngineRunner
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.model.data_model import Trade
+
+
+class SyntheticTradeStream(AbstractBaseStream[Trade]):
+    def __init__(self, n_events: int, batch_size: int):
+        super().__init__()
+        self._n_events = n_events
+        self._batch = [Trade(timestamp=i, price=100.0, amount=1.0, symbol="BTC/USD") for i in range(batch_size)]
+
+    async def _generate(self):
+        raise NotImplementedError
+
+    async def _generate_batch(self):
+        for _ in range(self._n_events // len(self._batch)):
+            yield self._batch
+            # A real feed awaits the network between batches
+            await asyncio.sleep(0)
+        self.stop()
+        yield []
+
+
+def bench(use_uvloop: bool, eager_tasks: bool, n_events: int, batch_size: int, latency: bool = True) -> float:
+    runner = EngineRunner(use_uvloop, eager_tasks)
+    stream = runner.add_stream(SyntheticTradeStream(n_events, batch_size))
+    stream.enable_latency(latency)
+    received = 0
+
+    async def handler(trade: Trade):
+        nonlocal received
+        received += 1
+
+    async def batch_handler(trades: list[Trade]):
+        pass
+
+    stream.acquired.connect(handler)
+    stream.acquired.connect(handler)
+    stream.acquired_batch.connect(batch_handler)
+    subscriber = stream.subscribe(handler)
+
+    start = time.perf_counter()
+    runner.run()
+    elapsed = time.perf_counter() - start
+    expected = n_events // batch_size * batch_size
+    assert received >= 2 * expected and subscriber.processed <= expected
+    return expected / elapsed
+
+
+def main(n_events: int = 200_000, batch_size: int = 10):
+    print(f"events={n_events:,} batch_size={batch_size}")
+    for use_uvloop in (False, True):
+        for eager_tasks in (False, True):
+            rate = bench(use_uvloop, eager_tasks, n_events, batch_size)
+            name = f"{'uvloop' if use_uvloop else 'asyncio'}{' + eager' if eager_tasks else ''}"
+            print(f"{name:<28} {rate:>14,.0f} events/s")
+    rate = bench(True, True, n_events, batch_size, latency=False)
+    print(f"{'uvloop + eager, no latency':<28} {rate:>14,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,89 @@
+"""Per-object conversion cost and memory of the data models.
+
+"legacy" is the previous layout: a plain dataclass converted through ``fields()`` on every call.
+
+Usage: python benchmarks/bench_model.py [n_objects]
+"""
+
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, fields
+
+from firengine.model.data_model import Trade
+
+
+@dataclass
+class LegacyTrade:
+    timestamp: int
+    price: float
+    amount: float
+    symbol: str | None = None
+    id: int | None = None
+    side: str | None = None
+    type: str | None = None
+    cost: float | None = None
+
+    @classmethod
+    def from_kwargs(cls, **kwargs):
+        return cls(**{f.name: kwargs.get(f.name) for f in fields(cls)})
+
+
+def ccxt_trades(n: int) -> list[dict]:
+    return [
+        {
+            "info": {},
+            "id": str(i),
+            "timestamp": 1_700_000_000_000 + i,
+            "datetime": "2023-11-14T22:13:20.000Z",
+            "symbol": "BTC/USD",
+            "order": None,
+            "type": None,
+            "side": "buy" if i % 2 else "sell",
+            "takerOrMaker": None,
+            "price": 35_000.0 + i % 100,
+            "amount": 0.01,
+            "cost": 350.0,
+            "fee": None,
+            "fees": [],
+        }
+        for i in range(n)
+    ]
+
+
+def time_per_object(func: Callable[[], list], n: int) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def bytes_per_instance(func: Callable[[], list], n: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = func()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding the objects is not part of the instance cost
+    return (after - before - sys.getsizeof(objs)) / n
+
+
+def main(n: int = 200_000):
+    dicts = ccxt_trades(n)
+    cases = {
+        "legacy from_kwargs": lambda: [LegacyTrade.from_kwargs(**d) for d in dicts],
+        "slotted from_kwargs": lambda: [Trade.from_kwargs(**d) for d in dicts],
+        "slotted from_dict": lambda: [Trade.from_dict(d) for d in dicts],
+    }
+    print(f"objects={n:,}")
+    for name, func in cases.items():
+        print(f"{name:<22} {time_per_object(func, n):>8.0f} ns/obj {bytes_per_instance(func, n):>8.0f} B/obj")
+
+    trades = cases["slotted from_dict"]()
+    encoded = [trade.to_json() for trade in trades]
+    print(f"{'orjson encode':<22} {time_per_object(lambda: [t.to_json() for t in trades], n):>8.0f} ns/obj")
+    print(f"{'orjson decode':<22} {time_per_object(lambda: [Trade.from_json(b) for b in encoded], n):>8.0f} ns/obj")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,75 @@
+"""Loading Kraken OHLCVT data: parsing the CSV files every time vs the Parquet cache.
+
+Writes synthetic 1m files (``years`` of data per symbol) to a temporary directory first.
+
+Usage: python benchmarks/bench_ohlcvt.py [n_symbols] [years]
+
+On a single-core container, 10 symbols and 2 years (10.5M rows): the CSVs parse in about 6 s and the cache loads in
+1.5-4.5 s, short of a sub-second load, since the sort of the concatenation takes most of it (the Parquet reads alone
+take 0.6-0.8 s). A one month range loads in under 0.1 s.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from firengine.features.data_storage.ohlcvt import OHLCVT_COLUMNS, OHLCVTCache, scan_ohlcvt
+
+
+def write_csv(path: Path, n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    frame = pl.DataFrame(
+        {
+            "timestamp": 1_600_000_000 + 60 * np.arange(n),
+            "open": close,
+            "high": close + 0.05,
+            "low": close - 0.05,
+            "close": close,
+            "volume": rng.random(n),
+            "trades": rng.integers(1, 50, n),
+        }
+    )
+    frame.write_csv(path, include_header=False)
+
+
+def load_csv(files: dict[str, Path]) -> pl.DataFrame:
+    """The previous loader: parse every file, then sort the concatenation."""
+    frames = [
+        pl.scan_csv(file, has_header=False, new_columns=OHLCVT_COLUMNS).with_columns(
+            (pl.col("timestamp") * 1000).cast(pl.Int64), symbol=pl.lit(symbol)
+        )
+        for symbol, file in files.items()
+    ]
+    return pl.concat(frames, how="vertical").sort("timestamp").collect()
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<24} {time.perf_counter() - start:8.3f} s  {len(result):>12,} rows")
+    return result
+
+
+def main(*args):
+    n_symbols = int(args[0]) if args else 10
+    years = float(args[1]) if len(args) > 1 else 2.0
+    n = int(years * 365 * 24 * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = {f"SYM{i}": tmp / f"SYM{i}_1.csv" for i in range(n_symbols)}
+        for i, path in enumerate(files.values()):
+            write_csv(path, n, i)
+        cache = OHLCVTCache(tmp / "cache")
+        timed("csv (previous)", lambda: load_csv(files))
+        timed("cache, first (convert)", lambda: scan_ohlcvt(files, cache=cache).collect())
+        timed("cache", lambda: scan_ohlcvt(files, cache=cache).collect())
+        timed("cache, one month", lambda: scan_ohlcvt(files, 1_600_000_000_000, 1_602_592_000_000, cache).collect())
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
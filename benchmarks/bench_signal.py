@@ -0,0 +1,48 @@
+"""Micro-benchmark of AsyncSignal dispatch modes.
+
+Usage: python benchmarks/bench_signal.py [n_events] [n_handlers]
+"""
+
+import asyncio
+import sys
+import time
+
+from firengine.lib.com.signal import AsyncSignal
+from firengine.lib.fire_enum import DispatchMode
+from firengine.model.data_model import Trade
+
+
+async def bench_mode(mode: DispatchMode, n_events: int, n_handlers: int) -> float:
+    signal = AsyncSignal[Trade](mode=mode)
+    count = 0
+
+    def sync_handler(trade: Trade):
+        nonlocal count
+        count += 1
+
+    async def async_handler(trade: Trade):
+        nonlocal count
+        count += 1
+
+    for _ in range(n_handlers):
+        signal.connect(sync_handler if mode is DispatchMode.direct else async_handler)
+
+    trade = Trade(timestamp=0, price=100.0, amount=1.0, symbol="BTC/USD")
+    start = time.perf_counter()
+    for _ in range(n_events):
+        await signal.emit(trade)
+    elapsed = time.perf_counter() - start
+    assert count == n_events * n_handlers
+    return n_events / elapsed
+
+
+async def main(n_events: int = 200_000, n_handlers: int = 2):
+    print(f"events={n_events:,} handlers={n_handlers}")
+    for mode in DispatchMode:
+        rate = await bench_mode(mode, n_events, n_handlers)
+        print(f"{mode:<12} {rate:>14,.0f} events/s")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*args))
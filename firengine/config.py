@@ -5,11 +5,11 @@ from pathlib import Path
 HOME_DIR = Path.home()
 ENGINE_DATA_DIR = HOME_DIR / "firengine_data"
 KRAKEN_OHLCVT_DATA_DIR = ENGINE_DATA_DIR / "Kraken_OHLCVT"
+OHLCVT_CACHE_DIR = ENGINE_DATA_DIR / "ohlcvt_cache"
 LOG_DIR = ENGINE_DATA_DIR / "log"
-
-for dir_ in (ENGINE_DATA_DIR, LOG_DIR):
-    if not os.path.exists(dir_):
-        os.makedirs(dir_, exist_ok=True)
+MARKETS_CACHE_DIR = ENGINE_DATA_DIR / "markets"
+JOURNAL_DIR = ENGINE_DATA_DIR / "journal"
+STORE_DIR = ENGINE_DATA_DIR / "store"
 
 # Old stuff
 CRYPTO_DATA_DIR = HOME_DIR / "crypto-data"
@@ -19,6 +19,12 @@ KRAKEN_TRADES_DATA_DIR = CRYPTO_DATA_DIR / "Kraken_Trading_History"
 SECONDS_PER_YEAR = 31_536_000
 
 
+def ensure_data_dirs():
+    """Create the engine's data and log directories; called by entry points, not at import."""
+    for dir_ in (ENGINE_DATA_DIR, LOG_DIR):
+        os.makedirs(dir_, exist_ok=True)
+
+
 @dataclass
 class Config:
     supported_exchanges = []
@@ -9,26 +9,19 @@ from expression import pipe
 from expression.system import AsyncDisposable
 
 from firengine.features.async_stream.base_stream import BaseStream
+from firengine.features.data_storage import ohlcvt
 from firengine.lib.common_type import StrPath
 from firengine.model.data_model import OHLCV
 
 if TYPE_CHECKING:
     from aioreactive import CloseAsync, SendAsync, ThrowAsync
 
-OHLCVT_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume", "trades")
-
 
 def load_dataframe_from_ohlcvt_csvfiles(
     csvfiles_per_symbol: dict[str, StrPath], start_ms: int | None = None, end_ms: int | None = None
 ):
-    ohlcvts = [
-        pl.scan_csv(file, has_header=False, new_columns=OHLCVT_COLUMNS)
-        .with_columns((pl.col("timestamp") * 1000).cast(pl.Int64), symbol=pl.lit(symbol))
-        .filter(pl.col("timestamp").is_between(start_ms, end_ms))
-        for symbol, file in csvfiles_per_symbol.items()
-    ]
-    ohlcvt = pl.concat(ohlcvts, how="vertical")
-    return ohlcvt.sort("timestamp").with_columns(price=pl.lit(None), amount=pl.lit(None)).collect()
+    df = ohlcvt.load_dataframe_from_ohlcvt_csvfiles(csvfiles_per_symbol, start_ms, end_ms)
+    return df.with_columns(price=pl.lit(None), amount=pl.lit(None))
 
 
 async def generate_ohlcvt_from_df(ohlcvt_df: pl.DataFrame) -> AsyncGenerator[OHLCV]:
@@ -0,0 +1,310 @@
+import asyncio
+import math
+from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator, Callable, Sequence
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from firengine.features.bars.time_bars import BarAccumulator
+from firengine.features.stream.base_stream import BaseExchangeStream
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import OHLCV
+
+if TYPE_CHECKING:
+    from ccxt.pro import Exchange
+
+    from firengine.features.stream.trade_stream import TradeStream
+
+
+def _running_sum(values: np.ndarray, total: float) -> np.ndarray:
+    """``total + values[0]``, ``total + values[0] + values[1]``, ...: a sequential fold, which ``np.cumsum`` is."""
+    cumulative = values.copy()
+    if len(cumulative):
+        cumulative[0] += total
+    return np.cumsum(cumulative, out=cumulative)
+
+
+def _fold(values: np.ndarray, total: float) -> float:
+    """``total + values[0] + values[1] + ...``, summed in that order."""
+    return float(_running_sum(values, total)[-1]) if len(values) else total
+
+
+def _first_reaching(
+    values: np.ndarray, start: int, total: float, threshold: float, size: int = 64
+) -> tuple[int | None, float]:
+    """First index ``>= start`` where ``|total + values[start] + ... + values[index]| >= threshold``, with that sum, or
+    ``None`` with the sum of all the values from ``start``.
+
+    The values are summed in order over chunks of doubling size, from ``size``, so a sum carried over from the previous
+    batch goes on exactly as if the batches had come at once.
+    """
+    n = len(values)
+    while start < n:
+        stop = min(start + size, n)
+        cumulative = _running_sum(values[start:stop], total)
+        reached = np.abs(cumulative) >= threshold
+        if reached[hit := int(reached.argmax())]:
+            return start + hit, float(cumulative[hit])
+        start, size, total = stop, size * 2, float(cumulative[-1])
+    return None, total
+
+
+class BarBuilder(ABC):
+    """Aggregates the trades of one symbol into bars whose boundaries depend on the trades themselves.
+
+    ``process`` takes time ordered batches of any size: per-trade work is done with NumPy, Python only loops over the
+    bars. The partial bar and the sampling state are carried over between batches, so the same trades give the same
+    bars whether they arrive live in small batches or are read at once from a historical file.
+    """
+
+    label: str
+
+    def __init__(self, symbol: str):
+        self._symbol = symbol
+        self._partial: BarAccumulator | None = None
+
+    @property
+    def symbol(self) -> str:
+        return self._symbol
+
+    def partial(self) -> OHLCV | None:
+        """The bar being built, not closed yet."""
+        if self._partial is None:
+            return None
+        return replace(self._partial.to_ohlcv(self._symbol, self.label), closed=False)
+
+    @abstractmethod
+    def _bar_ends(self, batch: TradeBatch) -> list[int]:
+        """Indices of the trades closing a bar, ascending; updates the sampling state."""
+        raise NotImplementedError
+
+    def process(self, batch: TradeBatch) -> list[OHLCV]:
+        n = len(batch)
+        if not n:
+            return []
+        ends = self._bar_ends(batch)
+        starts = np.array([0, *(end + 1 for end in ends if end + 1 < n)])
+        stops = np.append(starts[1:], n)
+        prices = batch.prices
+        opens = prices[starts].tolist()
+        closes = prices[stops - 1].tolist()
+        highs = np.maximum.reduceat(prices, starts).tolist()
+        lows = np.minimum.reduceat(prices, starts).tolist()
+        amounts = batch.amounts
+        first_ts = batch.timestamps[starts].tolist()
+        counts = (stops - starts).tolist()
+
+        bars = []
+        for i in range(len(opens)):
+            if self._partial is None:
+                self._partial = BarAccumulator(first_ts[i], 0)
+            # Summed on from the volume so far rather than added as a subtotal, which would round with the batching
+            volume = _fold(amounts[starts[i] : stops[i]], self._partial.volume)
+            self._partial.merge(opens[i], highs[i], lows[i], closes[i], 0.0, counts[i])
+            self._partial.volume = volume
+            if i < len(ends):
+                bars.append(self._partial.to_ohlcv(self._symbol, self.label))
+                self._partial = None
+        return bars
+
+
+class ThresholdBarBuilder(BarBuilder):
+    """Closes a bar on the trade where the measure accumulated since the bar opened reaches ``threshold``."""
+
+    def __init__(self, symbol: str, threshold: float):
+        super().__init__(symbol)
+        if threshold <= 0:
+            raise ValueError("threshold must be positive")
+        self._threshold = threshold
+        self._accumulated = 0.0
+        # Trades scanned at once for the next close: twice the length of the last bar
+        self._chunk = 64
+
+    @abstractmethod
+    def _measure(self, batch: TradeBatch) -> np.ndarray:
+        raise NotImplementedError
+
+    def _bar_ends(self, batch: TradeBatch) -> list[int]:
+        measures = self._measure(batch)
+        ends, start = [], 0
+        while True:
+            # Summed from the open of the bar, not as differences of a running total, which round with the batching
+            end, self._accumulated = _first_reaching(measures, start, self._accumulated, self._threshold, self._chunk)
+            if end is None:
+                return ends
+            ends.append(end)
+            self._chunk = max(2 * (end - start + 1), 64)
+            start, self._accumulated = end + 1, 0.0
+
+
+class TickBarBuilder(ThresholdBarBuilder):
+    def __init__(self, symbol: str, threshold: int):
+        super().__init__(symbol, threshold)
+        self.label = f"tick:{threshold}"
+
+    def _measure(self, batch: TradeBatch) -> np.ndarray:
+        return np.ones(len(batch))
+
+
+class VolumeBarBuilder(ThresholdBarBuilder):
+    def __init__(self, symbol: str, threshold: float):
+        super().__init__(symbol, threshold)
+        self.label = f"volume:{threshold:g}"
+
+    def _measure(self, batch: TradeBatch) -> np.ndarray:
+        return batch.amounts
+
+
+class DollarBarBuilder(ThresholdBarBuilder):
+    def __init__(self, symbol: str, threshold: float):
+        super().__init__(symbol, threshold)
+        self.label = f"dollar:{threshold:g}"
+
+    def _measure(self, batch: TradeBatch) -> np.ndarray:
+        return batch.costs
+
+
+class ImbalanceBarBuilder(BarBuilder):
+    """Tick (or volume) imbalance bars.
+
+    Each trade is signed by its taker side, falling back to the tick rule when the side is unknown. A bar closes once
+    ``|sum(sign * weight)|`` exceeds ``E[ticks per bar] * |E[sign * weight]|``, both expectations being EWMAs over
+    the closed bars. While there is no non-zero imbalance estimate (for the first bar, or after perfectly balanced
+    ones), bars are ``expected_ticks`` trades long.
+    """
+
+    def __init__(self, symbol: str, expected_ticks: float, alpha: float = 0.1, volume_weighted: bool = False):
+        super().__init__(symbol)
+        self.label = f"{'vib' if volume_weighted else 'tib'}:{expected_ticks:g}"
+        self._expected_ticks = float(expected_ticks)
+        self._expected_imbalance: float | None = None
+        self._alpha = alpha
+        self._volume_weighted = volume_weighted
+        self._imbalance = 0.0
+        self._ticks = 0
+        self._last_price: float | None = None
+        self._last_sign = 0
+
+    def _signs(self, batch: TradeBatch) -> np.ndarray:
+        prices = batch.prices
+        previous = np.empty_like(prices)
+        previous[0] = prices[0] if self._last_price is None else self._last_price
+        previous[1:] = prices[:-1]
+        signs = np.where(batch.sides != 0, batch.sides, np.sign(prices - previous)).astype(np.float64)
+        # Unchanged prices keep the previous sign (tick rule)
+        n = len(signs)
+        filled = np.maximum.accumulate(np.where(signs != 0, np.arange(n), -1))
+        signs = np.where(filled >= 0, signs[np.maximum(filled, 0)], self._last_sign)
+        self._last_price = float(prices[-1])
+        self._last_sign = int(signs[-1])
+        return signs
+
+    def _bar_ends(self, batch: TradeBatch) -> list[int]:
+        signed = self._signs(batch)
+        if self._volume_weighted:
+            signed = signed * batch.amounts
+        n = len(signed)
+        ends, start = [], 0
+        while start < n:
+            if self._expected_imbalance is None:
+                length = max(math.ceil(self._expected_ticks) - self._ticks, 1)
+                stop = min(start + length, n)
+                end = stop - 1 if stop - start == length else None
+                imbalance = _fold(signed[start:stop], self._imbalance)
+            else:
+                threshold = self._expected_ticks * abs(self._expected_imbalance)
+                end, imbalance = _first_reaching(signed, start, self._imbalance, threshold)
+            if end is None:
+                self._imbalance = imbalance
+                self._ticks += n - start
+                break
+            ticks = self._ticks + end - start + 1
+            alpha = self._alpha
+            self._expected_ticks += alpha * (ticks - self._expected_ticks)
+            if self._expected_imbalance is None:
+                expected_imbalance = imbalance / ticks
+            else:
+                expected_imbalance = self._expected_imbalance + alpha * (imbalance / ticks - self._expected_imbalance)
+            # A zero estimate would close a bar on every trade
+            self._expected_imbalance = expected_imbalance or None
+            ends.append(end)
+            start, self._imbalance, self._ticks = end + 1, 0.0, 0
+        return ends
+
+
+def build_bars(batch: TradeBatch, builder_factory: Callable[[str], BarBuilder]) -> dict[str, list[OHLCV]]:
+    """Closed bars of every symbol of a historical batch, as the live stream would emit them."""
+    return {symbol: builder_factory(symbol).process(trades) for symbol, trades in batch.split_by_symbol().items()}
+
+
+def read_kraken_trades(path: str | Path, symbol: str) -> TradeBatch:
+    """Trades of a Kraken trading history CSV (``timestamp`` in seconds, ``price``, ``volume``, no header)."""
+    import polars as pl
+
+    df = pl.read_csv(path, has_header=False, new_columns=["timestamp", "price", "volume"])
+    n = df.height
+    return TradeBatch(
+        timestamps=(df["timestamp"].cast(pl.Float64) * 1000).cast(pl.Int64).to_numpy(),
+        prices=df["price"].cast(pl.Float64).to_numpy(),
+        amounts=df["volume"].cast(pl.Float64).to_numpy(),
+        sides=np.zeros(n, np.int8),
+        symbol_ids=np.zeros(n, np.int32),
+        symbols=(symbol,),
+    )
+
+
+class InformationBarStream(BaseExchangeStream[OHLCV]):
+    """Bars from a ``TradeStream`` built by one ``BarBuilder`` per symbol, e.g. ``lambda s: VolumeBarBuilder(s, 10)``.
+
+    Several builders can run side by side by passing a sequence of factories.
+    """
+
+    event_time_from_item = False
+
+    def __init__(
+        self,
+        exchange: "Exchange",
+        trade_stream: "TradeStream",
+        builder_factory: Callable[[str], BarBuilder] | Sequence[Callable[[str], BarBuilder]],
+    ):
+        super().__init__(exchange)
+        self._factories = [builder_factory] if callable(builder_factory) else list(builder_factory)
+        self._builders: dict[str, list[BarBuilder]] = {}
+        self._closed: asyncio.Queue[list[OHLCV]] = asyncio.Queue()
+        self._trade_stream = trade_stream
+        trade_stream.acquired_trade_batch.connect(self.put_trade_batch)
+
+    def add_symbol(self, symbol: str):
+        super().add_symbol(symbol)
+        self._builders[symbol] = [factory(symbol) for factory in self._factories]
+
+    def remove_symbol(self, symbol: str):
+        super().remove_symbol(symbol)
+        self._builders.pop(symbol, None)
+
+    def builders(self, symbol: str) -> list[BarBuilder]:
+        return self._builders[symbol]
+
+    async def put_trade_batch(self, batch: TradeBatch):
+        closed = []
+        for symbol, trades in batch.split_by_symbol().items():
+            for builder in self._builders.get(symbol, ()):
+                closed += builder.process(trades)
+        if closed:
+            self._closed.put_nowait(closed)
+
+    async def _generate(self) -> AsyncGenerator[OHLCV, None, None]:
+        async for ohlcvs in self._generate_batch():
+            for ohlcv in ohlcvs:
+                yield ohlcv
+
+    async def _generate_batch(self) -> AsyncGenerator[list[OHLCV], None, None]:
+        while True:
+            try:
+                # Time out once a second so that ``stop`` is noticed without new trades
+                yield await asyncio.wait_for(self._closed.get(), 1.0)
+            except TimeoutError:
+                yield []
@@ -0,0 +1,188 @@
+import heapq
+from collections.abc import Sequence
+
+import numpy as np
+
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import OHLCV
+from firengine.utils.timeutil import parse_timeframe_to_ms
+
+
+class BarAccumulator:
+    """OHLCV of one ``[open_ms, close_ms)`` interval being built."""
+
+    __slots__ = ("open_ms", "close_ms", "open", "high", "low", "close", "volume", "trades")
+
+    def __init__(self, open_ms: int, interval_ms: int):
+        self.open_ms = open_ms
+        self.close_ms = open_ms + interval_ms
+        self.open: float | None = None
+        self.high = float("-inf")
+        self.low = float("inf")
+        self.close: float | None = None
+        self.volume = 0.0
+        self.trades = 0
+
+    def merge(self, open_: float, high: float, low: float, close: float, volume: float, trades: int):
+        if self.open is None:
+            self.open = open_
+        if high > self.high:
+            self.high = high
+        if low < self.low:
+            self.low = low
+        self.close = close
+        self.volume += volume
+        self.trades += trades
+
+    def to_ohlcv(self, symbol: str, timeframe: str) -> OHLCV:
+        return OHLCV(
+            timestamp=self.open_ms,
+            open=self.open,
+            high=self.high,
+            low=self.low,
+            close=self.close,
+            volume=self.volume,
+            trades=self.trades,
+            symbol=symbol,
+            timeframe=timeframe,
+            closed=True,
+        )
+
+
+class MultiTimeframeBarScheduler:
+    """Time bars of several timeframes per symbol, closed on exact epoch-aligned boundaries.
+
+    Only the smallest timeframe is built from trades; every larger one is rolled up from closed bars of the next
+    smaller timeframe (e.g. 1s -> 1m -> 1h), so each timeframe must be a multiple of the smallest one. Bars close in
+    event time when a trade of a later interval arrives, or in wall-clock time through ``advance``, which pops a
+    single timer heap shared by all symbols. ``lateness_ms`` delays timer closes to leave room for late trades;
+    trades older than the last closed boundary are folded into the current bar. Intervals without trades emit no bar.
+    """
+
+    def __init__(self, timeframes: Sequence[str], lateness_ms: int = 0):
+        if not timeframes:
+            raise ValueError("at least one timeframe is required")
+        pairs = sorted({(parse_timeframe_to_ms(tf), tf) for tf in timeframes})
+        self._intervals = [interval for interval, _ in pairs]
+        self._timeframes = [tf for _, tf in pairs]
+        for interval, tf in pairs:
+            if interval % self._intervals[0]:
+                raise ValueError(f"timeframe {tf} is not a multiple of {self._timeframes[0]}")
+        self._lateness_ms = lateness_ms
+        self._bars: dict[str, list[BarAccumulator | None]] = {}
+        self._watermarks: dict[str, int] = {}
+        self._heap: list[tuple[int, str, int]] = []
+
+    @property
+    def timeframes(self) -> list[str]:
+        return self._timeframes
+
+    def add_symbol(self, symbol: str):
+        self._bars.setdefault(symbol, [None] * len(self._intervals))
+
+    def remove_symbol(self, symbol: str):
+        self._bars.pop(symbol, None)
+        self._watermarks.pop(symbol, None)
+
+    def on_trade(self, symbol: str, timestamp: int, price: float, amount: float) -> list[OHLCV]:
+        closed: list[OHLCV] = []
+        if symbol in self._bars:
+            self._add(symbol, timestamp, price, price, price, price, amount, 1, closed)
+        return closed
+
+    def on_trade_batch(self, batch: TradeBatch) -> list[OHLCV]:
+        """Aggregate a batch per base interval with NumPy reductions, then merge one segment per interval."""
+        closed: list[OHLCV] = []
+        base = self._intervals[0]
+        for symbol, trades in batch.split_by_symbol().items():
+            if symbol not in self._bars or not len(trades):
+                continue
+            timestamps, prices, amounts = trades.timestamps, trades.prices, trades.amounts
+            buckets = timestamps - timestamps % base
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+            ends = np.append(starts[1:], len(buckets))
+            highs = np.maximum.reduceat(prices, starts).tolist()
+            lows = np.minimum.reduceat(prices, starts).tolist()
+            volumes = np.add.reduceat(amounts, starts).tolist()
+            opens = prices[starts].tolist()
+            closes = prices[ends - 1].tolist()
+            counts = (ends - starts).tolist()
+            first_ts = timestamps[starts].tolist()
+            for i in range(len(first_ts)):
+                self._add(symbol, first_ts[i], opens[i], highs[i], lows[i], closes[i], volumes[i], counts[i], closed)
+        return closed
+
+    def next_deadline(self) -> int | None:
+        """Wall-clock time (ms) at which ``advance`` has a bar to close, ``None`` if no bar is open."""
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] + self._lateness_ms if heap else None
+
+    def advance(self, now_ms: int) -> list[OHLCV]:
+        closed: list[OHLCV] = []
+        heap = self._heap
+        while heap and heap[0][0] + self._lateness_ms <= now_ms:
+            entry = heapq.heappop(heap)
+            if self._is_live(entry):
+                self._close_due(entry[1], entry[0], closed)
+        return closed
+
+    def _is_live(self, entry: tuple[int, str, int]) -> bool:
+        close_ms, symbol, level = entry
+        bars = self._bars.get(symbol)
+        return bars is not None and (bar := bars[level]) is not None and bar.close_ms == close_ms
+
+    def _open(self, symbol: str, level: int, open_ms: int) -> BarAccumulator:
+        bar = self._bars[symbol][level] = BarAccumulator(open_ms, self._intervals[level])
+        heapq.heappush(self._heap, (bar.close_ms, symbol, level))
+        return bar
+
+    def _add(
+        self,
+        symbol: str,
+        timestamp: int,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        trades: int,
+        closed: list[OHLCV],
+    ):
+        bars = self._bars[symbol]
+        if (bar := bars[0]) is not None and timestamp >= bar.close_ms:
+            self._close_due(symbol, timestamp, closed)
+            bar = bars[0]
+        if bar is None:
+            open_ms = max(timestamp - timestamp % self._intervals[0], self._watermarks.get(symbol, 0))
+            bar = self._open(symbol, 0, open_ms)
+        bar.merge(open_, high, low, close, volume, trades)
+
+    def _close_due(self, symbol: str, now_ms: int, closed: list[OHLCV]):
+        bars = self._bars[symbol]
+        for level in range(len(bars)):
+            if (bar := bars[level]) is not None and bar.close_ms <= now_ms:
+                self._close_level(symbol, level, closed)
+
+    def _close_level(self, symbol: str, level: int, closed: list[OHLCV]):
+        bars = self._bars[symbol]
+        bar = bars[level]
+        bars[level] = None
+        if level == 0:
+            self._watermarks[symbol] = bar.close_ms
+        closed.append(bar.to_ohlcv(symbol, self._timeframes[level]))
+        if level + 1 < len(bars):
+            self._roll_up(symbol, level + 1, bar, closed)
+
+    def _roll_up(self, symbol: str, level: int, child: BarAccumulator, closed: list[OHLCV]):
+        open_ms = child.open_ms - child.open_ms % self._intervals[level]
+        parent = self._bars[symbol][level]
+        if parent is not None and parent.open_ms != open_ms:
+            self._close_level(symbol, level, closed)
+            parent = None
+        if parent is None:
+            parent = self._open(symbol, level, open_ms)
+        parent.merge(child.open, child.high, child.low, child.close, child.volume, child.trades)
+        if child.close_ms >= parent.close_ms:
+            self._close_level(symbol, level, closed)
@@ -0,0 +1,250 @@
+import logging
+import struct
+from collections.abc import AsyncGenerator, Iterable
+
+import numpy as np
+import orjson
+import zmq
+import zmq.asyncio
+
+from firengine.features.order_book.l2_book import L2OrderBook
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.features.stream.record_codec import RecordCodec, default_codec
+from firengine.lib.fire_enum import MarketDataKind
+from firengine.model.data_model import Order, OrderBookDelta
+
+logger = logging.getLogger(__name__)
+
+WIRE_VERSION = 1
+# version, per-topic sequence number, number of items
+HEADER = struct.Struct("<BQI")
+
+
+def topic(kind: MarketDataKind, exchange: str, symbol: str) -> bytes:
+    """``kind.exchange.symbol`` ended by a NUL byte.
+
+    Subscriptions are prefix matches: the terminator keeps ``BTC/USD`` from receiving ``BTC/USDT``, while
+    ``trade.kraken.`` still matches every symbol.
+    """
+    return f"{kind}.{exchange}.{symbol}\0".encode()
+
+
+class ZmqBusPublisher:
+    """Republishes streams of this process on a ZeroMQ PUB socket, one topic per kind, exchange and symbol.
+
+    Each stream batch becomes one message per symbol: ``[topic, header, payload]``, where the payload is the raw bytes
+    of the kind's fixed-width records (JSON for orders) and the header carries a sequence number per topic, so
+    subscribers can detect dropped messages. Sending never blocks: a subscriber whose queue is full misses the message
+    (ZeroMQ drops it for that subscriber only), which it sees as a gap in the topic's sequence numbers.
+    """
+
+    def __init__(self, endpoint: str, exchange: str, context: zmq.Context | None = None, sndhwm: int = 100_000):
+        # A plain (non-asyncio) socket on the same underlying context: PUB sends never wait, so there is no need for a
+        # future per message; inproc endpoints are still shared with asyncio sockets of the context
+        context = context or zmq.asyncio.Context.instance()
+        self._context = zmq.Context.shadow(context.underlying)
+        self._socket = self._context.socket(zmq.PUB)
+        self._socket.setsockopt(zmq.SNDHWM, sndhwm)
+        self._socket.setsockopt(zmq.LINGER, 0)
+        self._socket.bind(endpoint)
+        self._exchange = exchange
+        self._seqs: dict[bytes, int] = {}
+        self._symbols: list[str] = []
+        self._symbol_ids: dict[str, int] = {}
+        self._dropped = 0
+
+    @property
+    def endpoint(self) -> str:
+        return self._socket.getsockopt_string(zmq.LAST_ENDPOINT)
+
+    @property
+    def dropped(self) -> int:
+        """Items ZeroMQ refused to send at all; those a slow subscriber misses are only seen by it, as gaps."""
+        return self._dropped
+
+    def _symbol_id(self, symbol: str) -> int:
+        if (symbol_id := self._symbol_ids.get(symbol)) is None:
+            symbol_id = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return symbol_id
+
+    def _next_seq(self, topic_: bytes) -> int:
+        seq = self._seqs.get(topic_, 0)
+        self._seqs[topic_] = seq + 1
+        return seq
+
+    def attach(self, stream: AbstractBaseStream, kind: MarketDataKind, codec: RecordCodec | None = None):
+        """Publish everything ``stream`` acquires as ``kind``."""
+        if kind == MarketDataKind.order:
+
+            async def publish_orders(orders: list):
+                by_symbol: dict[str, list] = {}
+                for order in orders:
+                    by_symbol.setdefault(order.symbol, []).append(order)
+                for symbol, items in by_symbol.items():
+                    self.send(kind, symbol, orjson.dumps(items), len(items))
+
+            stream.acquired_batch.connect(publish_orders)
+            return
+        codec = codec or default_codec(kind)
+        codec.bind(stream, lambda records: self.publish_records(kind, records), self._symbol_id)
+
+    def publish_records(self, kind: MarketDataKind, records: np.ndarray):
+        if not len(records):
+            return
+        symbol_ids = records["symbol_id"]
+        if (symbol_ids == symbol_ids[0]).all():
+            self.send(kind, self._symbols[symbol_ids[0]], records.tobytes(), len(records))
+            return
+        # Stable grouping keeps the order within a symbol (and book deltas contiguous)
+        order = np.argsort(symbol_ids, kind="stable")
+        grouped = records[order]
+        bounds = np.flatnonzero(np.diff(grouped["symbol_id"])) + 1
+        for chunk in np.split(grouped, bounds):
+            self.send(kind, self._symbols[chunk["symbol_id"][0]], chunk.tobytes(), len(chunk))
+
+    def send(self, kind: MarketDataKind, symbol: str, payload: bytes, count: int):
+        topic_ = topic(kind, self._exchange, symbol)
+        header = HEADER.pack(WIRE_VERSION, self._next_seq(topic_), count)
+        try:
+            self._socket.send_multipart((topic_, header, payload), flags=zmq.NOBLOCK, copy=False)
+        except zmq.Again:
+            self._dropped += count
+
+    def close(self):
+        self._socket.close()
+
+
+class ZmqBusStream[T](AbstractBaseStream[T]):
+    """Subscribes to ``kind`` items of ``exchange`` from one or more ``ZmqBusPublisher`` endpoints.
+
+    Only topics of symbols added with ``add_symbol`` are subscribed to. A jump in a topic's sequence number is counted
+    in ``gaps`` and logged.
+    """
+
+    def __init__(
+        self,
+        endpoints: str | Iterable[str],
+        exchange: str,
+        kind: MarketDataKind,
+        codec: RecordCodec[T] | None = None,
+        context: zmq.asyncio.Context | None = None,
+        max_messages: int = 256,
+    ):
+        super().__init__()
+        self._exchange = exchange
+        self._kind = MarketDataKind(kind)
+        self._codec = codec or default_codec(self._kind)
+        self._context = context or zmq.asyncio.Context.instance()
+        self._socket = self._context.socket(zmq.SUB)
+        self._socket.setsockopt(zmq.LINGER, 0)
+        for endpoint in [endpoints] if isinstance(endpoints, str) else endpoints:
+            self._socket.connect(endpoint)
+        self._max_messages = max_messages
+        self._expected_seqs: dict[bytes, int] = {}
+        self._gaps = 0
+
+    @property
+    def gaps(self) -> int:
+        return self._gaps
+
+    def add_symbol(self, symbol: str):
+        if symbol not in self._symbols:
+            self._socket.subscribe(topic(self._kind, self._exchange, symbol))
+        super().add_symbol(symbol)
+
+    def remove_symbol(self, symbol: str):
+        if symbol in self._symbols:
+            self._socket.unsubscribe(topic(self._kind, self._exchange, symbol))
+        super().remove_symbol(symbol)
+
+    def _on_gap(self, symbol: str, missed: int):
+        self._gaps += 1
+        logger.warning("Missed %d %s messages of %s on %s", missed, self._kind, symbol, self._exchange)
+
+    def _decode(self, symbol: str, payload: bytes) -> list[T]:
+        if self._codec is None:
+            return [Order.from_dict(d) for d in orjson.loads(payload)]
+        records = np.frombuffer(payload, self._codec.dtype)
+        items, _ = self._codec.decode(records, lambda _: symbol)
+        return items
+
+    def _receive(self, frames: list) -> list[T]:
+        topic_, header, payload = frames
+        version, seq, _ = HEADER.unpack(header)
+        if version != WIRE_VERSION:
+            logger.warning("Ignoring bus message of unknown version %d", version)
+            return []
+        symbol = bytes(topic_)[:-1].decode().split(".", 2)[2]
+        expected = self._expected_seqs.get(topic_)
+        if expected is not None and seq != expected:
+            self._on_gap(symbol, seq - expected)
+        self._expected_seqs[topic_] = seq + 1
+        return self._decode(symbol, payload)
+
+    async def _generate(self) -> AsyncGenerator[T, None, None]:
+        async for items in self._generate_batch():
+            for item in items:
+                yield item
+
+    async def _generate_batch(self) -> AsyncGenerator[list[T], None, None]:
+        socket = self._socket
+        while True:
+            # Poll with a timeout so that ``stop`` is noticed on an idle bus
+            if not await socket.poll(1000):
+                yield []
+                continue
+            items = []
+            for _ in range(self._max_messages):
+                try:
+                    frames = await socket.recv_multipart(flags=zmq.NOBLOCK)
+                except zmq.Again:
+                    break
+                items += self._receive(frames)
+            yield items
+
+    async def close(self):
+        self._socket.close()
+
+
+class ZmqOrderBookStream(ZmqBusStream[OrderBookDelta]):
+    """Book deltas from the bus, maintaining the books like ``OrderBookStream`` so ``book(symbol)`` works.
+
+    After a gap the book of that symbol is stale; its deltas are dropped until the publisher's next full snapshot.
+    """
+
+    def __init__(self, endpoints: str | Iterable[str], exchange: str, depth: int | None = None, **kwargs):
+        super().__init__(endpoints, exchange, MarketDataKind.book, **kwargs)
+        self._depth = depth
+        self._books: dict[str, L2OrderBook] = {}
+        self._stale: set[str] = set()
+
+    @property
+    def stale(self) -> set[str]:
+        """Symbols whose book is waiting for a snapshot."""
+        return self._stale
+
+    def book(self, symbol: str) -> L2OrderBook:
+        if (book := self._books.get(symbol)) is None:
+            book = self._books[symbol] = L2OrderBook(symbol, self._depth)
+            # Nothing is known about a book until its first snapshot
+            self._stale.add(symbol)
+        return book
+
+    def _on_gap(self, symbol: str, missed: int):
+        super()._on_gap(symbol, missed)
+        self._stale.add(symbol)
+
+    def _decode(self, symbol: str, payload: bytes) -> list[OrderBookDelta]:
+        deltas = []
+        for delta in super()._decode(symbol, payload):
+            book = self.book(symbol)
+            if delta.snapshot:
+                book.bids.clear()
+                book.asks.clear()
+                self._stale.discard(symbol)
+            elif symbol in self._stale:
+                continue
+            book.apply_delta(delta)
+            deltas.append(delta)
+        return deltas
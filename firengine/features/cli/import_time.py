@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from dataclasses import dataclass
+
+HEAVY_MODULES = ("ccxt", "polars", "aioreactive", "nats", "pyarrow", "zmq")
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    """Timings of a ``python -X importtime`` run; ``depth`` is 0 for top-level imports."""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+    return timings
+
+
+def measure_import(module: str) -> list[ImportTiming]:
+    """Import ``module`` in a fresh interpreter and return the timing of every module it loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def import_cost_us(timings: list[ImportTiming], module: str) -> int:
+    """Cumulative import time of ``module`` itself."""
+    return next(t.cumulative_us for t in timings if t.module == module)
+
+
+def loaded_heavy_modules(timings: list[ImportTiming]) -> list[str]:
+    loaded = {t.module.partition(".")[0] for t in timings}
+    return [m for m in HEAVY_MODULES if m in loaded]
@@ -1,5 +1,10 @@
+from typing import Annotated
+
 import typer
 
+from firengine.config import ensure_data_dirs
+
+# Commands import what they need when they run, keeping ``fli`` itself fast to start (see ``import-time``)
 app = typer.Typer()
 
 
@@ -13,6 +18,23 @@ def goodbye(name: str):
     print(f"Goodbye {name}")
 
 
+@app.command("import-time")
+def import_time(
+    modules: Annotated[list[str] | None, typer.Argument(help="Modules to import, by default the CLI itself")] = None,
+    top: Annotated[int, typer.Option(help="Number of slowest imports to list")] = 15,
+):
+    """Report what importing each module costs, measured in a fresh interpreter."""
+    from firengine.features.cli.import_time import import_cost_us, loaded_heavy_modules, measure_import
+
+    for module in modules or ["firengine.features.cli.main"]:
+        timings = measure_import(module)
+        print(f"{module}: {import_cost_us(timings, module) / 1000:.1f} ms")
+        for t in sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]:
+            print(f"  {t.self_us / 1000:8.1f} ms self {t.cumulative_us / 1000:8.1f} ms cumulative  {t.module}")
+        if heavy := loaded_heavy_modules(timings):
+            print(f"  heavy dependencies loaded: {', '.join(heavy)}")
+
+
 def exchange():
     pass
 
@@ -26,6 +48,7 @@ def watch():
 
 
 def main():
+    ensure_data_dirs()
     app()
 
 
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+import numpy as np
+
+from firengine.config import JOURNAL_DIR
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.features.stream.record_codec import RecordCodec, default_codec
+from firengine.lib.fire_enum import JournalFormat, MarketDataKind, MetricKind
+from firengine.lib.metrics.histogram import LogHistogram
+from firengine.lib.metrics.prometheus import MetricFamily, SummaryFamily
+
+if TYPE_CHECKING:
+    import polars as pl
+
+logger = logging.getLogger(__name__)
+
+MS_PER_DAY = 86_400_000
+EXTENSIONS = {JournalFormat.parquet: "parquet", JournalFormat.ipc: "arrow"}
+
+
+def partition_dir(root: str | Path, kind: MarketDataKind, exchange: str, symbol: str, day: str) -> Path:
+    """Hive-style directory of one kind, exchange, symbol and UTC day; the symbol is percent-encoded (``/`` and ``:``
+    are not path-safe) and decoded again by polars when scanning with ``hive_partitioning``."""
+    return Path(root) / str(kind) / f"exchange={exchange}" / f"symbol={quote(symbol, safe='')}" / f"date={day}"
+
+
+def scan_journal(
+    root: str | Path = JOURNAL_DIR,
+    kind: MarketDataKind = MarketDataKind.trade,
+    fmt: JournalFormat = JournalFormat.parquet,
+) -> "pl.LazyFrame":
+    """Every segment of ``kind`` under ``root``, with ``exchange``, ``symbol`` and ``date`` columns from the paths."""
+    import polars as pl
+
+    pattern = str(Path(root) / str(kind) / "**" / f"*.{EXTENSIONS[JournalFormat(fmt)]}")
+    if JournalFormat(fmt) == JournalFormat.parquet:
+        return pl.scan_parquet(pattern, hive_partitioning=True)
+    return pl.scan_ipc(pattern, hive_partitioning=True)
+
+
+@dataclass(slots=True)
+class RecorderStats:
+    """Write statistics of one kind; ``flush_latency`` (µs) runs from a segment's rotation to its files being on
+    disk, including the wait behind earlier segments."""
+
+    rows: int = 0
+    bytes: int = 0
+    files: int = 0
+    segments: int = 0
+    errors: int = 0
+    write_seconds: float = 0.0
+    flush_latency: LogHistogram = field(default_factory=LogHistogram)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.write_seconds if self.write_seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.write_seconds if self.write_seconds else 0.0
+
+
+class _Segment:
+    __slots__ = ("chunks", "rows", "nbytes", "opened", "opened_ms")
+
+    def __init__(self):
+        self.chunks: list[np.ndarray] = []
+        self.rows = 0
+        self.nbytes = 0
+        self.opened = time.monotonic()
+        self.opened_ms = int(time.time() * 1000)
+
+
+class MarketDataRecorder:
+    """Journals the streams of one exchange to rotating Parquet or Arrow IPC segments.
+
+    Streams are attached with ``record``; what they acquire is encoded with the kind's ``RecordCodec`` (the fixed-width
+    records of the bus) and appended to an in-memory segment per kind, so the event loop only pays for the encoding.
+    A segment is rotated once it is ``segment_seconds`` old or holds ``segment_bytes`` of records, and is then written
+    by a background thread, one file per symbol and UTC day under ``partition_dir``. Files appear atomically, so the
+    journal can be scanned (``scan_journal``) while it is being written.
+
+    Age is also checked by ``run``, which should be running for idle streams to be rotated on time; ``close`` writes
+    whatever is left.
+    """
+
+    def __init__(
+        self,
+        exchange: str,
+        root: str | Path = JOURNAL_DIR,
+        fmt: JournalFormat = JournalFormat.parquet,
+        segment_seconds: float = 300.0,
+        segment_bytes: int = 64 * 2**20,
+        compression: str = "zstd",
+    ):
+        self._exchange = exchange
+        self._root = Path(root)
+        self._format = JournalFormat(fmt)
+        self._segment_seconds = segment_seconds
+        self._segment_bytes = segment_bytes
+        self._compression = compression
+        self._symbols: list[str] = []
+        self._symbol_ids: dict[str, int] = {}
+        self._segments: dict[MarketDataKind, _Segment] = {}
+        self._stats: dict[MarketDataKind, RecorderStats] = {}
+        self._seq = 0
+        self._pending: set[asyncio.Future] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"recorder-{exchange}")
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def pending(self) -> int:
+        """Rotated segments not written yet."""
+        return len(self._pending)
+
+    def stats(self, kind: MarketDataKind) -> RecorderStats:
+        if (stats := self._stats.get(kind)) is None:
+            stats = self._stats[kind] = RecorderStats()
+        return stats
+
+    def buffered(self, kind: MarketDataKind) -> int:
+        """Rows of ``kind`` in the current segment."""
+        segment = self._segments.get(kind)
+        return segment.rows if segment is not None else 0
+
+    def _symbol_id(self, symbol: str) -> int:
+        if (symbol_id := self._symbol_ids.get(symbol)) is None:
+            symbol_id = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return symbol_id
+
+    def record(self, stream: AbstractBaseStream, kind: MarketDataKind, codec: RecordCodec | None = None):
+        """Journal everything ``stream`` acquires as ``kind``; candles carry no timeframe, so record a single OHLCV
+        timeframe per recorder (or root)."""
+        kind = MarketDataKind(kind)
+        if (codec := codec or default_codec(kind)) is None:
+            raise ValueError(f"Cannot record {kind} without a record codec")
+        codec.bind(stream, lambda records: self.append(kind, records), self._symbol_id)
+
+    def append(self, kind: MarketDataKind, records: np.ndarray):
+        if not len(records):
+            return
+        if (segment := self._segments.get(kind)) is None:
+            segment = self._segments[kind] = _Segment()
+        segment.chunks.append(records)
+        segment.rows += len(records)
+        segment.nbytes += records.nbytes
+        if segment.nbytes >= self._segment_bytes or time.monotonic() - segment.opened >= self._segment_seconds:
+            self.rotate(kind)
+
+    def rotate(self, kind: MarketDataKind):
+        """Hand the current segment of ``kind`` to the writer thread."""
+        if (segment := self._segments.pop(kind, None)) is None:
+            return
+        records = segment.chunks[0] if len(segment.chunks) == 1 else np.concatenate(segment.chunks)
+        self._seq += 1
+        rotated_ns = time.perf_counter_ns()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._write, kind, records, tuple(self._symbols), segment.opened_ms, self._seq
+        )
+        self._pending.add(future)
+        future.add_done_callback(lambda f: self._on_written(kind, f, rotated_ns))
+
+    def rotate_expired(self):
+        now = time.monotonic()
+        for kind in [kind for kind, segment in self._segments.items() if now - segment.opened >= self._segment_seconds]:
+            self.rotate(kind)
+
+    def _on_written(self, kind: MarketDataKind, future: asyncio.Future, rotated_ns: int):
+        self._pending.discard(future)
+        stats = self.stats(kind)
+        if future.cancelled():
+            return
+        if (err := future.exception()) is not None:
+            stats.errors += 1
+            logger.error("Failed to write %s segment of %s", kind, self._exchange, exc_info=err)
+            return
+        rows, nbytes, files, seconds = future.result()
+        stats.rows += rows
+        stats.bytes += nbytes
+        stats.files += files
+        stats.segments += 1
+        stats.write_seconds += seconds
+        stats.flush_latency.record((time.perf_counter_ns() - rotated_ns) // 1000)
+
+    def _write(
+        self, kind: MarketDataKind, records: np.ndarray, symbols: tuple[str, ...], opened_ms: int, seq: int
+    ) -> tuple[int, int, int, float]:
+        """Writer thread: one file per symbol and day of ``records``; returns rows, bytes, files and seconds taken."""
+        import polars as pl
+
+        start = time.perf_counter()
+        # Records without an event time (-1) are filed under the day the segment was opened
+        timestamps = records["timestamp"]
+        days = np.where(timestamps >= 0, timestamps, opened_ms) // MS_PER_DAY
+        keys = records["symbol_id"].astype(np.int64) << 32 | days
+        same_key = bool((keys == keys[0]).all())
+        if kind == MarketDataKind.book:
+            # Stable, so book deltas keep their order within a file
+            order = None if same_key else np.argsort(keys, kind="stable")
+        else:
+            # Other kinds are also sorted by time within a file, for the replay to merge them
+            order = None if same_key and (np.diff(timestamps) >= 0).all() else np.lexsort((timestamps, keys))
+        if order is None:
+            groups = [records]
+            group_keys = keys[:1]
+        else:
+            records, keys = records[order], keys[order]
+            bounds = np.flatnonzero(np.diff(keys)) + 1
+            groups = np.split(records, bounds)
+            group_keys = keys[np.concatenate(([0], bounds))]
+
+        nbytes = 0
+        columns = [name for name in records.dtype.names if name != "symbol_id"]
+        for group, key in zip(groups, group_keys.tolist(), strict=True):
+            symbol = symbols[key >> 32]
+            day = datetime.fromtimestamp((key & 0xFFFFFFFF) * MS_PER_DAY / 1000, UTC).strftime("%Y-%m-%d")
+            directory = partition_dir(self._root, kind, self._exchange, symbol, day)
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{opened_ms}-{seq:06d}.{EXTENSIONS[self._format]}"
+            tmp = path.with_name(path.name + ".tmp")
+            frame = pl.DataFrame({name: np.ascontiguousarray(group[name]) for name in columns})
+            if self._format == JournalFormat.parquet:
+                frame.write_parquet(tmp, compression=self._compression)
+            else:
+                frame.write_ipc(tmp, compression=self._compression)
+            os.replace(tmp, path)
+            nbytes += path.stat().st_size
+        return len(records), nbytes, len(groups), time.perf_counter() - start
+
+    async def run(self, interval: float = 1.0):
+        """Rotate segments that became too old while their streams were idle."""
+        while True:
+            await asyncio.sleep(min(interval, self._segment_seconds))
+            self.rotate_expired()
+
+    async def flush(self):
+        """Rotate every segment and wait until everything is written."""
+        for kind in list(self._segments):
+            self.rotate(kind)
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def close(self):
+        await self.flush()
+        self._executor.shutdown(wait=True)
+        for kind, stats in self._stats.items():
+            logger.info(
+                "Recorded %d %s rows of %s in %d files (%.0f rows/s, %.1f MB/s)",
+                stats.rows,
+                kind,
+                self._exchange,
+                stats.files,
+                stats.rows_per_second,
+                stats.bytes_per_second / 2**20,
+            )
+
+    def collect(self) -> list[MetricFamily | SummaryFamily]:
+        """Prometheus families of the recorder, for ``MetricsRegistry.register_collector``."""
+        labelnames = ["exchange", "kind"]
+        rows = MetricFamily("firengine_recorder_rows_total", "Rows journaled", MetricKind.counter, labelnames)
+        nbytes = MetricFamily("firengine_recorder_bytes_total", "Bytes journaled", MetricKind.counter, labelnames)
+        errors = MetricFamily(
+            "firengine_recorder_errors_total", "Segments that failed to write", MetricKind.counter, labelnames
+        )
+        buffered = MetricFamily(
+            "firengine_recorder_buffered_rows", "Rows waiting in the current segment", MetricKind.gauge, labelnames
+        )
+        latency = SummaryFamily(
+            "firengine_recorder_flush_latency_seconds", "Segment rotation to written", labelnames, scale=1e-6
+        )
+        for kind in MarketDataKind:
+            if kind not in self._stats and kind not in self._segments:
+                continue
+            stats = self.stats(kind)
+            rows.labels(self._exchange, kind).set(stats.rows)
+            nbytes.labels(self._exchange, kind).set(stats.bytes)
+            errors.labels(self._exchange, kind).set(stats.errors)
+            buffered.labels(self._exchange, kind).set(self.buffered(kind))
+            latency.add(stats.flush_latency, self._exchange, kind)
+        return [rows, nbytes, errors, buffered, latency]
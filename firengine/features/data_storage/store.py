@@ -0,0 +1,384 @@
+import hashlib
+import logging
+import os
+import uuid
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+import numpy as np
+import orjson
+
+from firengine.config import STORE_DIR
+from firengine.lib.fire_enum import MarketDataKind
+
+if TYPE_CHECKING:
+    import polars as pl
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ("exchange", "symbol", "timeframe", "date")
+
+
+class CommitConflict(Exception):
+    """Another writer committed the same version first."""
+
+
+@dataclass(frozen=True, slots=True)
+class DataFile:
+    """A Parquet file of a table and the statistics readers prune with."""
+
+    path: str  # relative to the store root
+    exchange: str
+    symbol: str
+    timeframe: str | None
+    date: str
+    rows: int
+    min_ts: int
+    max_ts: int
+    size: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @property
+    def partition(self) -> tuple[str, str, str | None, str]:
+        return self.exchange, self.symbol, self.timeframe, self.date
+
+    def matches(
+        self,
+        exchange: str | None = None,
+        symbols: Iterable[str] | None = None,
+        timeframe: str | None = None,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> bool:
+        return (
+            (exchange is None or self.exchange == exchange)
+            and (symbols is None or self.symbol in symbols)
+            and (timeframe is None or self.timeframe == timeframe)
+            and (start_ms is None or self.max_ts >= start_ms)
+            and (end_ms is None or self.min_ts <= end_ms)
+        )
+
+
+@dataclass(slots=True)
+class Snapshot:
+    """State of one table at a catalog version: its files, schema and the ids of the batches appended so far."""
+
+    version: int = 0
+    files: list[DataFile] = field(default_factory=list)
+    schema: dict[str, str] | None = None
+    batches: set[str] = field(default_factory=set)
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(
+            {
+                "version": self.version,
+                "schema": self.schema,
+                "batches": sorted(self.batches),
+                "files": [file.to_dict() for file in self.files],
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "Snapshot":
+        d = orjson.loads(data)
+        return cls(d["version"], [DataFile(**file) for file in d["files"]], d["schema"], set(d["batches"]))
+
+
+class FileCatalog:
+    """Versioned snapshots of each table as JSON files under ``<root>/_catalog/<table>/``, no server needed.
+
+    A commit writes version ``n + 1`` to a temporary file and hard-links it into place, which publishes it complete
+    and fails if the version exists: of two writers racing from version ``n`` only one succeeds and the other gets
+    ``CommitConflict``, reloads and retries. Readers load the highest version.
+
+    Every snapshot is complete, so only the latest ``keep_versions`` are kept. A pruned version number could be taken
+    again by a writer that loaded its snapshot that many commits before committing; writers reload right before they
+    commit, so this only needs to stay above the number of concurrent writers.
+    """
+
+    def __init__(self, root: str | Path, keep_versions: int = 10):
+        self._root = Path(root) / "_catalog"
+        self._keep_versions = keep_versions
+
+    def _table_dir(self, table: str) -> Path:
+        return self._root / table
+
+    def _versions(self, table: str) -> list[Path]:
+        return sorted(self._table_dir(table).glob("v*.json"))
+
+    def load(self, table: str) -> Snapshot:
+        while versions := self._versions(table):
+            try:
+                return Snapshot.from_json(versions[-1].read_bytes())
+            except FileNotFoundError:
+                # Pruned since the listing, by a writer that committed later versions
+                continue
+        return Snapshot()
+
+    def commit(self, table: str, snapshot: Snapshot) -> Snapshot:
+        """Write ``snapshot`` as the version after ``snapshot.version``."""
+        directory = self._table_dir(table)
+        directory.mkdir(parents=True, exist_ok=True)
+        committed = Snapshot(snapshot.version + 1, snapshot.files, snapshot.schema, snapshot.batches)
+        # Written aside and then linked, which fails if the version exists: readers never see a partial version
+        tmp = directory / f".v{committed.version:010d}-{uuid.uuid4().hex}.tmp"
+        tmp.write_bytes(committed.to_json())
+        try:
+            os.link(tmp, directory / f"v{committed.version:010d}.json")
+        except FileExistsError:
+            raise CommitConflict(f"Version {committed.version} of {table} already exists") from None
+        finally:
+            tmp.unlink()
+        for old in self._versions(table)[: -self._keep_versions]:
+            old.unlink(missing_ok=True)
+        return committed
+
+
+class MarketDataStore:
+    """Historical trades, OHLCV and book snapshots as Parquet files partitioned by exchange, symbol, timeframe (OHLCV
+    only) and UTC day, tracked by a ``FileCatalog``.
+
+    Every file is listed in the catalog with its row count and time range, so ``scan`` only opens the files of the
+    requested symbols that overlap the requested range; the time predicate is then pushed into the Parquet scan as
+    well. ``append`` is idempotent per batch id (by default a hash of the data), and ``compact`` merges the small files
+    that frequent appends leave behind.
+    """
+
+    def __init__(self, root: str | Path = STORE_DIR, compression: str = "zstd", max_retries: int = 10):
+        self._root = Path(root)
+        self._catalog = FileCatalog(self._root)
+        self._compression = compression
+        self._max_retries = max_retries
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def catalog(self) -> FileCatalog:
+        return self._catalog
+
+    def _partition_dir(self, kind: MarketDataKind, exchange: str, symbol: str, timeframe: str | None, day: str) -> Path:
+        directory = self._root / str(kind) / f"exchange={exchange}" / f"symbol={quote(symbol, safe='')}"
+        if timeframe is not None:
+            directory /= f"timeframe={timeframe}"
+        return directory / f"date={day}"
+
+    def _write_file(self, kind: MarketDataKind, frame: "pl.DataFrame", partition: tuple) -> DataFile:
+        exchange, symbol, timeframe, day = partition
+        directory = self._partition_dir(kind, exchange, symbol, timeframe, day)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{uuid.uuid4().hex}.parquet"
+        frame = frame.sort("timestamp", maintain_order=True)
+        frame.write_parquet(path, compression=self._compression, statistics=True)
+        timestamps = frame["timestamp"]
+        return DataFile(
+            path=path.relative_to(self._root).as_posix(),
+            exchange=exchange,
+            symbol=symbol,
+            timeframe=timeframe,
+            date=day,
+            rows=len(frame),
+            min_ts=int(timestamps.min()),
+            max_ts=int(timestamps.max()),
+            size=path.stat().st_size,
+        )
+
+    def _commit(self, kind: MarketDataKind, update) -> Snapshot | None:
+        """Apply ``update(snapshot) -> snapshot | None`` to the latest snapshot, retrying on conflicts."""
+        for _ in range(self._max_retries):
+            snapshot = self._catalog.load(kind)
+            if (updated := update(snapshot)) is None:
+                return None
+            try:
+                return self._catalog.commit(kind, updated)
+            except CommitConflict:
+                continue
+        raise CommitConflict(f"Gave up committing to {kind} after {self._max_retries} conflicts")
+
+    @staticmethod
+    def batch_id(frame: "pl.DataFrame") -> str:
+        """Content hash of ``frame``, the default id that makes re-appending the same data a no-op.
+
+        The ids are kept in the catalog, so the hash must not change with the polars version as ``hash_rows`` may:
+        columns are hashed in name order, without nulls as their NumPy bytes (strings as their UTF-8 lengths and bytes)
+        and as JSON otherwise.
+        """
+        import polars as pl
+
+        digest = hashlib.sha256()
+        for name in sorted(frame.columns):
+            column = frame[name]
+            plain = not column.null_count()
+            if plain and column.dtype == pl.String:
+                digest.update(orjson.dumps([name, "str", len(column)]))
+                digest.update(column.str.len_bytes().cast(pl.Int64).to_numpy().tobytes())
+                digest.update(column.str.join("").item().encode())
+            elif plain and (values := column.to_numpy()).dtype.kind in "biufmM":
+                digest.update(orjson.dumps([name, values.dtype.str, len(values)]))
+                digest.update(np.ascontiguousarray(values).tobytes())
+            else:
+                digest.update(orjson.dumps([name, column.to_list()], default=str))
+        return digest.hexdigest()
+
+    def append(
+        self,
+        kind: MarketDataKind,
+        frame: "pl.DataFrame",
+        exchange: str,
+        symbol: str | None = None,
+        timeframe: str | None = None,
+        batch_id: str | None = None,
+    ) -> int:
+        """Add ``frame`` (ms ``timestamp`` column, and ``symbol`` unless given) to the table of ``kind``; returns the
+        rows added, 0 if the batch was already appended."""
+        import polars as pl
+
+        kind = MarketDataKind(kind)
+        if kind == MarketDataKind.ohlcv and timeframe is None:
+            raise ValueError("OHLCV needs a timeframe")
+        if not len(frame):
+            return 0
+        frame = frame.with_columns(exchange=pl.lit(exchange), timeframe=pl.lit(timeframe, pl.String))
+        if symbol is not None:
+            frame = frame.with_columns(symbol=pl.lit(symbol))
+        # Hashed with the partition columns, so the same rows of another symbol are a different batch
+        batch_id = batch_id or self.batch_id(frame)
+        if batch_id in self._catalog.load(kind).batches:
+            return 0
+        frame = frame.with_columns(date=pl.from_epoch("timestamp", time_unit="ms").dt.strftime("%Y-%m-%d"))
+        columns = [c for c in frame.columns if c not in PARTITION_COLUMNS]
+        schema = {name: str(dtype) for name, dtype in frame.select(columns).schema.items()}
+        files = [
+            self._write_file(kind, part.select(columns), partition)
+            for partition, part in frame.partition_by(PARTITION_COLUMNS, as_dict=True).items()
+        ]
+
+        def add(snapshot: Snapshot) -> Snapshot | None:
+            if batch_id in snapshot.batches:
+                return None
+            if snapshot.schema is not None and snapshot.schema != schema:
+                raise ValueError(f"Schema {schema} does not match the {kind} table schema {snapshot.schema}")
+            return Snapshot(snapshot.version, snapshot.files + files, schema, snapshot.batches | {batch_id})
+
+        try:
+            committed = self._commit(kind, add)
+        except BaseException:
+            self._delete(files)
+            raise
+        if committed is None:
+            # Appended concurrently by another writer
+            self._delete(files)
+            return 0
+        return sum(file.rows for file in files)
+
+    def files(
+        self,
+        kind: MarketDataKind,
+        exchange: str | None = None,
+        symbols: str | Iterable[str] | None = None,
+        timeframe: str | None = None,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> list[DataFile]:
+        """Files that may hold rows matching the predicates, in time order."""
+        symbols = {symbols} if isinstance(symbols, str) else None if symbols is None else set(symbols)
+        files = self._catalog.load(MarketDataKind(kind)).files
+        matching = [file for file in files if file.matches(exchange, symbols, timeframe, start_ms, end_ms)]
+        return sorted(matching, key=lambda file: (file.min_ts, file.path))
+
+    def scan(
+        self,
+        kind: MarketDataKind,
+        exchange: str | None = None,
+        symbols: str | Iterable[str] | None = None,
+        timeframe: str | None = None,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> "pl.LazyFrame":
+        """Rows between ``start_ms`` and ``end_ms`` (inclusive), with the partition columns, reading only the files
+        ``files`` selects."""
+        import polars as pl
+
+        kind = MarketDataKind(kind)
+        files = self.files(kind, exchange, symbols, timeframe, start_ms, end_ms)
+        if not files:
+            schema = self._catalog.load(kind).schema or {"timestamp": "Int64"}
+            # Simple dtypes round-trip through their names; anything else is left untyped
+            empty = pl.DataFrame(schema={name: getattr(pl, dtype, pl.Null) for name, dtype in schema.items()})
+            return empty.lazy().with_columns(
+                exchange=pl.lit(None, pl.String),
+                symbol=pl.lit(None, pl.String),
+                timeframe=pl.lit(None, pl.String),
+                date=pl.lit(None, pl.String),
+            )
+        frames = [
+            pl.scan_parquet(self._root / file.path).with_columns(
+                exchange=pl.lit(file.exchange),
+                symbol=pl.lit(file.symbol),
+                timeframe=pl.lit(file.timeframe, pl.String),
+                date=pl.lit(file.date),
+            )
+            for file in files
+        ]
+        frame = pl.concat(frames, how="vertical")
+        if start_ms is not None:
+            frame = frame.filter(pl.col("timestamp") >= start_ms)
+        if end_ms is not None:
+            frame = frame.filter(pl.col("timestamp") <= end_ms)
+        return frame
+
+    def compact(self, kind: MarketDataKind, small_file_rows: int = 100_000) -> int:
+        """Merge the files under ``small_file_rows`` rows of each partition into one; returns the files removed."""
+        import polars as pl
+
+        kind = MarketDataKind(kind)
+        groups: dict[tuple, list[DataFile]] = {}
+        for file in self._catalog.load(kind).files:
+            if file.rows < small_file_rows:
+                groups.setdefault(file.partition, []).append(file)
+        merges: list[tuple[DataFile, list[DataFile]]] = []
+        for partition, files in groups.items():
+            if len(files) > 1:
+                frame = pl.concat([pl.read_parquet(self._root / file.path) for file in files], how="vertical")
+                merges.append((self._write_file(kind, frame, partition), files))
+        if not merges:
+            return 0
+        applied: list[tuple[DataFile, list[DataFile]]] = []
+
+        def swap(snapshot: Snapshot) -> Snapshot | None:
+            # Skip merges whose sources are gone, e.g. compacted concurrently by another writer
+            current = {file.path for file in snapshot.files}
+            applied[:] = [(merged, files) for merged, files in merges if all(f.path in current for f in files)]
+            if not applied:
+                return None
+            removed = {file.path for _, files in applied for file in files}
+            files = [file for file in snapshot.files if file.path not in removed] + [merged for merged, _ in applied]
+            return Snapshot(snapshot.version, files, snapshot.schema, snapshot.batches)
+
+        try:
+            committed = self._commit(kind, swap)
+        except BaseException:
+            self._delete(merged for merged, _ in merges)
+            raise
+        if committed is None:
+            applied.clear()
+        self._delete(merged for merged, files in merges if (merged, files) not in applied)
+        # Readers of earlier snapshots lose these files; nothing keeps old snapshots readable
+        removed = [file for _, files in applied for file in files]
+        self._delete(removed)
+        if removed:
+            logger.info("Compacted %d %s files into %d", len(removed), kind, len(applied))
+        return len(removed)
+
+    def _delete(self, files: Iterable[DataFile]):
+        for file in files:
+            try:
+                os.remove(self._root / file.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,152 @@
+import asyncio
+import functools
+import time
+from collections.abc import Awaitable, Callable
+
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.lib.fire_enum import LatencyKind, MetricKind, OrderStatus
+from firengine.lib.metrics.histogram import LogHistogram
+from firengine.lib.metrics.prometheus import MetricFamily, MetricsRegistry, SummaryFamily
+from firengine.model.data_model import Order
+
+US = 1e-6
+
+
+class LoopLagProbe:
+    """Measures how late the event loop resumes a task sleeping ``interval`` seconds, in microseconds.
+
+    A busy loop (a slow handler, a large batch) delays every task by the same amount, so this is the scheduling delay
+    all streams are currently paying.
+    """
+
+    def __init__(self, interval: float = 0.25):
+        self._interval = interval
+        self.histogram = LogHistogram()
+        self.last_us = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            self.last_us = int((loop.time() - start - self._interval) * 1e6)
+            self.histogram.record(self.last_us)
+
+
+class OpenOrderTracker:
+    """Open orders per symbol, following the updates of an order stream (connect ``handle`` to ``acquired``)."""
+
+    def __init__(self):
+        self._open: dict[str, set[str]] = {}
+
+    async def handle(self, order: Order):
+        ids = self._open.setdefault(order.symbol, set())
+        if order.status in (OrderStatus.open, OrderStatus.pending):
+            ids.add(order.id)
+        else:
+            ids.discard(order.id)
+
+    def counts(self) -> dict[str, int]:
+        return {symbol: len(ids) for symbol, ids in self._open.items()}
+
+
+class EngineMetrics:
+    """Prometheus metrics of the engine runtime, registered with ``registry`` as a collector.
+
+    Everything but handler durations is read from existing state at scrape time: event counts from each stream's
+    ``events``, latency percentiles from its ``StreamLatency`` (when enabled), queue depths from its subscribers,
+    reconnects from its watchers, open orders from ``OpenOrderTracker``s and the event loop lag from ``loop_lag``.
+    Handlers wrapped with ``timed`` record their duration into a histogram, one increment per call.
+    """
+
+    def __init__(self, registry: MetricsRegistry | None = None, loop_lag_interval: float = 0.25):
+        self._registry = registry or MetricsRegistry.default()
+        self._streams: list[AbstractBaseStream] = []
+        self._order_trackers: list[OpenOrderTracker] = []
+        self.loop_lag = LoopLagProbe(loop_lag_interval)
+        self._handler_durations = self._registry.summary(
+            "firengine_handler_duration_seconds", "Duration of timed signal handlers", ["handler"], scale=US
+        )
+        self._registry.register_collector(self.collect)
+
+    def add_stream(self, stream: AbstractBaseStream):
+        if stream not in self._streams:
+            self._streams.append(stream)
+
+    def track_orders(self, order_stream: AbstractBaseStream[Order]) -> OpenOrderTracker:
+        tracker = OpenOrderTracker()
+        order_stream.acquired.connect(tracker.handle)
+        self._order_trackers.append(tracker)
+        return tracker
+
+    def timed[T](self, handler: Callable[[T], Awaitable], name: str | None = None) -> Callable[[T], Awaitable]:
+        """``handler`` recording its duration under ``name`` (by default its qualified name)."""
+        histogram = self._handler_durations.labels(name or getattr(handler, "__qualname__", repr(handler)))
+
+        @functools.wraps(handler)
+        async def timed_handler(value: T):
+            start = time.perf_counter_ns()
+            try:
+                return await handler(value)
+            finally:
+                histogram.record((time.perf_counter_ns() - start) // 1000)
+
+        return timed_handler
+
+    def close(self):
+        self._registry.unregister_collector(self.collect)
+
+    def collect(self) -> list[MetricFamily | SummaryFamily]:
+        events = MetricFamily(
+            "firengine_stream_events_total", "Items dispatched by a stream", MetricKind.counter, ["stream", "symbol"]
+        )
+        latency = SummaryFamily(
+            "firengine_stream_latency_seconds",
+            "Exchange, processing and end-to-end latency of stream items",
+            ["stream", "symbol", "kind"],
+            scale=US,
+        )
+        depth = MetricFamily(
+            "firengine_subscriber_queue_depth",
+            "Items waiting in a queued subscriber",
+            MetricKind.gauge,
+            ["stream", "subscriber"],
+        )
+        dropped = MetricFamily(
+            "firengine_subscriber_dropped_total",
+            "Items dropped by a subscriber queue",
+            MetricKind.counter,
+            ["stream", "subscriber"],
+        )
+        reconnects = MetricFamily(
+            "firengine_stream_reconnects_total",
+            "Network errors a stream's watchers recovered from",
+            MetricKind.counter,
+            ["stream"],
+        )
+        for stream in self._streams:
+            name = stream.name
+            for symbol, count in stream.events.items():
+                events.labels(name, symbol).set(count)
+            if stream.latency is not None:
+                for symbol in stream.latency.symbols:
+                    for kind in LatencyKind:
+                        latency.add(stream.latency.histogram(symbol, kind), name, symbol, kind)
+            for stats in stream.subscriber_stats():
+                depth.labels(name, stats.name).set(stats.depth)
+                dropped.labels(name, stats.name).set(stats.dropped)
+            if (count := getattr(stream, "reconnects", None)) is not None:
+                reconnects.labels(name).set(count)
+
+        open_orders = MetricFamily("firengine_open_orders", "Open orders", MetricKind.gauge, ["symbol"])
+        for tracker in self._order_trackers:
+            for symbol, count in tracker.counts().items():
+                open_orders.labels(symbol).inc(count)
+
+        lag = SummaryFamily("firengine_event_loop_lag_seconds", "Event loop scheduling delay", scale=US)
+        lag.add(self.loop_lag.histogram)
+        last_lag = MetricFamily(
+            "firengine_event_loop_lag_last_seconds", "Latest event loop scheduling delay", MetricKind.gauge
+        )
+        last_lag.labels().set(self.loop_lag.last_us * US)
+        return [events, latency, depth, dropped, reconnects, open_orders, lag, last_lag]
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import signal
+from collections.abc import Awaitable, Callable
+
+from firengine.features.engine.metrics import EngineMetrics
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.lib.metrics.prometheus import MetricsRegistry, MetricsServer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
+
+def new_event_loop(use_uvloop: bool = True, eager_tasks: bool = True) -> asyncio.AbstractEventLoop:
+    """A uvloop loop when ``use_uvloop`` and uvloop is installed, else a default one.
+
+    With ``eager_tasks`` the loop runs ``asyncio.eager_task_factory``: a new task starts executing inside
+    ``create_task`` and is only scheduled on the loop once it blocks, so tasks that finish without blocking (e.g. a
+    handler of a concurrent signal dispatch with nothing to await) never go through the scheduler.
+    """
+    loop = uvloop.new_event_loop() if use_uvloop and uvloop is not None else asyncio.new_event_loop()
+    if eager_tasks:
+        loop.set_task_factory(asyncio.eager_task_factory)
+    return loop
+
+
+class EngineRunner:
+    """Runs a set of streams and background coroutines until stopped, then shuts them down in order.
+
+    ``run`` owns the event loop (see ``new_event_loop``); ``run_async`` runs on the current one. The engine stops on
+    SIGINT/SIGTERM, on ``stop()``, after ``duration`` seconds, or when a stream or task ends; the first failure is
+    re-raised after shutdown. Shutdown asks every stream to stop, gives them ``stop_timeout`` seconds to finish their
+    current batch, cancels the rest, closes the streams and the metrics and finally awaits the ``on_shutdown`` callbacks
+    (e.g. flushing a recorder).
+    """
+
+    def __init__(self, use_uvloop: bool = True, eager_tasks: bool = True, stop_timeout: float = 5.0):
+        self._use_uvloop = use_uvloop
+        self._eager_tasks = eager_tasks
+        self._stop_timeout = stop_timeout
+        self._streams: list[AbstractBaseStream] = []
+        self._coroutines: list[Callable[[], Awaitable]] = []
+        self._shutdown_callbacks: list[Callable[[], Awaitable]] = []
+        self._stop_event: asyncio.Event | None = None
+        self._stopping = False
+        self._metrics: EngineMetrics | None = None
+        self._metrics_server: MetricsServer | None = None
+
+    @property
+    def streams(self) -> list[AbstractBaseStream]:
+        return self._streams
+
+    def add_stream(self, stream: AbstractBaseStream) -> AbstractBaseStream:
+        self._streams.append(stream)
+        return stream
+
+    def add_task(self, coroutine_function: Callable[[], Awaitable]):
+        """Run ``coroutine_function()`` alongside the streams; it is cancelled on shutdown."""
+        self._coroutines.append(coroutine_function)
+
+    def on_shutdown(self, callback: Callable[[], Awaitable]):
+        self._shutdown_callbacks.append(callback)
+
+    def serve_metrics(
+        self, port: int = 9464, host: str = "0.0.0.0", registry: MetricsRegistry | None = None
+    ) -> EngineMetrics:
+        """Expose ``EngineMetrics`` of all streams on ``http://host:port/metrics`` while running."""
+        registry = registry or MetricsRegistry.default()
+        self._metrics = EngineMetrics(registry)
+        self._metrics_server = MetricsServer(registry, host, port)
+        return self._metrics
+
+    @property
+    def metrics(self) -> EngineMetrics | None:
+        return self._metrics
+
+    def stop(self):
+        self._stopping = True
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def run(self, duration: float | None = None):
+        with asyncio.Runner(loop_factory=lambda: new_event_loop(self._use_uvloop, self._eager_tasks)) as runner:
+            runner.run(self.run_async(duration))
+
+    async def run_async(self, duration: float | None = None):
+        self._stop_event = asyncio.Event()
+        if self._stopping:
+            self._stop_event.set()
+        if self._metrics is not None:
+            for stream in self._streams:
+                self._metrics.add_stream(stream)
+            await self._metrics_server.start()
+        loop = asyncio.get_running_loop()
+        signals = self._install_signal_handlers(loop)
+        stream_tasks = [
+            asyncio.create_task(stream.run(), name=f"stream-{type(stream).__name__}") for stream in self._streams
+        ]
+        other_tasks = [asyncio.create_task(coroutine_function()) for coroutine_function in self._coroutines]
+        if self._metrics is not None:
+            other_tasks.append(asyncio.create_task(self._metrics.loop_lag.run(), name="loop-lag"))
+        stop_waiter = asyncio.create_task(self._stop_event.wait())
+        failure: BaseException | None = None
+        try:
+            done, _ = await asyncio.wait(
+                [stop_waiter, *stream_tasks, *other_tasks], timeout=duration, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task is not stop_waiter and not task.cancelled() and task.exception() is not None:
+                    failure = failure or task.exception()
+                    logger.error("Stopping the engine, %s failed: %r", task.get_name(), task.exception())
+        finally:
+            for sig in signals:
+                loop.remove_signal_handler(sig)
+            stop_waiter.cancel()
+            await self._shutdown(stream_tasks, other_tasks)
+            self._stop_event = None
+            self._stopping = False
+        if failure is not None:
+            raise failure
+
+    def _install_signal_handlers(self, loop: asyncio.AbstractEventLoop) -> list[signal.Signals]:
+        installed = []
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Windows loops, or not on the main thread: rely on stop() and KeyboardInterrupt
+                continue
+            installed.append(sig)
+        return installed
+
+    async def _shutdown(self, stream_tasks: list[asyncio.Task], other_tasks: list[asyncio.Task]):
+        for stream in self._streams:
+            stream.stop()
+        if stream_tasks:
+            _, pending = await asyncio.wait(stream_tasks, timeout=self._stop_timeout)
+            # A stream waiting on the network only notices stop() with its next batch
+            for task in pending:
+                task.cancel()
+        for task in other_tasks:
+            task.cancel()
+        for result in await asyncio.gather(*stream_tasks, *other_tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.debug("Task ended with %r", result)
+        for stream in self._streams:
+            if (close := getattr(stream, "close", None)) is not None:
+                try:
+                    await close()
+                except Exception:
+                    logger.exception("Failed to close %s", type(stream).__name__)
+        if self._metrics_server is not None:
+            await self._metrics_server.close()
+        if self._metrics is not None:
+            # Collectors outlive the run on a process-wide registry: a later run would export the streams twice
+            self._metrics.close()
+        for callback in self._shutdown_callbacks:
+            try:
+                await callback()
+            except Exception:
+                logger.exception("Shutdown callback %r failed", callback)
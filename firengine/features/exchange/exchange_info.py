@@ -1,7 +1,10 @@
 from dataclasses import dataclass
-from typing import Self
+from typing import TYPE_CHECKING, Self
 
-import ccxt
+from firengine.features.exchange.market_cache import MarketCache
+
+if TYPE_CHECKING:
+    import ccxt
 
 @dataclass
 class ExchangeInfo:
@@ -12,8 +15,8 @@ class ExchangeInfo:
 
 
     @classmethod
-    def from_exchange(cls, ex: ccxt.Exchange) -> Self:
-        ex.load_markets()
+    def from_exchange(cls, ex: "ccxt.Exchange", market_cache: MarketCache | None = None) -> Self:
+        (market_cache or MarketCache.default()).load_markets(ex)
         return cls(
             currencies=set(ex.currencies.keys()),
             symbols=set(ex.symbols),
@@ -22,15 +25,17 @@ class ExchangeInfo:
         )
 
     @classmethod
-    def bybit(cls, ex: ccxt.bybit) -> Self:
+    def bybit(cls, ex: "ccxt.bybit") -> Self:
         return cls.from_exchange(ex)
 
     @classmethod
-    def kraken(cls, ex: ccxt.kraken) -> Self:
+    def kraken(cls, ex: "ccxt.kraken") -> Self:
         return cls.from_exchange(ex)
 
 
 if __name__ == '__main__':
+    import ccxt
+
     i1 = ExchangeInfo.bybit(ccxt.bybit())
     i2 = ExchangeInfo.kraken(ccxt.kraken())
     print(i1)
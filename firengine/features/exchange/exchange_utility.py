@@ -1,30 +1,36 @@
 import atexit
 from pprint import pprint
-from typing import Self
-
-import ccxt
-from ccxt import Exchange
+from typing import TYPE_CHECKING, Self
 
+from firengine.features.exchange.market_cache import MarketCache
 from firengine.lib.fire_enum import SupportedExchange
 from firengine.model.data_model import Ticker
 
+if TYPE_CHECKING:
+    from ccxt import Exchange
+
 
 class ExchangeUtility:
-    def __init__(self, exchange: Exchange):
+    def __init__(self, exchange: "Exchange", market_cache: MarketCache | None = None):
         self._exchange = exchange
+        self._market_cache = market_cache or MarketCache.default()
 
     @classmethod
     def from_supported_exchange(cls, supp_ex: SupportedExchange) -> Self | None:
+        import ccxt
+
         f = getattr(ccxt, supp_ex.value, None)
         if callable(f):
             return cls(f())
         return None
 
     def load_market(self):
-        self._exchange.load_markets()
+        self._market_cache.load_markets(self._exchange)
 
     @staticmethod
     def get_supported_exchanges() -> list[SupportedExchange]:
+        import ccxt
+
         return [SupportedExchange(ex) for ex in ccxt.exchanges if ex in SupportedExchange]
 
     def get_supported_methods(self) -> list[str]:
@@ -53,9 +59,11 @@ class ExchangeUtility:
 
     def fetch_ticker(self, symbol: str):
         d = self._exchange.fetch_ticker(symbol)
-        return Ticker.from_kwargs(**d)
+        return Ticker.from_dict(d)
 
 if __name__ == "__main__":
+    import ccxt
+
     ex = ccxt.kraken()
     ex.fetch_trades()
     exchanges = ExchangeUtility.get_supported_exchanges()
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import ClassVar, Self
+
+import orjson
+
+from firengine.config import MARKETS_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class MarketSnapshot:
+    __slots__ = ("markets", "currencies", "fetched_at")
+
+    def __init__(self, markets: dict, currencies: dict | None, fetched_at: float):
+        self.markets = markets
+        self.currencies = currencies
+        self.fetched_at = fetched_at
+
+
+class MarketCache:
+    """On-disk snapshot of each exchange's markets and currencies, one orjson file per exchange.
+
+    ``load_markets`` warm-starts a ccxt client from the snapshot with ``set_markets`` instead of downloading the
+    metadata. A snapshot older than ``ttl`` seconds is still used for the warm start, and is then refreshed in the
+    background: by a task on the client itself for async clients, by a daemon thread on a new instance of the client's
+    class for sync ones (a sync client is not safe to share with another thread), whose markets only reach the snapshot.
+    Without a snapshot the markets are loaded from the exchange and saved.
+    """
+
+    _default: ClassVar[Self | None] = None
+
+    def __init__(self, directory: str | Path = MARKETS_CACHE_DIR, ttl: float = 24 * 3600):
+        self._directory = Path(directory)
+        self._ttl = ttl
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def default(cls) -> Self:
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def path(self, exchange_id: str) -> Path:
+        return self._directory / f"{exchange_id}.json"
+
+    def read(self, exchange_id: str) -> MarketSnapshot | None:
+        try:
+            data = orjson.loads(self.path(exchange_id).read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as err:
+            logger.warning("Ignoring unreadable market cache of %s: %r", exchange_id, err)
+            return None
+        return MarketSnapshot(data["markets"], data.get("currencies"), data["fetched_at"])
+
+    def write(self, exchange_id: str, markets: dict, currencies: dict | None, fetched_at: float | None = None):
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(exchange_id)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(
+            orjson.dumps({"fetched_at": fetched_at or time.time(), "markets": markets, "currencies": currencies})
+        )
+        # Atomic, so concurrent processes never read a partial file
+        os.replace(tmp, path)
+
+    def is_fresh(self, snapshot: MarketSnapshot) -> bool:
+        return time.time() - snapshot.fetched_at < self._ttl
+
+    def save(self, ex):
+        self.write(ex.id, ex.markets, ex.currencies or None)
+
+    def warm_start(self, ex) -> MarketSnapshot | None:
+        """Load the cached markets into ``ex``, if there are any."""
+        if (snapshot := self.read(ex.id)) is not None:
+            ex.set_markets(snapshot.markets, snapshot.currencies)
+        return snapshot
+
+    def load_markets(self, ex) -> dict:
+        """``load_markets`` for a sync ccxt client."""
+        if ex.markets:
+            return ex.markets
+        snapshot = self.warm_start(ex)
+        if snapshot is None:
+            ex.load_markets()
+            self.save(ex)
+        elif not self.is_fresh(snapshot) and ex.id not in self._refreshing:
+            self._refreshing.add(ex.id)
+            threading.Thread(target=self._refresh, args=(ex,), name=f"markets-{ex.id}", daemon=True).start()
+        return ex.markets
+
+    async def load_markets_async(self, ex, reload: bool = False) -> dict:
+        """``load_markets`` for an async or ccxt.pro client."""
+        if reload:
+            await ex.load_markets(True)
+            self.save(ex)
+            return ex.markets
+        if ex.markets:
+            return ex.markets
+        snapshot = self.warm_start(ex)
+        if snapshot is None:
+            await ex.load_markets()
+            self.save(ex)
+        elif not self.is_fresh(snapshot) and ex.id not in self._refreshing:
+            self._refreshing.add(ex.id)
+            task = asyncio.create_task(self._refresh_async(ex), name=f"markets-{ex.id}")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return ex.markets
+
+    def _refresh(self, ex):
+        try:
+            refresher = type(ex)()
+            refresher.load_markets(True)
+            self.save(refresher)
+        except Exception as err:
+            logger.warning("Background refresh of %s markets failed: %r", ex.id, err)
+        finally:
+            self._refreshing.discard(ex.id)
+
+    async def _refresh_async(self, ex):
+        try:
+            await ex.load_markets(True)
+            self.save(ex)
+        except Exception as err:
+            logger.warning("Background refresh of %s markets failed: %r", ex.id, err)
+        finally:
+            self._refreshing.discard(ex.id)
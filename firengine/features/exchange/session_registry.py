@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, ClassVar, Self
+
+import orjson
+
+from firengine.features.exchange.market_cache import MarketCache
+from firengine.lib.fire_enum import SupportedExchange
+
+if TYPE_CHECKING:
+    from ccxt.pro import Exchange
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SessionKey:
+    exchange: SupportedExchange
+    api_key: str | None
+    demo: bool
+    config_hash: str  # of the whole config, so that clients configured differently are not shared
+
+    @classmethod
+    def of(cls, supp_ex: SupportedExchange, config: dict, demo: bool) -> Self:
+        # Values JSON cannot encode (a session, a callable) are told apart by their repr: plain objects by identity
+        encoded = orjson.dumps(config, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=repr)
+        return cls(SupportedExchange(supp_ex), config.get("apiKey"), demo, hashlib.sha256(encoded).hexdigest())
+
+
+class ExchangeSession:
+    __slots__ = ("key", "client", "refcount", "markets")
+
+    def __init__(self, key: SessionKey, client: "Exchange"):
+        self.key = key
+        self.client = client
+        self.refcount = 0
+        self.markets: asyncio.Future | None = None
+
+
+class ExchangeSessionRegistry:
+    """Hands out one shared, reference-counted ccxt.pro client per exchange, config and demo flag.
+
+    Streams on the same exchange then share its websocket connections and markets. ``release`` closes the client
+    once its last user is gone, and ``load_markets`` runs a single request for all concurrent awaiters, served from
+    ``market_cache`` when one is given (the default registry uses the default ``MarketCache``).
+    """
+
+    _default: ClassVar[Self | None] = None
+
+    def __init__(self, market_cache: MarketCache | None = None):
+        self._market_cache = market_cache
+        self._sessions: dict[SessionKey, ExchangeSession] = {}
+        self._by_client: dict[int, ExchangeSession] = {}
+
+    @classmethod
+    def default(cls) -> Self:
+        if cls._default is None:
+            cls._default = cls(MarketCache.default())
+        return cls._default
+
+    def acquire(self, supp_ex: SupportedExchange, config: dict | None = None, demo: bool = False) -> "Exchange | None":
+        config = config or {}
+        key = SessionKey.of(supp_ex, config, demo)
+        if (session := self._sessions.get(key)) is None:
+            import ccxt.pro as ccxt_pro
+
+            factory = getattr(ccxt_pro, key.exchange.value, None)
+            if not callable(factory):
+                return None
+            client = factory({"newUpdates": True, **config})
+            if demo:
+                client.enable_demo_trading(True)
+            session = self._sessions[key] = ExchangeSession(key, client)
+            self._by_client[id(client)] = session
+        session.refcount += 1
+        return session.client
+
+    async def release(self, client: "Exchange"):
+        session = self._by_client.get(id(client))
+        if session is None:
+            return
+        session.refcount -= 1
+        if session.refcount > 0:
+            return
+        del self._by_client[id(client)]
+        del self._sessions[session.key]
+        if session.markets is not None and not session.markets.done():
+            session.markets.cancel()
+        await client.close()
+
+    def refcount(self, client: "Exchange") -> int:
+        session = self._by_client.get(id(client))
+        return session.refcount if session else 0
+
+    async def load_markets(self, client: "Exchange", reload: bool = False) -> dict:
+        """Markets of ``client``, loaded once however many streams ask for them concurrently."""
+        session = self._by_client.get(id(client))
+        if session is None:
+            return await client.load_markets(reload)
+        markets = session.markets
+        if markets is None or reload or (markets.done() and (markets.cancelled() or markets.exception())):
+            if self._market_cache is not None:
+                session.markets = asyncio.ensure_future(self._market_cache.load_markets_async(client, reload))
+            else:
+                session.markets = asyncio.ensure_future(client.load_markets(reload))
+        # Shielded so that one cancelled awaiter does not cancel the load for everyone
+        return await asyncio.shield(session.markets)
+
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._by_client.clear()
+        for session in sessions:
+            if session.markets is not None and not session.markets.done():
+                session.markets.cancel()
+            await session.client.close()
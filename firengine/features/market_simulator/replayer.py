@@ -0,0 +1,338 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Callable, Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from firengine.config import JOURNAL_DIR, KRAKEN_OHLCVT_DATA_DIR
+from firengine.features.data_storage.ohlcvt import OHLCVT_COLUMNS, OHLCVTCache
+from firengine.features.data_storage.recorder import EXTENSIONS, partition_dir
+from firengine.lib.fire_enum import JournalFormat, MarketDataKind
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import OHLCV, Trade
+from firengine.utils.timeutil import parse_timeframe_to_ms
+
+if TYPE_CHECKING:
+    import polars as pl
+
+logger = logging.getLogger(__name__)
+
+MS_PER_DAY = 86_400_000
+
+type ReplayData = OHLCV | Trade
+
+
+def ordered_chunks(files: Sequence["pl.LazyFrame"], chunk_rows: int) -> Iterator["pl.DataFrame"]:
+    """The rows of ``files``, each sorted by timestamp, in chunks of about ``chunk_rows`` in timestamp order.
+
+    Files are read one after the other. Consecutive journal segments overlap (trades arrive out of order), so rows
+    later than the first timestamp of a later file are held back and merged with the following chunks rather than
+    emitted, which keeps no more in memory than the overlap.
+    """
+    import polars as pl
+
+    if not files:
+        return
+    # The earliest timestamp of all files after each one
+    firsts = pl.concat([file.select(pl.col("timestamp").min()) for file in files]).collect()["timestamp"]
+    later = np.minimum.accumulate(firsts.fill_null(np.iinfo(np.int64).max).to_numpy()[::-1])[::-1]
+    later = [*later[1:].tolist(), np.iinfo(np.int64).max]
+
+    held = None
+    for file, later_first in zip(files, later, strict=True):
+        for chunk in file.collect_batches(chunk_size=chunk_rows):
+            if not len(chunk):
+                continue
+            # Later chunks of this file start at or after its last row
+            ready_until = min(later_first, chunk["timestamp"][-1])
+            if held is not None:
+                chunk = pl.concat([held, chunk]).sort("timestamp", maintain_order=True)
+            end = chunk["timestamp"].search_sorted(ready_until, "right")
+            yield chunk.slice(0, end)
+            held = chunk.slice(end) if end < len(chunk) else None
+    if held is not None:
+        yield held
+
+
+class TimeSeriesMarketData:
+    """Recorded data of ``symbols`` between ``start_ms`` and ``end_ms`` (inclusive), read in chunks of ``chunk_rows``.
+
+    Candles come from the Kraken OHLCVT store (``<ohlcvt_dir>/<symbol>_<minutes>.csv``, read through its Parquet
+    ``OHLCVTCache``), trades from the journal of ``MarketDataRecorder`` (``<journal_dir>/trade/exchange=<exchange>/...``),
+    where only the days in range are opened. Each source is scanned lazily, so at most a chunk per symbol and type is
+    in memory.
+    """
+
+    def __init__(
+        self,
+        *symbols: str,
+        timeframe: str = "1m",
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+        exclude_ohlcv: bool = False,
+        exclude_trade: bool = False,
+        exchange: str = "kraken",
+        ohlcvt_dir: str | Path = KRAKEN_OHLCVT_DATA_DIR,
+        journal_dir: str | Path = JOURNAL_DIR,
+        journal_format: JournalFormat = JournalFormat.parquet,
+        chunk_rows: int = 65_536,
+        ohlcvt_cache: OHLCVTCache | None = None,
+    ):
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.exchange = exchange
+        self._ohlcvt_dir = Path(ohlcvt_dir)
+        self._journal_dir = Path(journal_dir)
+        self._journal_format = JournalFormat(journal_format)
+        self._chunk_rows = chunk_rows
+        self._ohlcvt_cache = ohlcvt_cache or OHLCVTCache.default()
+        self.dtypes: list[type] = [
+            dtype for dtype, excluded in ((OHLCV, exclude_ohlcv), (Trade, exclude_trade)) if not excluded
+        ]
+
+    def _in_range(self, frame: "pl.LazyFrame") -> "pl.LazyFrame":
+        import polars as pl
+
+        if self.start_ms is not None:
+            frame = frame.filter(pl.col("timestamp") >= self.start_ms)
+        if self.end_ms is not None:
+            frame = frame.filter(pl.col("timestamp") <= self.end_ms)
+        return frame
+
+    def ohlcvt_path(self, symbol: str) -> Path:
+        return self._ohlcvt_dir / f"{symbol}_{parse_timeframe_to_ms(self.timeframe) // 60_000}.csv"
+
+    def journal_files(self, symbol: str) -> list[Path]:
+        """Trade segments of ``symbol`` in chronological order, skipping days out of range."""
+        symbol_dir = partition_dir(self._journal_dir, MarketDataKind.trade, self.exchange, symbol, "").parent
+        first = -1 if self.start_ms is None else self.start_ms // MS_PER_DAY
+        last = float("inf") if self.end_ms is None else self.end_ms // MS_PER_DAY
+        files = []
+        for day_dir in sorted(symbol_dir.glob("date=*")):
+            day = np.datetime64(day_dir.name.removeprefix("date="), "D").astype(np.int64)
+            if first <= day <= last:
+                files += sorted(day_dir.glob(f"*.{EXTENSIONS[self._journal_format]}"))
+        return files
+
+    def scan(self, symbol: str, dtype: type[ReplayData]) -> list["pl.LazyFrame"]:
+        """One lazy frame per file of ``symbol``, each sorted by timestamp."""
+        import polars as pl
+
+        if dtype is OHLCV:
+            path = self.ohlcvt_path(symbol)
+            if not path.exists():
+                raise FileNotFoundError(f"No {self.timeframe} OHLCVT data of {symbol} at {path}")
+            return [self._in_range(self._ohlcvt_cache.scan(path))]
+        if not (files := self.journal_files(symbol)):
+            logger.warning("No recorded trades of %s on %s in range", symbol, self.exchange)
+        scan = pl.scan_parquet if self._journal_format == JournalFormat.parquet else pl.scan_ipc
+        return [self._in_range(scan(file)) for file in files]
+
+    def chunks(self, symbol: str, dtype: type[ReplayData]) -> Iterator["pl.DataFrame"]:
+        """Data of ``symbol`` in chunks, in timestamp order across chunks (see ``ordered_chunks``)."""
+        return ordered_chunks(self.scan(symbol, dtype), self._chunk_rows)
+
+    def converter(self, symbol: str, dtype: type[ReplayData]) -> Callable[["pl.DataFrame"], list[ReplayData]]:
+        if dtype is OHLCV:
+            timeframe = self.timeframe
+
+            def to_ohlcvs(frame: "pl.DataFrame") -> list[OHLCV]:
+                return [
+                    OHLCV(ts, o, h, low, c, v, n, symbol, timeframe, True)
+                    for ts, o, h, low, c, v, n in frame.select(OHLCVT_COLUMNS).iter_rows()
+                ]
+
+            return to_ohlcvs
+
+        def to_trades(frame: "pl.DataFrame") -> list[Trade]:
+            return TradeBatch(
+                timestamps=frame["timestamp"].to_numpy(),
+                prices=frame["price"].to_numpy(),
+                amounts=frame["amount"].to_numpy(),
+                sides=frame["side"].to_numpy(),
+                symbol_ids=np.zeros(len(frame), np.int32),
+                symbols=(symbol,),
+            ).to_trades()
+
+        return to_trades
+
+
+class SourceCursor:
+    """Position in the current chunk of one source of the merge."""
+
+    __slots__ = ("_chunks", "_convert", "kind", "frame", "timestamps", "pos")
+
+    def __init__(self, chunks: Iterator["pl.DataFrame"], convert: Callable, kind: int):
+        self._chunks = chunks
+        self._convert = convert
+        self.kind = kind
+        self.frame: pl.DataFrame | None = None
+        self.timestamps = np.empty(0, np.int64)
+        self.pos = 0
+
+    @property
+    def remaining(self) -> bool:
+        return self.pos < len(self.timestamps)
+
+    def advance(self) -> bool:
+        """Load the next non-empty chunk; ``False`` once the source is exhausted."""
+        for frame in self._chunks:
+            if len(frame):
+                self.frame, self.timestamps, self.pos = frame, frame["timestamp"].to_numpy(), 0
+                return True
+        self.frame, self.timestamps, self.pos = None, np.empty(0, np.int64), 0
+        return False
+
+    def take(self, end: int) -> list:
+        items = self._convert(self.frame.slice(self.pos, end - self.pos))
+        self.pos = end
+        return items
+
+
+def merge_sources(cursors: list[SourceCursor]) -> Iterator[tuple[np.ndarray, np.ndarray, list]]:
+    """K-way merge of sorted sources, yielding blocks of (timestamps, source kinds, items) in timestamp order.
+
+    Rather than a heap entry per row, every block takes all rows up to the horizon, the earliest last timestamp of
+    the current chunks: no source can still yield an earlier row, and the source setting the horizon is drained so
+    every block makes progress. Rows of equal timestamp keep the order of ``cursors``.
+    """
+    active = [cursor for cursor in cursors if cursor.advance()]
+    while active:
+        horizon = min(int(cursor.timestamps[-1]) for cursor in active)
+        timestamps, kinds, items = [], [], []
+        for cursor in active:
+            end = int(np.searchsorted(cursor.timestamps, horizon, "right"))
+            if end > cursor.pos:
+                timestamps.append(cursor.timestamps[cursor.pos : end])
+                kinds.append(np.full(end - cursor.pos, cursor.kind, np.int8))
+                items += cursor.take(end)
+        if len(timestamps) == 1:
+            yield timestamps[0], kinds[0], items
+        else:
+            merged = np.concatenate(timestamps)
+            order = np.argsort(merged, kind="stable")
+            yield merged[order], np.concatenate(kinds)[order], [items[i] for i in order.tolist()]
+        active = [cursor for cursor in active if cursor.remaining or cursor.advance()]
+
+
+class MarketReplayer:
+    """Replays ``TimeSeriesMarketData`` to replay streams, in timestamp order across symbols and types.
+
+    Replay streams register their symbols with ``add_subscriber`` and read their type's batches from ``watch``. A batch
+    is a run of consecutive items of one type, and the next is only delivered once the consumer asks for it, so
+    streams of different types see the data in one global order. A stream that stops (closing ``watch``) is skipped
+    from then on, and the replay ends once every stream has stopped. Without ``speedup`` the data is replayed as fast as
+    the consumers take it, in batches of up to ``batch_size``; with it, replay time runs ``speedup`` times faster than
+    the wall clock and a batch holds whatever became due since the previous one. The next merged block is loaded in a
+    worker thread while the current one is replayed.
+    """
+
+    def __init__(self, ts_data: TimeSeriesMarketData, speedup: float | None = None, batch_size: int = 1024):
+        self._ts_data = ts_data
+        self._speedup = speedup or None
+        self._batch_size = batch_size
+        self._subscriptions: dict[type, list[str]] = {}
+        self._queues: dict[type, asyncio.Queue[list | None]] = {}
+        self._gone: set[type] = set()
+        self._time_ms: int | None = None
+        self._running = False
+
+    @property
+    def time_ms(self) -> int | None:
+        """Timestamp of the latest replayed item."""
+        return self._time_ms
+
+    def add_subscriber(self, symbol: str, dtype: type[ReplayData]):
+        if self._running:
+            raise RuntimeError("Subscribers must be added before the replay starts")
+        if dtype not in self._ts_data.dtypes:
+            raise ValueError(f"{dtype.__name__} is not part of the replayed data")
+        if symbol not in self._ts_data.symbols:
+            raise ValueError(f"{symbol} is not part of the replayed data")
+        symbols = self._subscriptions.setdefault(dtype, [])
+        if symbol not in symbols:
+            symbols.append(symbol)
+        if dtype not in self._queues:
+            self._queues[dtype] = asyncio.Queue()
+
+    async def watch(self, dtype: type[ReplayData]) -> AsyncGenerator[list[ReplayData]]:
+        """Batches of the subscribed symbols of ``dtype``, until the replay ends; one consumer per type."""
+        if (queue := self._queues.get(dtype)) is None:
+            return
+        self._gone.discard(dtype)
+        try:
+            while (batch := await queue.get()) is not None:
+                try:
+                    yield batch
+                finally:
+                    queue.task_done()
+        finally:
+            # The consumer stopped (or the replay ended): stop waiting on it
+            self._gone.add(dtype)
+            while not queue.empty():
+                queue.get_nowait()
+                queue.task_done()
+
+    def _blocks(self) -> Iterator[tuple[np.ndarray, np.ndarray, list]]:
+        dtypes = list(self._subscriptions)
+        cursors = [
+            SourceCursor(self._ts_data.chunks(symbol, dtype), self._ts_data.converter(symbol, dtype), kind)
+            for kind, dtype in enumerate(dtypes)
+            for symbol in self._subscriptions[dtype]
+        ]
+        return merge_sources(cursors)
+
+    async def _deliver(self, kinds: np.ndarray, items: list):
+        dtypes = list(self._subscriptions)
+        if len(dtypes) == 1:
+            bounds = [0, len(items)]
+        else:
+            bounds = [0, *(np.flatnonzero(np.diff(kinds)) + 1).tolist(), len(items)]
+        for start, end in zip(bounds[:-1], bounds[1:], strict=True):
+            if (dtype := dtypes[kinds[start]]) in self._gone:
+                continue
+            queue = self._queues[dtype]
+            queue.put_nowait(items[start:end])
+            await queue.join()
+
+    def _stopped(self) -> bool:
+        """Whether every replay stream stopped."""
+        return self._gone.issuperset(self._queues)
+
+    async def run(self):
+        self._running = True
+        loop = asyncio.get_running_loop()
+        origin: tuple[int, float] | None = None
+        loading: asyncio.Future | None = None
+        try:
+            blocks = self._blocks()
+            loading = asyncio.ensure_future(asyncio.to_thread(next, blocks, None))
+            while (block := await loading) is not None and not self._stopped():
+                loading = asyncio.ensure_future(asyncio.to_thread(next, blocks, None))
+                timestamps, kinds, items = block
+                i, n = 0, len(items)
+                while i < n and not self._stopped():
+                    end = min(i + self._batch_size, n)
+                    if self._speedup is not None:
+                        if origin is None:
+                            origin = (int(timestamps[i]), loop.time())
+                        start_ms, start_time = origin
+                        due_ms = start_ms + (loop.time() - start_time) * 1000 * self._speedup
+                        if (due := int(np.searchsorted(timestamps, due_ms, "right"))) <= i:
+                            await asyncio.sleep((int(timestamps[i]) - due_ms) / 1000 / self._speedup)
+                            continue
+                        end = min(end, due)
+                    self._time_ms = int(timestamps[end - 1])
+                    await self._deliver(kinds[i:end], items[i:end])
+                    i = end
+        finally:
+            self._running = False
+            if loading is not None and not loading.done():
+                loading.cancel()
+            # Also when a source failed, so the replay streams end rather than wait forever
+            for queue in self._queues.values():
+                queue.put_nowait(None)
@@ -0,0 +1,209 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Sequence
+
+from firengine.model.data_model import OrderBook, OrderBookDelta
+
+
+class BookSide:
+    """Price levels of one side kept in ascending price order in two parallel lists.
+
+    The best bid is the last level and the best ask the first one. Lookups are ``bisect`` based (O(log n)), updates
+    shift the tail of the lists (a pointer ``memmove``) and allocate nothing.
+    """
+
+    __slots__ = ("_prices", "_amounts", "_is_bid")
+
+    def __init__(self, is_bid: bool):
+        self._prices: list[float] = []
+        self._amounts: list[float] = []
+        self._is_bid = is_bid
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    @property
+    def is_bid(self) -> bool:
+        return self._is_bid
+
+    def clear(self):
+        self._prices.clear()
+        self._amounts.clear()
+
+    def update(self, price: float, amount: float) -> bool:
+        """Set the amount at ``price``, an amount of 0 removes the level. Return whether the side changed."""
+        prices = self._prices
+        i = bisect_left(prices, price)
+        if i < len(prices) and prices[i] == price:
+            if amount <= 0:
+                del prices[i]
+                del self._amounts[i]
+            elif self._amounts[i] != amount:
+                self._amounts[i] = amount
+            else:
+                return False
+        elif amount > 0:
+            prices.insert(i, price)
+            self._amounts.insert(i, amount)
+        else:
+            return False
+        return True
+
+    def best(self) -> tuple[float, float] | None:
+        if not self._prices:
+            return None
+        i = -1 if self._is_bid else 0
+        return self._prices[i], self._amounts[i]
+
+    def best_price(self) -> float | None:
+        if not self._prices:
+            return None
+        return self._prices[-1] if self._is_bid else self._prices[0]
+
+    def price_at_level(self, level: int) -> float | None:
+        """Price of the ``level``-th best level (0 is the best), ``None`` if the side is shallower."""
+        if level >= len(self._prices):
+            return None
+        return self._prices[-level - 1] if self._is_bid else self._prices[level]
+
+    def levels(self, n: int) -> tuple[list[float], list[float]]:
+        """Prices and amounts of the best ``n`` levels, best first."""
+        if self._is_bid:
+            return self._prices[: -n - 1 : -1], self._amounts[: -n - 1 : -1]
+        return self._prices[:n], self._amounts[:n]
+
+    def amount_at(self, price: float) -> float:
+        i = bisect_left(self._prices, price)
+        if i < len(self._prices) and self._prices[i] == price:
+            return self._amounts[i]
+        return 0.0
+
+    def depth_at(self, price: float) -> float:
+        """Cumulative amount from the best level down to ``price`` inclusive."""
+        if self._is_bid:
+            return sum(self._amounts[bisect_left(self._prices, price) :])
+        return sum(self._amounts[: bisect_right(self._prices, price)])
+
+    def top(self, n: int | None = None) -> list[list[float]]:
+        """Best ``n`` levels, best first, as ccxt style ``[price, amount]`` pairs."""
+        prices, amounts = self.levels(len(self._prices) if n is None else n)
+        return [[price, amount] for price, amount in zip(prices, amounts, strict=True)]
+
+    def diff(self, levels: Iterable[Sequence[float]]) -> list[tuple[float, float]]:
+        """Changes turning this side into ``levels`` (best first, as ccxt delivers them), without applying them."""
+        changes = []
+        prices, amounts = self._prices, self._amounts
+        is_bid = self._is_bid
+        n = len(prices)
+        i = n - 1 if is_bid else 0
+        step = -1 if is_bid else 1
+        for level in levels:
+            price, amount = level[0], level[1]
+            while 0 <= i < n:
+                old = prices[i]
+                if old == price:
+                    if amounts[i] != amount:
+                        changes.append((price, amount))
+                    i += step
+                    break
+                if (old > price) if is_bid else (old < price):
+                    changes.append((old, 0.0))
+                    i += step
+                else:
+                    changes.append((price, amount))
+                    break
+            else:
+                changes.append((price, amount))
+        while 0 <= i < n:
+            changes.append((prices[i], 0.0))
+            i += step
+        return changes
+
+    def apply(self, changes: Iterable[tuple[float, float]]):
+        for price, amount in changes:
+            self.update(price, amount)
+
+
+class L2OrderBook:
+    """Incrementally maintained price-level book of a single symbol."""
+
+    def __init__(self, symbol: str, depth: int | None = None):
+        self._symbol = symbol
+        self._depth = depth
+        self._bids = BookSide(is_bid=True)
+        self._asks = BookSide(is_bid=False)
+        self._timestamp: int | None = None
+        self._nonce: int | None = None
+
+    @property
+    def symbol(self) -> str:
+        return self._symbol
+
+    @property
+    def bids(self) -> BookSide:
+        return self._bids
+
+    @property
+    def asks(self) -> BookSide:
+        return self._asks
+
+    @property
+    def timestamp(self) -> int | None:
+        return self._timestamp
+
+    @property
+    def nonce(self) -> int | None:
+        return self._nonce
+
+    def best_bid(self) -> tuple[float, float] | None:
+        return self._bids.best()
+
+    def best_ask(self) -> tuple[float, float] | None:
+        return self._asks.best()
+
+    def mid(self) -> float | None:
+        bid, ask = self._bids.best_price(), self._asks.best_price()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self) -> float | None:
+        bid, ask = self._bids.best_price(), self._asks.best_price()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def apply_delta(self, delta: OrderBookDelta):
+        self._bids.apply(delta.bids)
+        self._asks.apply(delta.asks)
+        self._timestamp = delta.timestamp
+        self._nonce = delta.nonce
+
+    def apply_snapshot(
+        self,
+        bids: Sequence[Sequence[float]],
+        asks: Sequence[Sequence[float]],
+        timestamp: int | None = None,
+        nonce: int | None = None,
+    ) -> OrderBookDelta:
+        """Bring the book to the given full levels and return only the levels that changed."""
+        if self._depth is not None:
+            bids, asks = bids[: self._depth], asks[: self._depth]
+        delta = OrderBookDelta(
+            symbol=self._symbol,
+            timestamp=timestamp,
+            bids=self._bids.diff(bids),
+            asks=self._asks.diff(asks),
+            nonce=nonce,
+        )
+        self.apply_delta(delta)
+        return delta
+
+    def snapshot(self, depth: int | None = None) -> OrderBook:
+        return OrderBook(
+            bids=self._bids.top(depth),
+            asks=self._asks.top(depth),
+            symbol=self._symbol,
+            timestamp=self._timestamp,
+            datetime=None,
+            nonce=self._nonce,
+        )
@@ -0,0 +1,134 @@
+import asyncio
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from firengine.features.order_book.l2_book import L2OrderBook
+from firengine.lib.com.signal import AsyncSignal
+from firengine.model.data_model import BookFeatures, OrderBookDelta
+
+if TYPE_CHECKING:
+    from firengine.features.stream.order_book_stream import OrderBookStream
+
+
+def touches_top_levels(book: L2OrderBook, delta: OrderBookDelta, depth: int) -> bool:
+    """Whether any level changed by ``delta`` (already applied to ``book``) is, or was, among the top ``depth``."""
+    if delta.bids:
+        nth_bid = book.bids.price_at_level(depth - 1)
+        if nth_bid is None or any(price >= nth_bid for price, _ in delta.bids):
+            return True
+    if delta.asks:
+        nth_ask = book.asks.price_at_level(depth - 1)
+        if nth_ask is None or any(price <= nth_ask for price, _ in delta.asks):
+            return True
+    return False
+
+
+def compute_book_features(book: L2OrderBook, depth: int, weights: np.ndarray) -> BookFeatures | None:
+    """Features of the top ``depth`` levels; ``weights`` scales each level's amount for the imbalance."""
+    bid_prices, bid_amounts = book.bids.levels(depth)
+    ask_prices, ask_amounts = book.asks.levels(depth)
+    if not bid_prices or not ask_prices:
+        return None
+    bp, ba = np.asarray(bid_prices), np.asarray(bid_amounts)
+    ap, aa = np.asarray(ask_prices), np.asarray(ask_amounts)
+    bid_depth, ask_depth = float(ba.sum()), float(aa.sum())
+    weighted_bid = float(ba @ weights[: len(ba)])
+    weighted_ask = float(aa @ weights[: len(aa)])
+
+    best_bid, best_ask = bid_prices[0], ask_prices[0]
+    best_bid_amount, best_ask_amount = bid_amounts[0], ask_amounts[0]
+    return BookFeatures(
+        symbol=book.symbol,
+        timestamp=book.timestamp,
+        depth=depth,
+        mid=(best_bid + best_ask) / 2,
+        microprice=(best_bid * best_ask_amount + best_ask * best_bid_amount) / (best_bid_amount + best_ask_amount),
+        spread=best_ask - best_bid,
+        imbalance=(weighted_bid - weighted_ask) / (weighted_bid + weighted_ask),
+        bid_depth=bid_depth,
+        ask_depth=ask_depth,
+        bid_vwap=float(bp @ ba) / bid_depth,
+        ask_vwap=float(ap @ aa) / ask_depth,
+    )
+
+
+class OrderBookFeatureEngine:
+    """Keeps ``BookFeatures`` of every symbol of an ``OrderBookStream`` up to date.
+
+    Features are recomputed only when a delta touches the top ``depth`` levels. Each symbol publishes on its own
+    ``updated(symbol)`` signal, at most once per ``throttle_ms``; updates arriving inside the throttle window are
+    conflated and the latest features are sent when it ends. Call ``remove_symbol`` along with the stream's, and
+    ``close`` when done, so that no throttled publication is left pending.
+    """
+
+    def __init__(
+        self,
+        book_stream: "OrderBookStream",
+        depth: int = 10,
+        throttle_ms: float = 0.0,
+        level_weights: Sequence[float] | None = None,
+    ):
+        if level_weights is not None and len(level_weights) != depth:
+            raise ValueError(f"expected {depth} level weights, got {len(level_weights)}")
+        self._book_stream = book_stream
+        self._depth = depth
+        self._throttle = throttle_ms / 1000
+        self._weights = np.ones(depth) if level_weights is None else np.asarray(level_weights, dtype=np.float64)
+
+        self._features: dict[str, BookFeatures] = {}
+        self._signals: dict[str, AsyncSignal[BookFeatures]] = {}
+        self._last_published: dict[str, float] = {}
+        self._pending: dict[str, asyncio.Task] = {}
+        book_stream.acquired.connect(self.on_delta)
+
+    def updated(self, symbol: str) -> AsyncSignal[BookFeatures]:
+        if (signal := self._signals.get(symbol)) is None:
+            signal = self._signals[symbol] = AsyncSignal[BookFeatures]()
+        return signal
+
+    def features(self, symbol: str) -> BookFeatures | None:
+        return self._features.get(symbol)
+
+    def remove_symbol(self, symbol: str):
+        if (task := self._pending.pop(symbol, None)) is not None:
+            task.cancel()
+        self._features.pop(symbol, None)
+        self._last_published.pop(symbol, None)
+
+    def close(self):
+        """Stop following the book stream and cancel the pending publications."""
+        self._book_stream.acquired.disconnect(self.on_delta)
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    async def on_delta(self, delta: OrderBookDelta):
+        book = self._book_stream.book(delta.symbol)
+        if delta.symbol in self._features and not touches_top_levels(book, delta, self._depth):
+            return
+        if (features := compute_book_features(book, self._depth, self._weights)) is None:
+            return
+        self._features[delta.symbol] = features
+        await self._publish(delta.symbol)
+
+    async def _publish(self, symbol: str):
+        if self._throttle <= 0:
+            await self.updated(symbol).emit(self._features[symbol])
+            return
+        if symbol in self._pending:
+            return
+        now = asyncio.get_running_loop().time()
+        wait = self._last_published.get(symbol, float("-inf")) + self._throttle - now
+        if wait <= 0:
+            self._last_published[symbol] = now
+            await self.updated(symbol).emit(self._features[symbol])
+        else:
+            self._pending[symbol] = asyncio.create_task(self._publish_later(symbol, wait))
+
+    async def _publish_later(self, symbol: str, wait: float):
+        await asyncio.sleep(wait)
+        self._last_published[symbol] = asyncio.get_running_loop().time()
+        del self._pending[symbol]
+        await self.updated(symbol).emit(self._features[symbol])
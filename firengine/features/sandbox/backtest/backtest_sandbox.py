@@ -2,26 +2,28 @@ import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from datetime import UTC, datetime
+from typing import TYPE_CHECKING
 
-import nats
-import polars as pl
 import shortuuid
-from aioreactive.testing import VirtualTimeEventLoop
 from pythonjsonlogger.orjson import OrjsonFormatter
 
-from firengine.config import KRAKEN_OHLCVT_DATA_DIR, LOG_DIR, SECONDS_PER_YEAR
+from firengine.config import KRAKEN_OHLCVT_DATA_DIR, LOG_DIR, SECONDS_PER_YEAR, ensure_data_dirs
 from firengine.features.async_stream.base_stream import BaseStream
+from firengine.features.data_storage.ohlcvt import load_dataframe_from_ohlcvt_csvfiles
 from firengine.features.sandbox.backtest.backtest_trader import BacktestEngine
 from firengine.lib.common_type import StrPath
 from firengine.model.data_model import OHLCV, Order, Trade
 from firengine.utils.timeutil import time_ms
 
-OHLCVT_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume", "trades")
+if TYPE_CHECKING:
+    import polars as pl
 
 
 class NATSLogEventHandler(logging.Handler):
     def __init__(self, url: str):
         super().__init__()
+        import nats
+
         self._url = url
         self._nc = nats.NATS()
         self._loop = asyncio.get_running_loop()
@@ -71,23 +73,8 @@ def setup_standard_structured_logging(
         logger.addHandler(handler)
 
 
-def load_dataframe_from_ohlcvt_csvfiles(
-    csvfiles_per_symbol: dict[str, StrPath], start_ms: int | None = None, end_ms: int | None = None
-):
-    start_ms = start_ms or float("-inf")
-    end_ms = end_ms or float("inf")
-    ohlcvts = [
-        pl.scan_csv(file, has_header=False, new_columns=OHLCVT_COLUMNS)
-        .with_columns((pl.col("timestamp") * 1000).cast(pl.Int64), symbol=pl.lit(symbol))
-        .filter(pl.col("timestamp").is_between(start_ms, end_ms))
-        for symbol, file in csvfiles_per_symbol.items()
-    ]
-    ohlcvt = pl.concat(ohlcvts, how="vertical")
-    return ohlcvt.sort("timestamp").collect()
-
-
 async def generate_ohlcvt_from_df(
-    ohlcvt_df: pl.DataFrame, speedup: int = 1, limit: int = float("inf")
+    ohlcvt_df: "pl.DataFrame", speedup: int = 1, limit: int = float("inf")
 ) -> AsyncGenerator[OHLCV]:
     prev_time: int | None = None
     count = 0
@@ -110,6 +97,7 @@ async def main():
     log_verbose = True
     strategy_name = "backtest"
     start_dt = datetime.now(UTC)
+    ensure_data_dirs()
     logfile = LOG_DIR / f"{strategy_name}_{start_dt.isoformat()}_{shortuuid.uuid()}.log"
     setup_standard_structured_logging(log_level, logfile, verbose=log_verbose)
 
@@ -147,6 +135,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    from aioreactive.testing import VirtualTimeEventLoop
+
     loop_factory = VirtualTimeEventLoop
 
     asyncio.run(main(), loop_factory=loop_factory)
@@ -3,7 +3,6 @@ from collections import defaultdict, deque
 from dataclasses import asdict, replace
 from random import randint
 
-import ccxt
 import shortuuid
 
 from firengine.features.async_stream.base_stream import BaseStream
@@ -14,7 +13,9 @@ from firengine.lib.fire_enum import (
     TimeInForce,
     TradeSide,
 )
+from firengine.model.batch_model import TradeBatch
 from firengine.model.data_model import OHLCV, Order, PrivateTrade
+from firengine.utils.timeutil import iso8601
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +62,7 @@ def create_mock_open_order(
     return Order(
         id=shortuuid.uuid(),
         clientOrderId=shortuuid.uuid(),
-        datetime=ccxt.Exchange.iso8601(timestamp),
+        datetime=iso8601(timestamp),
         timestamp=timestamp,
         lastTradeTimestamp=-1,
         status=OrderStatus.open,
@@ -143,6 +144,34 @@ class BacktestEngine:
         log_fill_order(trade.timestamp, self._strategy_name, self._run_id, trade)
         self._trades[trade.symbol][trade.id] = trade
 
+    @staticmethod
+    def _create_fill(order: Order, timestamp: int, price: float, taker_or_maker: TakerOrMaker) -> PrivateTrade:
+        return PrivateTrade(
+            id=shortuuid.uuid(),
+            timestamp=timestamp,
+            datetime=iso8601(timestamp),
+            symbol=order.symbol,
+            order=order.id,
+            type=order.type,
+            side=order.side,
+            takerOrMaker=taker_or_maker,
+            price=price,
+            amount=order.amount,
+            cost=price * order.amount,
+            fee={},
+            fees={},
+        )
+
+    async def _fill_order(self, order: Order, trade: PrivateTrade):
+        await self.handle_trade(trade)
+        await self.modify_order(
+            order,
+            status=OrderStatus.close,
+            filled=order.amount,
+            remaining=0.0,
+            cost=order.amount * order.price,
+        )
+
     async def match_open_order(self, ohlcv: OHLCV):
         for order in list(self._open_orders[ohlcv.symbol].values()):
             if order.timestamp < ohlcv.timestamp:
@@ -152,22 +181,7 @@ class BacktestEngine:
                         price = (
                             max(ohlcv.low, order.price) if order.side == TradeSide.buy else min(ohlcv.high, order.price)
                         )
-                        taker_or_maker = TakerOrMaker.taker
-                        trade = PrivateTrade(
-                            id=shortuuid.uuid(),
-                            timestamp=ohlcv.timestamp,
-                            datetime=ccxt.Exchange.iso8601(ohlcv.timestamp),
-                            symbol=ohlcv.symbol,
-                            order=order.id,
-                            type=order.type,
-                            side=order.side,
-                            takerOrMaker=taker_or_maker,
-                            price=price,
-                            amount=order.amount,
-                            cost=price * order.amount,
-                            fee={},
-                            fees={},
-                        )
+                        trade = self._create_fill(order, ohlcv.timestamp, price, TakerOrMaker.taker)
                     case OrderType.limit:
                         if (order.side == TradeSide.buy and ohlcv.low <= order.price) or (
                             order.side == TradeSide.sell and ohlcv.high >= order.price
@@ -177,31 +191,34 @@ class BacktestEngine:
                                 if order.side == TradeSide.buy
                                 else min(ohlcv.high, order.price)
                             )
-                            taker_or_maker = TakerOrMaker.maker
-                            trade = PrivateTrade(
-                                id=shortuuid.uuid(),
-                                timestamp=ohlcv.timestamp,
-                                datetime=ccxt.Exchange.iso8601(ohlcv.timestamp),
-                                symbol=ohlcv.symbol,
-                                order=order.id,
-                                type=order.type,
-                                side=order.side,
-                                takerOrMaker=taker_or_maker,
-                                price=price,
-                                amount=order.amount,
-                                cost=price * order.amount,
-                                fee={},
-                                fees={},
-                            )
+                            trade = self._create_fill(order, ohlcv.timestamp, price, TakerOrMaker.maker)
                 if trade is not None:
-                    await self.handle_trade(trade)
-                    await self.modify_order(
-                        order,
-                        status=OrderStatus.close,
-                        filled=order.amount,
-                        remaining=0.0,
-                        cost=order.amount * order.price,
+                    await self._fill_order(order, trade)
+
+    async def match_open_order_with_trades(self, batch: TradeBatch):
+        """Match open orders against a columnar batch of market trades.
+
+        Each order fills at the first trade after its submission: market orders at that trade's price, limit orders
+        at their limit price once a trade crosses it.
+        """
+        for symbol, trades in batch.split_by_symbol().items():
+            for order in list(self._open_orders[symbol].values()):
+                hits = trades.timestamps > order.timestamp
+                match order.type:
+                    case OrderType.limit if order.side == TradeSide.buy:
+                        hits &= trades.prices <= order.price
+                    case OrderType.limit:
+                        hits &= trades.prices >= order.price
+                if not hits.any():
+                    continue
+                i = int(hits.argmax())
+                if order.type == OrderType.market:
+                    trade = self._create_fill(
+                        order, int(trades.timestamps[i]), float(trades.prices[i]), TakerOrMaker.taker
                     )
+                else:
+                    trade = self._create_fill(order, int(trades.timestamps[i]), order.price, TakerOrMaker.maker)
+                await self._fill_order(order, trade)
 
     async def handle_ohlcv(self, ohlcv: OHLCV):
         self._ohlcv_queues[ohlcv.symbol].append(ohlcv)
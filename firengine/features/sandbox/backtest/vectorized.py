@@ -0,0 +1,207 @@
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from firengine.lib.fire_enum import OrderType, TakerOrMaker, TradeSide
+
+if TYPE_CHECKING:
+    import polars as pl
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class OrderIntents:
+    """Orders a strategy submits, as expressions evaluated over the bars of one symbol: a bar submits an order where
+    ``side`` is ``"buy"`` or ``"sell"`` (null for no order), for ``amount`` at ``price``. ``columns`` are computed
+    first, once, for what these expressions share."""
+
+    side: "pl.Expr"
+    amount: "pl.Expr | float"
+    price: "pl.Expr | float"
+    type: OrderType = OrderType.limit
+    columns: "Mapping[str, pl.Expr]" = field(default_factory=dict)
+
+
+def target_position(target: "pl.Expr", price: "pl.Expr | float | None" = None) -> OrderIntents:
+    """Market orders that move the position to ``target`` on the bar after it changes, at ``price`` (by default the
+    close of the bar the target changed on) bounded as ``BacktestEngine`` does: buys at no less than that bar's low,
+    sells at no more than its high."""
+    import polars as pl
+
+    change = pl.col("target_change")
+    return OrderIntents(
+        side=pl.when(change > 0).then(pl.lit(TradeSide.buy)).when(change < 0).then(pl.lit(TradeSide.sell)),
+        amount=change.abs(),
+        price=pl.col("close") if price is None else price,
+        type=OrderType.market,
+        columns={"target_change": target.diff().fill_null(target)},
+    )
+
+
+def min_tree(values: np.ndarray) -> np.ndarray:
+    """Bottom-up segment tree of ``values`` (padded with ``inf`` to a power of two): node ``k`` holds the minimum of
+    nodes ``2k`` and ``2k + 1``, the leaves start at ``len(tree) // 2``."""
+    size = 1 << max(len(values) - 1, 0).bit_length()
+    tree = np.full(2 * size, np.inf)
+    tree[size : size + len(values)] = values
+    lo = size
+    while lo > 1:
+        hi, lo = lo, lo // 2
+        tree[lo:hi] = np.minimum(tree[2 * lo : 2 * hi : 2], tree[2 * lo + 1 : 2 * hi : 2])
+    return tree
+
+
+def first_at_most(tree: np.ndarray, start: np.ndarray, limit: np.ndarray) -> np.ndarray:
+    """For each query, the first index at or after ``start`` whose value in ``tree`` (a ``min_tree``) is at most
+    ``limit``, or -1 if there is none.
+
+    All queries walk the tree together, O(log n) vectorized steps: up from the start leaf, moving to the next subtree
+    to the right until one holds a low enough value, then down into it.
+    """
+    size = len(tree) // 2
+    result = np.full(len(start), -1, dtype=np.int64)
+    queries = np.flatnonzero(start < size)
+    node = start[queries] + size
+    found_queries, found_nodes = [], []
+    while len(queries):
+        hit = tree[node] <= limit[queries]
+        found_queries.append(queries[hit])
+        found_nodes.append(node[hit])
+        queries, node = queries[~hit], node[~hit] + 1
+        # The parent of the last right child on the way up, plus one: the next subtree to the right
+        node //= node & -node
+        # Climbing past the root (node 1) means the search ran out of leaves
+        rest = node > 1
+        queries, node = queries[rest], node[rest]
+
+    queries = np.concatenate(found_queries)
+    node = np.concatenate(found_nodes)
+    while len(queries):
+        leaf = node >= size
+        result[queries[leaf]] = node[leaf] - size
+        queries, node = queries[~leaf], 2 * node[~leaf]
+        node += tree[node] > limit[queries]
+    return result
+
+
+def _match(bars: "pl.DataFrame", orders: "pl.DataFrame") -> "pl.DataFrame":
+    """Fills of the orders of one symbol, as ``BacktestEngine.match_open_order`` makes them: from the bar after an
+    order's, market orders fill on the first bar and limit orders on the first one to reach their price."""
+    import polars as pl
+
+    n = len(bars)
+    low = bars["low"].to_numpy()
+    high = bars["high"].to_numpy()
+    bar = orders["bar"].to_numpy()
+    price = orders["price"].to_numpy()
+    buy = (orders["side"] == TradeSide.buy).to_numpy()
+    market = (orders["type"] == OrderType.market).to_numpy()
+
+    fill = np.where(bar + 1 < n, bar + 1, -1)
+    for is_buy in (True, False):
+        limit = ~market & (buy == is_buy)
+        if not limit.any():
+            continue
+        if is_buy:
+            fill[limit] = first_at_most(min_tree(low), bar[limit] + 1, price[limit])
+        else:
+            fill[limit] = first_at_most(min_tree(-high), bar[limit] + 1, -price[limit])
+
+    filled = fill >= 0
+    at = np.where(filled, fill, 0)
+    fills = pl.DataFrame(
+        {
+            "filled": filled,
+            "fill_timestamp": bars["timestamp"].to_numpy()[at],
+            "fill_price": np.where(buy, np.maximum(low[at], price), np.minimum(high[at], price)),
+        }
+    )
+    taker_or_maker = pl.when(pl.col("type") == OrderType.market).then(pl.lit(TakerOrMaker.taker))
+    return (
+        pl.concat([orders, fills], how="horizontal")
+        .with_columns(
+            pl.when("filled").then(pl.col("fill_timestamp", "fill_price")),
+            taker_or_maker=pl.when("filled").then(taker_or_maker.otherwise(pl.lit(TakerOrMaker.maker))),
+        )
+        .drop("filled")
+    )
+
+
+@dataclass(slots=True)
+class VectorizedBacktestResult:
+    """Every order submitted, with its fill (null when it was still open at the end of the bars)."""
+
+    bars: "pl.DataFrame"
+    orders: "pl.DataFrame"
+
+    @property
+    def fills(self) -> "pl.DataFrame":
+        import polars as pl
+
+        return self.orders.filter(pl.col("fill_timestamp").is_not_null())
+
+    def positions(self) -> "pl.DataFrame":
+        """Position, cash and equity (cash plus the position at the close) of every symbol after each bar."""
+        import polars as pl
+
+        signed = pl.when(pl.col("side") == TradeSide.buy).then(pl.col("amount")).otherwise(-pl.col("amount"))
+        flows = self.fills.group_by("symbol", pl.col("fill_timestamp").alias("timestamp")).agg(
+            position=signed.sum(), cash=(-signed * pl.col("fill_price")).sum()
+        )
+        return (
+            self.bars.select("symbol", "timestamp", "close")
+            .join(flows, on=["symbol", "timestamp"], how="left", nulls_equal=True, maintain_order="left")
+            .with_columns(pl.col("position", "cash").fill_null(0.0).cum_sum().over("symbol"))
+            .with_columns(equity=pl.col("cash") + pl.col("position") * pl.col("close"))
+            .drop("close")
+        )
+
+
+def run_vectorized_backtest(bars: "pl.DataFrame | pl.LazyFrame", *intents: OrderIntents) -> VectorizedBacktestResult:
+    """Backtest ``intents`` over the whole history of ``bars`` at once, with the fills of ``BacktestEngine``.
+
+    ``bars`` are OHLCV rows with unique timestamps per symbol, e.g. from ``scan_ohlcvt``; without a ``symbol`` column
+    they are taken as a single symbol. The intents are evaluated over the bars of each symbol separately, so their
+    expressions (rolling means, shifts, ...) need no ``over("symbol")``. As in the event-driven engine, orders are
+    independent of each other and never expire; positions are not limited by funds.
+    """
+    import polars as pl
+
+    if not intents:
+        raise ValueError("Nothing to backtest without order intents")
+    bars = bars.collect() if isinstance(bars, pl.LazyFrame) else bars
+    if "symbol" not in bars.columns:
+        bars = bars.with_columns(symbol=pl.lit(None, pl.String))
+    groups = bars.partition_by("symbol", maintain_order=True) if len(bars) else [bars]
+
+    matched = []
+    for group in groups:
+        if not group["timestamp"].is_sorted():
+            group = group.sort("timestamp", maintain_order=True)
+        orders = pl.concat(
+            [
+                group.with_row_index("bar")
+                .with_columns(**intent.columns)
+                .select(
+                    "bar",
+                    "timestamp",
+                    "symbol",
+                    type=pl.lit(intent.type, pl.String),
+                    side=intent.side.cast(pl.String),
+                    amount=intent.amount if isinstance(intent.amount, pl.Expr) else pl.lit(intent.amount),
+                    price=intent.price if isinstance(intent.price, pl.Expr) else pl.lit(intent.price),
+                )
+                .cast({"amount": pl.Float64, "price": pl.Float64, "bar": pl.Int64})
+                .filter(pl.col("side").is_in([TradeSide.buy, TradeSide.sell]))
+                for intent in intents
+            ],
+            how="vertical",
+        ).sort("bar", maintain_order=True)
+        matched.append(_match(group, orders).drop("bar"))
+    result = VectorizedBacktestResult(bars=pl.concat(groups), orders=pl.concat(matched))
+    logger.info("Backtested %d bars: %d orders, %d fills", len(bars), len(result.orders), len(result.fills))
+    return result
@@ -0,0 +1,394 @@
+import math
+from collections import deque
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import RollingStats
+
+if TYPE_CHECKING:
+    from firengine.features.stream.trade_stream import TradeStream
+
+
+class TradeBuffer:
+    """Columnar trade rows of one symbol shared by any number of ``RollingWindow``.
+
+    Rows are addressed by a global index that keeps increasing; rows every attached window has evicted are dropped
+    from the front in amortised O(1). Each row also stores the log return from the previous trade.
+    """
+
+    __slots__ = ("timestamps", "prices", "amounts", "sides", "log_returns", "_offset", "_last_price", "_windows")
+
+    def __init__(self):
+        self.timestamps: list[int] = []
+        self.prices: list[float] = []
+        self.amounts: list[float] = []
+        self.sides: list[int] = []
+        self.log_returns: list[float] = []
+        self._offset = 0
+        self._last_price: float | None = None
+        self._windows: list[RollingWindow] = []
+
+    def __len__(self) -> int:
+        """Global index one past the last row."""
+        return self._offset + len(self.timestamps)
+
+    @property
+    def offset(self) -> int:
+        """Global index of the first stored row."""
+        return self._offset
+
+    def attach(self, window: "RollingWindow"):
+        self._windows.append(window)
+
+    def append(self, timestamp: int, price: float, amount: float, side: int = 0):
+        index = len(self)
+        last = self._last_price
+        log_return = math.log(price / last) if last else 0.0
+        self._last_price = price
+        self.timestamps.append(timestamp)
+        self.prices.append(price)
+        self.amounts.append(amount)
+        self.sides.append(side)
+        self.log_returns.append(log_return)
+        for window in self._windows:
+            window._add_row(index, price, amount, side, log_return)
+
+    def extend(self, timestamps: np.ndarray, prices: np.ndarray, amounts: np.ndarray, sides: np.ndarray):
+        """Vectorized ``append`` of time ordered arrays."""
+        if not len(prices):
+            return
+        index = len(self)
+        log_prices = np.log(prices)
+        log_returns = np.empty_like(log_prices)
+        log_returns[0] = log_prices[0] - math.log(self._last_price) if self._last_price else 0.0
+        log_returns[1:] = np.diff(log_prices)
+        self._last_price = float(prices[-1])
+        self.timestamps += timestamps.tolist()
+        self.prices += prices.tolist()
+        self.amounts += amounts.tolist()
+        self.sides += sides.tolist()
+        self.log_returns += log_returns.tolist()
+        for window in self._windows:
+            window._add_rows(index, prices, amounts, sides, log_returns)
+
+    def compact(self):
+        """Drop rows evicted by every window once they make up half of the storage."""
+        keep_from = min((window.start for window in self._windows), default=len(self))
+        drop = keep_from - self._offset
+        if drop > 0 and drop * 2 >= len(self.timestamps):
+            for column in (self.timestamps, self.prices, self.amounts, self.sides, self.log_returns):
+                del column[:drop]
+            self._offset = keep_from
+
+
+class RollingWindow:
+    """Running aggregates over the rows ``[start, end)`` of a ``TradeBuffer``.
+
+    Every row is added and evicted once with O(1) work (amortised for the monotonic high/low deques) and every
+    statistic is read in O(1). Price moments are accumulated relative to the first price of the window, which keeps
+    the variance accurate at large price levels; sums are reset whenever the window empties so rounding drift
+    cannot build up.
+    """
+
+    __slots__ = (
+        "_buffer",
+        "_window_ms",
+        "_start",
+        "_end",
+        "_volume",
+        "_notional",
+        "_buy_volume",
+        "_sell_volume",
+        "_shift",
+        "_sum_dp",
+        "_sum_dp2",
+        "_sum_r",
+        "_sum_r2",
+        "_max_rows",
+        "_min_rows",
+    )
+
+    def __init__(self, buffer: TradeBuffer, window_ms: int | None = None):
+        self._buffer = buffer
+        self._window_ms = window_ms
+        self._start = self._end = len(buffer)
+        self._max_rows: deque[int] = deque()
+        self._min_rows: deque[int] = deque()
+        self._reset()
+        buffer.attach(self)
+
+    def _reset(self):
+        self._volume = self._notional = self._buy_volume = self._sell_volume = 0.0
+        self._shift: float | None = None
+        self._sum_dp = self._sum_dp2 = self._sum_r = self._sum_r2 = 0.0
+
+    @property
+    def window_ms(self) -> int | None:
+        return self._window_ms
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def count(self) -> int:
+        return self._end - self._start
+
+    @property
+    def volume(self) -> float:
+        return self._volume
+
+    @property
+    def buy_volume(self) -> float:
+        return self._buy_volume
+
+    @property
+    def sell_volume(self) -> float:
+        return self._sell_volume
+
+    @property
+    def vwap(self) -> float | None:
+        return self._notional / self._volume if self._volume else None
+
+    @property
+    def first_timestamp(self) -> int | None:
+        return self._buffer.timestamps[self._start - self._buffer.offset] if self.count else None
+
+    @property
+    def last_timestamp(self) -> int | None:
+        return self._buffer.timestamps[self._end - 1 - self._buffer.offset] if self.count else None
+
+    @property
+    def open(self) -> float | None:
+        return self._buffer.prices[self._start - self._buffer.offset] if self.count else None
+
+    @property
+    def close(self) -> float | None:
+        return self._buffer.prices[self._end - 1 - self._buffer.offset] if self.count else None
+
+    @property
+    def high(self) -> float | None:
+        return self._buffer.prices[self._max_rows[0] - self._buffer.offset] if self.count else None
+
+    @property
+    def low(self) -> float | None:
+        return self._buffer.prices[self._min_rows[0] - self._buffer.offset] if self.count else None
+
+    @property
+    def price_variance(self) -> float:
+        n = self.count
+        if n < 2:
+            return 0.0
+        mean = self._sum_dp / n
+        return max(self._sum_dp2 / n - mean * mean, 0.0)
+
+    @property
+    def return_variance(self) -> float:
+        m = self.count - 1
+        if m < 2:
+            return 0.0
+        mean = self._sum_r / m
+        return max(self._sum_r2 / m - mean * mean, 0.0)
+
+    @property
+    def realized_volatility(self) -> float:
+        return math.sqrt(max(self._sum_r2, 0.0))
+
+    def advance(self, now_ms: int):
+        """Evict rows that are ``window_ms`` or more older than ``now_ms``."""
+        if self._window_ms is not None:
+            self.evict_before(now_ms - self._window_ms + 1)
+
+    def evict_before(self, timestamp: int):
+        buffer = self._buffer
+        offset = buffer.offset
+        timestamps, prices, amounts, sides, log_returns = (
+            buffer.timestamps,
+            buffer.prices,
+            buffer.amounts,
+            buffer.sides,
+            buffer.log_returns,
+        )
+        start, end = self._start, self._end
+        while start < end and timestamps[start - offset] < timestamp:
+            i = start - offset
+            price, amount = prices[i], amounts[i]
+            self._volume -= amount
+            self._notional -= price * amount
+            if sides[i] > 0:
+                self._buy_volume -= amount
+            elif sides[i] < 0:
+                self._sell_volume -= amount
+            dp = price - self._shift
+            self._sum_dp -= dp
+            self._sum_dp2 -= dp * dp
+            if self._max_rows[0] == start:
+                self._max_rows.popleft()
+            if self._min_rows[0] == start:
+                self._min_rows.popleft()
+            start += 1
+            if start < end:
+                # The new first row no longer has its previous trade in the window
+                r = log_returns[start - offset]
+                self._sum_r -= r
+                self._sum_r2 -= r * r
+        if start != self._start:
+            self._start = start
+            if start == end:
+                self._reset()
+            buffer.compact()
+
+    def _add_row(self, index: int, price: float, amount: float, side: int, log_return: float):
+        if self._shift is None:
+            self._shift = price
+        elif self._end > self._start:
+            self._sum_r += log_return
+            self._sum_r2 += log_return * log_return
+        self._end = index + 1
+        self._volume += amount
+        self._notional += price * amount
+        if side > 0:
+            self._buy_volume += amount
+        elif side < 0:
+            self._sell_volume += amount
+        dp = price - self._shift
+        self._sum_dp += dp
+        self._sum_dp2 += dp * dp
+
+        prices, offset = self._buffer.prices, self._buffer.offset
+        max_rows, min_rows = self._max_rows, self._min_rows
+        while max_rows and prices[max_rows[-1] - offset] <= price:
+            max_rows.pop()
+        max_rows.append(index)
+        while min_rows and prices[min_rows[-1] - offset] >= price:
+            min_rows.pop()
+        min_rows.append(index)
+
+    def _add_rows(self, first: int, prices: np.ndarray, amounts: np.ndarray, sides: np.ndarray, log_returns):
+        """Vectorized ``_add_row``; only suffix extrema of the batch can survive in the monotonic deques."""
+        if self._shift is None:
+            self._shift = float(prices[0])
+        returns = log_returns if self._end > self._start else log_returns[1:]
+        self._end = first + len(prices)
+        self._volume += float(amounts.sum())
+        self._notional += float(prices @ amounts)
+        self._buy_volume += float(amounts[sides > 0].sum())
+        self._sell_volume += float(amounts[sides < 0].sum())
+        dp = prices - self._shift
+        self._sum_dp += float(dp.sum())
+        self._sum_dp2 += float(dp @ dp)
+        self._sum_r += float(returns.sum())
+        self._sum_r2 += float(returns @ returns)
+
+        following_max = np.empty_like(prices)
+        following_max[-1] = -np.inf
+        following_max[:-1] = np.maximum.accumulate(prices[::-1])[::-1][1:]
+        following_min = np.empty_like(prices)
+        following_min[-1] = np.inf
+        following_min[:-1] = np.minimum.accumulate(prices[::-1])[::-1][1:]
+
+        stored, offset = self._buffer.prices, self._buffer.offset
+        max_candidates = np.flatnonzero(prices > following_max)
+        batch_max = prices[max_candidates[0]]
+        while self._max_rows and stored[self._max_rows[-1] - offset] <= batch_max:
+            self._max_rows.pop()
+        self._max_rows.extend((max_candidates + first).tolist())
+        min_candidates = np.flatnonzero(prices < following_min)
+        batch_min = prices[min_candidates[0]]
+        while self._min_rows and stored[self._min_rows[-1] - offset] >= batch_min:
+            self._min_rows.pop()
+        self._min_rows.extend((min_candidates + first).tolist())
+
+    def stats(self, symbol: str) -> RollingStats | None:
+        if not self.count:
+            return None
+        return RollingStats(
+            symbol=symbol,
+            timestamp=self.last_timestamp,
+            window_ms=self._window_ms,
+            count=self.count,
+            volume=self._volume,
+            buy_volume=self._buy_volume,
+            sell_volume=self._sell_volume,
+            vwap=self.vwap,
+            open=self.open,
+            high=self.high,
+            low=self.low,
+            close=self.close,
+            price_variance=self.price_variance,
+            return_variance=self.return_variance,
+            realized_volatility=self.realized_volatility,
+        )
+
+
+class RollingStatistics:
+    """Rolling statistics of one symbol over several time windows sharing a single ``TradeBuffer``.
+
+    Windows are advanced in event time by every trade, and in wall-clock time through ``advance``.
+    """
+
+    def __init__(self, symbol: str, windows_ms: Sequence[int]):
+        self._symbol = symbol
+        self._buffer = TradeBuffer()
+        self._windows = {window_ms: RollingWindow(self._buffer, window_ms) for window_ms in sorted(set(windows_ms))}
+
+    @property
+    def symbol(self) -> str:
+        return self._symbol
+
+    @property
+    def buffer(self) -> TradeBuffer:
+        return self._buffer
+
+    def window(self, window_ms: int) -> RollingWindow:
+        return self._windows[window_ms]
+
+    def put(self, timestamp: int, price: float, amount: float, side: int = 0):
+        self._buffer.append(timestamp, price, amount, side)
+        self.advance(timestamp)
+
+    def put_batch(self, batch: TradeBatch):
+        """Add the trades of a single-symbol batch."""
+        if not len(batch):
+            return
+        self._buffer.extend(batch.timestamps, batch.prices, batch.amounts, batch.sides)
+        self.advance(int(batch.timestamps[-1]))
+
+    def advance(self, now_ms: int):
+        for window in self._windows.values():
+            window.advance(now_ms)
+
+    def stats(self, window_ms: int) -> RollingStats | None:
+        return self._windows[window_ms].stats(self._symbol)
+
+
+class RollingStatisticsEngine:
+    """``RollingStatistics`` of every symbol of a ``TradeStream``, fed from its columnar trade batches."""
+
+    def __init__(self, trade_stream: "TradeStream", windows_ms: Sequence[int]):
+        self._trade_stream = trade_stream
+        self._windows_ms = tuple(windows_ms)
+        self._statistics: dict[str, RollingStatistics] = {}
+        trade_stream.acquired_trade_batch.connect(self.put_trade_batch)
+
+    def statistics(self, symbol: str) -> RollingStatistics:
+        if (statistics := self._statistics.get(symbol)) is None:
+            statistics = self._statistics[symbol] = RollingStatistics(symbol, self._windows_ms)
+        return statistics
+
+    def stats(self, symbol: str, window_ms: int) -> RollingStats | None:
+        if (statistics := self._statistics.get(symbol)) is None:
+            return None
+        return statistics.stats(window_ms)
+
+    def advance(self, now_ms: int):
+        for statistics in self._statistics.values():
+            statistics.advance(now_ms)
+
+    async def put_trade_batch(self, batch: TradeBatch):
+        for symbol, trades in batch.split_by_symbol().items():
+            if symbol in self._trade_stream.symbols:
+                self.statistics(symbol).put_batch(trades)
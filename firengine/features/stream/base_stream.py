@@ -1,31 +1,65 @@
 import asyncio
+import logging
+import time
 import traceback
 from abc import ABC, abstractmethod
-from collections.abc import AsyncGenerator, Awaitable, Callable, Collection
-from typing import Any, Self
-
-import ccxt.pro as ccxt
-from ccxt.pro import Exchange
+from collections.abc import AsyncGenerator, Awaitable, Callable, Hashable
+from typing import TYPE_CHECKING, ClassVar, Self
 
+from firengine.features.exchange.session_registry import ExchangeSessionRegistry
+from firengine.features.stream.multiplexer import SymbolWatcherMultiplexer
 from firengine.lib.com.signal import AsyncSignal
-from firengine.lib.fire_enum import SupportedExchange
+from firengine.lib.com.subscriber import QueuedSubscriber, SubscriberStats, symbol_key
+from firengine.lib.fire_enum import OverflowPolicy, SupportedExchange
+from firengine.lib.metrics.latency import LatencyRegistry, StreamLatency
+
+if TYPE_CHECKING:
+    from ccxt.pro import Exchange
+
+logger = logging.getLogger(__name__)
 
 
 class AbstractBaseStream[T](ABC):
-    """Data Producer"""
+    """Data Producer
+
+    While running, the stream records the latency of every item per symbol (see ``StreamLatency``) in ``latency``,
+    which is registered with the default ``LatencyRegistry``; ``enable_latency(False)`` turns this off. Items are
+    counted per symbol in ``events`` either way.
+    """
+
+    # Whether the ``timestamp`` of an item is its exchange event time, used for the exchange and end-to-end latency.
+    # Not for candles (their open time) nor replayed data (whose age says nothing about the feed).
+    event_time_from_item: ClassVar[bool] = True
 
     def __init__(self, *args, **kwargs):
         self._symbols: set[str] = set()
         self._data_acquired_signal = AsyncSignal[T]()
         self._data_acquired_per_symbol_signal: dict[str, AsyncSignal[T]] = {}
+        self._data_acquired_batch_signal = AsyncSignal[list[T]]()
+        self._data_acquired_batch_per_symbol_signal: dict[str, AsyncSignal[list[T]]] = {}
+        self._subscribers: list[QueuedSubscriber[T]] = []
+        # Iterated while dispatching: a put may block, and (un)subscribing meanwhile must not shift the iteration
+        self._subscribers_snapshot: tuple[QueuedSubscriber[T], ...] = ()
         self._streaming = False
+        self._latency_enabled = True
+        self._latency: StreamLatency | None = None
+        self._received_ns: int | None = None
+        self._events: dict[str, int] = {}
         self._args = args
         self._kwargs = kwargs
 
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
     @property
     def acquired(self) -> AsyncSignal[T]:
         return self._data_acquired_signal
 
+    @property
+    def acquired_batch(self) -> AsyncSignal[list[T]]:
+        return self._data_acquired_batch_signal
+
     @property
     def symbols(self) -> set[str]:
         return self._symbols
@@ -33,61 +67,207 @@ class AbstractBaseStream[T](ABC):
     def acquired_per_symbol(self, symbol: str) -> AsyncSignal[T]:
         return self._data_acquired_per_symbol_signal[symbol]
 
+    def acquired_batch_per_symbol(self, symbol: str) -> AsyncSignal[list[T]]:
+        return self._data_acquired_batch_per_symbol_signal[symbol]
+
     def add_symbol(self, symbol: str):
         self._symbols.add(symbol)
         self._data_acquired_per_symbol_signal[symbol] = AsyncSignal[T]()
+        self._data_acquired_batch_per_symbol_signal[symbol] = AsyncSignal[list[T]]()
 
     def remove_symbol(self, symbol: str):
         self._symbols.discard(symbol)
         self._data_acquired_per_symbol_signal.pop(symbol, None)
+        self._data_acquired_batch_per_symbol_signal.pop(symbol, None)
+
+    def subscribe(
+        self,
+        handler: Callable[[T], Awaitable],
+        maxsize: int = 1024,
+        policy: OverflowPolicy = OverflowPolicy.block,
+        key: Callable[[T], Hashable] = symbol_key,
+        name: str | None = None,
+    ) -> QueuedSubscriber[T]:
+        """Attach ``handler`` behind its own bounded queue and consumer task.
+
+        Unlike ``acquired``, a slow queued subscriber only delays the producer under ``OverflowPolicy.block``.
+        """
+        subscriber = QueuedSubscriber[T](handler, maxsize, policy, key, name)
+        self._subscribers.append(subscriber)
+        self._subscribers_snapshot = tuple(self._subscribers)
+        if self._streaming:
+            subscriber.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: QueuedSubscriber[T]):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+            self._subscribers_snapshot = tuple(self._subscribers)
+        subscriber.stop()
+
+    def subscriber_stats(self) -> list[SubscriberStats]:
+        return [subscriber.stats() for subscriber in self._subscribers]
+
+    @property
+    def latency(self) -> StreamLatency | None:
+        return self._latency
+
+    @property
+    def events(self) -> dict[str, int]:
+        """Items dispatched per symbol (``""`` for items without one)."""
+        return self._events
+
+    def _count_events(self, symbol: str, count: int):
+        self._events[symbol] = self._events.get(symbol, 0) + count
+
+    def enable_latency(self, enabled: bool = True):
+        self._latency_enabled = enabled
+        if not enabled and self._latency is not None:
+            LatencyRegistry.default().unregister(self._latency)
+            self._latency = None
+
+    def _event_time_ms(self, item: T) -> int | None:
+        """Exchange time of ``item``, ``None`` for streams whose items carry no event time."""
+        return getattr(item, "timestamp", None) if self.event_time_from_item else None
+
+    def _mark_received(self) -> int:
+        """Note that the source just returned the data of the batch being generated, before any decoding or handling:
+        its latency is then measured from here rather than from when ``run`` gets the batch."""
+        self._received_ns = time.time_ns()
+        return self._received_ns
 
     @abstractmethod
     async def _generate(self) -> AsyncGenerator[T | None]:
         raise NotImplementedError
 
+    async def _generate_batch(self) -> AsyncGenerator[list[T]]:
+        """Yield items grouped as received from the source.
+
+        The default wraps every item of ``_generate``; streams whose source delivers lists override this.
+        """
+        async for data in self._generate():
+            yield [data] if data else []
+
+    def _has_consumers(self) -> bool:
+        return bool(
+            self._subscribers
+            or self._data_acquired_signal.has_handlers
+            or self._data_acquired_batch_signal.has_handlers
+            or any(signal.has_handlers for signal in self._data_acquired_per_symbol_signal.values())
+            or any(signal.has_handlers for signal in self._data_acquired_batch_per_symbol_signal.values())
+        )
+
+    async def _dispatch_batch(self, batch: list[T], received_ns: int | None = None):
+        if self._data_acquired_batch_signal.has_handlers:
+            await self._data_acquired_batch_signal.emit(batch)
+        if any(signal.has_handlers for signal in self._data_acquired_batch_per_symbol_signal.values()):
+            per_symbol: dict[str, list[T]] = {}
+            for data in batch:
+                if symbol := getattr(data, "symbol", None):
+                    per_symbol.setdefault(symbol, []).append(data)
+            for symbol, items in per_symbol.items():
+                if signal := self._data_acquired_batch_per_symbol_signal.get(symbol):
+                    await signal.emit(items)
+
+        latency = self._latency if received_ns is not None else None
+        handled_ns = [] if latency is not None else None
+        events = self._events
+        for data in batch:
+            await self._data_acquired_signal.emit(data)
+            symbol = getattr(data, "symbol", None) or ""
+            events[symbol] = events.get(symbol, 0) + 1
+            if symbol and (signal := self._data_acquired_per_symbol_signal.get(symbol)):
+                await signal.emit(data)
+            if handled_ns is not None:
+                handled_ns.append(time.time_ns())
+            for subscriber in self._subscribers_snapshot:
+                await subscriber.put(data)
+        if handled_ns is not None:
+            latency.record_batch(
+                [getattr(data, "symbol", None) or "" for data in batch],
+                [self._event_time_ms(data) for data in batch],
+                received_ns,
+                handled_ns,
+            )
+
     async def run(self):
         self._streaming = True
-        gen = self._generate()
-        while self._streaming:
-            try:
-                if data := await anext(gen):
-                    await self._data_acquired_signal.emit(data)
-                    if symbol := getattr(data, "symbol", None):
-                        if signal := self._data_acquired_per_symbol_signal.get(symbol):
-                            await signal.emit(data)
-            except Exception as err:
-                traceback.print_exc()
-                raise err
+        if self._latency_enabled and self._latency is None:
+            self._latency = StreamLatency(self.name)
+            LatencyRegistry.default().register(self._latency)
+        for subscriber in self._subscribers_snapshot:
+            subscriber.start()
+        gen = self._generate_batch()
+        try:
+            while self._streaming:
+                try:
+                    self._received_ns = None
+                    if batch := await anext(gen):
+                        await self._dispatch_batch(batch, self._received_ns or time.time_ns())
+                except Exception as err:
+                    traceback.print_exc()
+                    raise err
+        finally:
+            await gen.aclose()
+            for subscriber in self._subscribers_snapshot:
+                subscriber.stop()
 
     def stop(self):
         self._streaming = False
 
-    @staticmethod
-    async def _multi_symbol_handler(
-        symbols: Collection[str], tasks: dict[str, asyncio.Task], func: Callable[[..., Any], Awaitable], *args, **kwargs
-    ) -> list[Any]:
-        results = []
-        for symbol in symbols:
-            task = tasks.get(symbol)
-            if task is None:
-                task = asyncio.create_task(func(symbol, *args, **kwargs))
-                tasks[symbol] = task
-
-        if tasks:
-            await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_COMPLETED, timeout=5.0)
-
-        for symbol in symbols:
-            if task := tasks.get(symbol):
-                if task.done():
-                    results.extend(task.result())
-                    tasks.pop(symbol, None)
-        return results
-
 
 class BaseExchangeStream[T](AbstractBaseStream[T]):
-    def __init__(self, exchange: Exchange, *args, **kwargs):
+    # Seconds to wait before watching again after a network error
+    retry_delay: float = 1.0
+
+    def __init__(self, exchange: "Exchange", *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._exchange = exchange
+        self._reconnects = 0
+        self._watchers: SymbolWatcherMultiplexer | None = None
+        self._registry: ExchangeSessionRegistry | None = None
+        self._released = False
+
+    @property
+    def name(self) -> str:
+        return f"{type(self).__name__}.{getattr(self._exchange, 'id', None)}"
+
+    @property
+    def reconnects(self) -> int:
+        """Network errors its watch calls (see ``_reconnect_after``) or watchers (see ``SymbolWatcherMultiplexer``)
+        recovered from."""
+        return self._reconnects + (self._watchers.reconnects if self._watchers is not None else 0)
+
+    async def _reconnect_after(self, err: Exception):
+        """Count a network error of a watch call and wait before the next one, on which ccxt.pro reconnects."""
+        self._reconnects += 1
+        logger.warning("%s failed to watch, retrying in %.1fs: %r", self.name, self.retry_delay, err)
+        await asyncio.sleep(self.retry_delay)
+
+    def add_symbol(self, symbol: str):
+        super().add_symbol(symbol)
+        if self._watchers is not None:
+            self._watchers.add(symbol)
+
+    def remove_symbol(self, symbol: str):
+        super().remove_symbol(symbol)
+        if self._watchers is not None:
+            self._watchers.remove(symbol)
+
+    def stop(self):
+        super().stop()
+        # Wakes ``run`` waiting on idle watchers
+        if self._watchers is not None:
+            self._watchers.stop()
+
+    def _watch_per_symbol[R](self, watch: Callable[[str], Awaitable[R]]) -> SymbolWatcherMultiplexer[R]:
+        """Create the multiplexer running ``watch(symbol)`` for each symbol; it follows ``add/remove_symbol``."""
+        from ccxt.base.errors import NetworkError
+
+        self._watchers = SymbolWatcherMultiplexer[R](watch, retry_on=(NetworkError,), retry_delay=self.retry_delay)
+        for symbol in self._symbols:
+            self._watchers.add(symbol)
+        return self._watchers
 
     @classmethod
     def from_supported_exchange(
@@ -95,18 +275,39 @@ class BaseExchangeStream[T](AbstractBaseStream[T]):
         supp_ex: SupportedExchange,
         *args,
         demo: bool = False,
+        config: dict | None = None,
+        registry: ExchangeSessionRegistry | None = None,
         **kwargs,
     ) -> Self | None:
-        f = getattr(ccxt, supp_ex.value, None)
-        ex = f({"newUpdates": True})
-        if demo:
-            ex.enable_demo_trading(True)
-        if callable(f):
-            return cls(ex, *args, **kwargs)
-        return None
+        """Create the stream on the registry's shared client of ``supp_ex`` (by default the process-wide registry)."""
+        registry = registry or ExchangeSessionRegistry.default()
+        ex = registry.acquire(supp_ex, config, demo)
+        if ex is None:
+            return None
+        stream = cls(ex, *args, **kwargs)
+        stream._registry = registry
+        return stream
+
+    async def load_markets(self, reload: bool = False) -> dict:
+        if self._registry is not None:
+            return await self._registry.load_markets(self._exchange, reload)
+        return await self._exchange.load_markets(reload)
+
+    async def run(self):
+        # Before ccxt's watch methods load the markets themselves: a shared client is warm-started from the registry's
+        # market cache rather than downloading them
+        if self._registry is not None:
+            await self.load_markets()
+        await super().run()
 
     async def _generate(self) -> AsyncGenerator[T | None]:
         raise NotImplementedError
 
     async def close(self):
-        await self._exchange.close()
+        """Release the exchange client; a shared one is only closed by its last stream."""
+        if self._registry is not None:
+            if not self._released:
+                self._released = True
+                await self._registry.release(self._exchange)
+        else:
+            await self._exchange.close()
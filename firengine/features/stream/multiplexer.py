@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Queued by ``stop`` to wake a waiting consumer
+_STOPPED = object()
+
+
+class SymbolWatcherMultiplexer[R]:
+    """Runs one persistent ``watch(symbol)`` task per symbol, all feeding a single queue.
+
+    Consumers await ``get_batch`` and wake as soon as any watcher returns, with no polling or timeouts. Symbols can be
+    added or removed while running. Exceptions listed in ``retry_on`` (e.g. network errors, after which ccxt.pro
+    reconnects on the next watch call) are counted in ``reconnects`` and retried after ``retry_delay``; any other
+    exception stops the watcher and is re-raised to the consumer. ``stop`` wakes a waiting consumer with an empty
+    batch.
+    """
+
+    def __init__(
+        self,
+        watch: Callable[[str], Awaitable[R]],
+        retry_on: tuple[type[BaseException], ...] = (),
+        retry_delay: float = 1.0,
+    ):
+        self._watch = watch
+        self._retry_on = retry_on
+        self._retry_delay = retry_delay
+        self._queue: asyncio.Queue[tuple[str, R] | BaseException | object] = asyncio.Queue()
+        self._symbols: set[str] = set()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._started = False
+        self._reconnects = 0
+        self._pending_error: BaseException | None = None
+
+    @property
+    def reconnects(self) -> int:
+        return self._reconnects
+
+    @property
+    def symbols(self) -> set[str]:
+        return self._symbols
+
+    def add(self, symbol: str):
+        self._symbols.add(symbol)
+        if self._started and symbol not in self._tasks:
+            self._spawn(symbol)
+
+    def remove(self, symbol: str):
+        self._symbols.discard(symbol)
+        if task := self._tasks.pop(symbol, None):
+            task.cancel()
+
+    def start(self):
+        self._started = True
+        # Drop what was left over from a previous run, including the wake-up of its stop
+        self._queue = asyncio.Queue()
+        self._pending_error = None
+        for symbol in self._symbols:
+            if symbol not in self._tasks:
+                self._spawn(symbol)
+
+    def stop(self):
+        self._started = False
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._queue.put_nowait(_STOPPED)
+
+    async def get(self) -> tuple[str, R] | None:
+        """The next result, or ``None`` once stopped."""
+        if (error := self._pending_error) is not None:
+            self._pending_error = None
+            raise error
+        item = await self._queue.get()
+        if isinstance(item, BaseException):
+            raise item
+        return None if item is _STOPPED else item
+
+    async def get_batch(self) -> list[tuple[str, R]]:
+        """Wait for at least one result and return every result queued so far, skipping removed symbols; empty once
+        stopped."""
+        if (first := await self.get()) is None:
+            return []
+        items = [first]
+        queue = self._queue
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is _STOPPED:
+                break
+            if isinstance(item, BaseException):
+                # Deliver what was received before the failure, raise on the next call
+                self._pending_error = item
+                break
+            items.append(item)
+        return [item for item in items if item[0] in self._symbols]
+
+    def _spawn(self, symbol: str):
+        task = asyncio.create_task(self._run_watcher(symbol), name=f"watch-{symbol}")
+        # With an eager task factory a watcher that fails immediately is already done here
+        if not task.done():
+            self._tasks[symbol] = task
+
+    async def _run_watcher(self, symbol: str):
+        while True:
+            try:
+                result = await self._watch(symbol)
+            except self._retry_on as err:
+                self._reconnects += 1
+                logger.warning("Watcher for %s failed, retrying in %.1fs: %r", symbol, self._retry_delay, err)
+                await asyncio.sleep(self._retry_delay)
+                continue
+            except Exception as err:
+                self._tasks.pop(symbol, None)
+                self._queue.put_nowait(err)
+                return
+            self._queue.put_nowait((symbol, result))
@@ -1,158 +1,185 @@
 import asyncio
-from collections import deque
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Sequence
 from typing import TYPE_CHECKING
 
-from ccxt.pro import Exchange
-
+from firengine.features.bars.time_bars import MultiTimeframeBarScheduler
 from firengine.features.stream.base_stream import BaseExchangeStream
+from firengine.model.batch_model import TradeBatch
 from firengine.model.data_model import OHLCV, Trade
-from firengine.utils.timeutil import parse_timeframe_to_ms, time_ms
+from firengine.utils.timeutil import time_ms
 
 if TYPE_CHECKING:
+    from ccxt.pro import Exchange
+
     from firengine.features.stream.trade_stream import TradeStream
 
 
-class TradeSlidingFrame:
-    def __init__(self, interval_ms: int):
-        self._queue: deque[Trade] = deque()
-        self._max_queue: deque[Trade] = deque()
-        self._min_queue: deque[Trade] = deque()
-        self._volume_sum: float = 0.0
-        self._interval_ms = interval_ms
-        # self._opening: int | None = None
-        self._last_opening: int | None = None
-
-    def put(self, trade: Trade):
-        # Refresh opening time
-        # if self._opening is None or trade.timestamp > self._opening + self._interval_ms:
-        #     self._opening = trade.timestamp
-        # Append to queue
-        self._queue.appendleft(trade)
-        self._volume_sum += trade.amount
-
-        while self._max_queue and self._max_queue[0].price <= trade.price:
-            self._max_queue.popleft()
-        self._max_queue.appendleft(trade)
-
-        while self._min_queue and self._min_queue[0].price >= trade.price:
-            self._min_queue.popleft()
-        self._min_queue.appendleft(trade)
-
-        # Evict
-        # self.evict(self._opening)
-
-    def evict(self, opening: int):
-        while self._queue and self._queue[-1].timestamp < opening:
-            evicted = self._queue.pop()
-            self._volume_sum -= evicted.amount
-            if evicted is self._max_queue[-1]:
-                self._max_queue.pop()
-            if evicted is self._min_queue[-1]:
-                self._min_queue.pop()
-
-    def get_ohlcv(self) -> OHLCV | None:
-        if self._queue:
-            # assert self._max_queue[-1].price == max(t.price for t in self._queue)
-            # assert self._min_queue[-1].price == min(t.price for t in self._queue)
-            return OHLCV(
-                timestamp=self._queue[-1].timestamp,
-                open=self._queue[-1].price,
-                high=self._max_queue[-1].price,
-                low=self._min_queue[-1].price,
-                close=self._queue[0].price,
-                volume=self._volume_sum,
-            )
-        return None
+class LocalOHLCVStream(BaseExchangeStream[OHLCV]):
+    """Bars of one or more timeframes built from a ``TradeStream``.
 
-    def get_next_ohlcv(self) -> OHLCV | None:
-        now = time_ms()
-        self._last_opening = self._last_opening or now
-        closing = self._last_opening + self._interval_ms
-        # print(close - now)
-        if now > closing:
-            self.evict(self._last_opening)
-            # print(self._last_opening, self._queue[-1].timestamp if self._queue else None)
-            self._last_opening = closing
-            return self.get_ohlcv()
-        return None
+    Bars are closed by a ``MultiTimeframeBarScheduler``: immediately when a trade of a later interval arrives, or
+    when the earliest open bar of any symbol reaches its boundary plus ``lateness_ms``, whichever comes first.
+    """
 
+    event_time_from_item = False
 
-class LocalOHLCVStream(BaseExchangeStream[OHLCV]):
     def __init__(
         self,
-        exchange: Exchange,
-        timeframe: str,
+        exchange: "Exchange",
+        timeframe: str | Sequence[str],
         trade_stream: "TradeStream",
+        lateness_ms: int = 0,
     ):
         super().__init__(exchange)
-        self._timeframe = timeframe
+        self._timeframes = [timeframe] if isinstance(timeframe, str) else list(timeframe)
         self._trade_stream = trade_stream
-        self._interval_ms = parse_timeframe_to_ms(timeframe)
+        self._scheduler = MultiTimeframeBarScheduler(self._timeframes, lateness_ms)
+        self._closed: list[OHLCV] = []
+        self._wakeup = asyncio.Event()
+        self._sleep_deadline: int | None = None
+        self._trade_stream.acquired_trade_batch.connect(self.put_trade_batch)
 
-        self._sliding_frames: dict[str, TradeSlidingFrame] = {}
-        self._trade_stream.acquired.connect(self.put_trade_to_frame)
-        self._sleep_time = min(1000, self._interval_ms // 30) / 1000  # in sec
+    @property
+    def timeframes(self) -> list[str]:
+        return self._scheduler.timeframes
 
     def add_symbol(self, symbol):
         super().add_symbol(symbol)
-        self._sliding_frames[symbol] = TradeSlidingFrame(self._interval_ms)
+        self._scheduler.add_symbol(symbol)
 
     def remove_symbol(self, symbol):
         super().remove_symbol(symbol)
-        self._sliding_frames.pop(symbol, None)
-
-    async def put_trade_to_frame(self, trade: Trade):
-        if frame := self._sliding_frames.get(trade.symbol):
-            frame.put(trade)
+        self._scheduler.remove_symbol(symbol)
+
+    async def put_trade(self, trade: Trade):
+        self._collect(self._scheduler.on_trade(trade.symbol, trade.timestamp, trade.price, trade.amount))
+
+    async def put_trades(self, trades: list[Trade]):
+        scheduler = self._scheduler
+        closed = []
+        for trade in trades:
+            closed += scheduler.on_trade(trade.symbol, trade.timestamp, trade.price, trade.amount)
+        self._collect(closed)
+
+    async def put_trade_batch(self, batch: TradeBatch):
+        self._collect(self._scheduler.on_trade_batch(batch))
+
+    def _collect(self, closed: list[OHLCV]):
+        if closed:
+            self._closed += closed
+            self._wakeup.set()
+        elif (deadline := self._scheduler.next_deadline()) is not None and (
+            self._sleep_deadline is None or deadline < self._sleep_deadline
+        ):
+            # A bar opened with an earlier deadline than the one being slept on
+            self._wakeup.set()
 
     async def _generate(self) -> AsyncGenerator[OHLCV, None, None]:
+        async for ohlcvs in self._generate_batch():
+            for ohlcv in ohlcvs:
+                yield ohlcv
+
+    async def _generate_batch(self) -> AsyncGenerator[list[OHLCV], None, None]:
         while True:
-            for symbol, frame in self._sliding_frames.items():
-                if ohlcv := frame.get_next_ohlcv():
-                    ohlcv.timeframe = self._timeframe
-                    ohlcv.symbol = symbol
-                    print(symbol, self._exchange.iso8601(ohlcv.timestamp), ohlcv)
-                    yield ohlcv
-            await asyncio.sleep(self._sleep_time)
+            if self._closed:
+                closed, self._closed = self._closed, []
+                yield closed
+                continue
+            self._sleep_deadline = self._scheduler.next_deadline()
+            # Wake at least once a second so that ``stop`` is noticed
+            timeout = 1.0 if self._sleep_deadline is None else min(1.0, (self._sleep_deadline - time_ms()) / 1000)
+            if timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except TimeoutError:
+                    pass
+            self._wakeup.clear()
+            self._closed += self._scheduler.advance(time_ms())
+            if not self._closed:
+                yield []
+
+
+class CandleIndex:
+    """Last candle seen per symbol/timeframe, used to turn ccxt's cached candle lists into changes only.
+
+    ``update`` scans the list from the end back to the last known bar, so the cost is O(new candles), not O(cache).
+    A bar is reported as forming (``closed=False``) while it is the latest one and its values change, and is reported
+    once more with ``closed=True`` when a later bar appears.
+    """
+
+    def __init__(self):
+        self._last: dict[tuple[str, str], tuple] = {}
+
+    def last(self, symbol: str, timeframe: str) -> OHLCV | None:
+        if row := self._last.get((symbol, timeframe)):
+            return OHLCV(*row, symbol=symbol, timeframe=timeframe, closed=False)
+        return None
+
+    def update(self, symbol: str, timeframe: str, rows: list[list]) -> list[OHLCV]:
+        if not rows:
+            return []
+        key = (symbol, timeframe)
+        last = self._last.get(key)
+        start = len(rows)
+        if last is None:
+            start = 0
+        else:
+            last_ts = last[0]
+            while start > 0 and rows[start - 1][0] >= last_ts:
+                start -= 1
+
+        changes = []
+        end = len(rows) - 1
+        if last is not None and start <= end and rows[start][0] > last[0]:
+            # The exchange sent no final values for the previous bar, close it as last seen
+            changes.append(OHLCV(*last, symbol=symbol, timeframe=timeframe, closed=True))
+        for i in range(start, end + 1):
+            row = tuple(rows[i][:6])
+            closed = i < end
+            if not closed and row == last:
+                continue
+            changes.append(OHLCV(*row, symbol=symbol, timeframe=timeframe, closed=closed))
+        if start <= end:
+            self._last[key] = tuple(rows[end][:6])
+        return changes
+
+    def remove(self, symbol: str):
+        for key in [key for key in self._last if key[0] == symbol]:
+            del self._last[key]
 
 
 class RemoteOHLCVStream(BaseExchangeStream[OHLCV]):
+    event_time_from_item = False
+
     def __init__(self, exchange, timeframe: str):
         super().__init__(exchange)
         self._timeframe = timeframe
-        self._tasks: dict[str, asyncio.Task] = {}
-
-    async def _get_ohlcv(self, symbol: str, timeframe: str) -> list[OHLCV]:
-        results = await self._exchange.watch_ohlcv(symbol, timeframe=timeframe)
-        ohlcvs = []
-        for d in results:
-            ohlcv = OHLCV(*d)
-            ohlcv.symbol = symbol
-            ohlcv.timeframe = timeframe
-            ohlcvs.append(ohlcv)
-        return ohlcvs
-
-    async def _generate(self) -> AsyncGenerator[OHLCV, None, None]:
-        while True:
-            results = []
-            for symbol in self._symbols:
-                task = self._tasks.get(symbol)
-                if task is None:
-                    task = asyncio.create_task(self._get_ohlcv(symbol, timeframe=self._timeframe))
-                    self._tasks[symbol] = task
+        self._candles = CandleIndex()
+        self._watch_per_symbol(self._watch_ohlcv)
 
-            await asyncio.wait(self._tasks.values(), return_when=asyncio.FIRST_COMPLETED)
+    def remove_symbol(self, symbol: str):
+        super().remove_symbol(symbol)
+        self._candles.remove(symbol)
 
-            for symbol in self._symbols:
-                if task := self._tasks.get(symbol):
-                    if task.done():
-                        results.extend(task.result())
-                        self._tasks.pop(symbol, None)
+    async def _watch_ohlcv(self, symbol: str) -> list[list]:
+        return await self._exchange.watch_ohlcv(symbol, timeframe=self._timeframe)
 
-            for result in results:
-                print(result)
-                yield result
+    async def _generate(self) -> AsyncGenerator[OHLCV, None, None]:
+        async for ohlcvs in self._generate_batch():
+            for ohlcv in ohlcvs:
+                yield ohlcv
+
+    async def _generate_batch(self) -> AsyncGenerator[list[OHLCV], None, None]:
+        self._watchers.start()
+        try:
+            while True:
+                results = await self._watchers.get_batch()
+                self._mark_received()
+                yield [
+                    ohlcv for symbol, rows in results for ohlcv in self._candles.update(symbol, self._timeframe, rows)
+                ]
+        finally:
+            self._watchers.stop()
 
 
 async def demo_local_ohlcv_stream():
@@ -162,7 +189,7 @@ async def demo_local_ohlcv_stream():
 
     trade_stream = TradeStream.from_supported_exchange(SupportedExchange.cryptocom)
     ohlcv_stream = LocalOHLCVStream.from_supported_exchange(
-        SupportedExchange.cryptocom, timeframe="1m", trade_stream=trade_stream
+        SupportedExchange.cryptocom, timeframe=["1s", "1m", "1h"], trade_stream=trade_stream
     )
     streams = [trade_stream, ohlcv_stream]
     # handler = PrintDataHandler[Trade]()
@@ -1,34 +1,70 @@
 import asyncio
 from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING
 
+from firengine.features.order_book.l2_book import L2OrderBook
 from firengine.features.stream.base_stream import BaseExchangeStream
 from firengine.lib.fire_enum import SupportedExchange
-from firengine.model.data_model import OrderBook
+from firengine.model.data_model import OrderBookDelta
 
+if TYPE_CHECKING:
+    from ccxt.pro import Exchange
 
-class OrderBookStream(BaseExchangeStream[OrderBook]):
 
-    async def _generate(self) -> AsyncGenerator[OrderBook, None, None]:
+class OrderBookStream(BaseExchangeStream[OrderBookDelta]):
+    """Maintains one ``L2OrderBook`` per symbol and emits only the levels changed by each update.
+
+    Use ``book(symbol)`` for lookups or ``book(symbol).snapshot(depth)`` for a full ``OrderBook`` copy.
+    """
+
+    def __init__(self, exchange: "Exchange", depth: int | None = None, *args, **kwargs):
+        super().__init__(exchange, *args, **kwargs)
+        self._depth = depth
+        self._books: dict[str, L2OrderBook] = {}
+
+    def add_symbol(self, symbol: str):
+        super().add_symbol(symbol)
+        self._books.setdefault(symbol, L2OrderBook(symbol, self._depth))
+
+    def remove_symbol(self, symbol: str):
+        super().remove_symbol(symbol)
+        self._books.pop(symbol, None)
+
+    def book(self, symbol: str) -> L2OrderBook:
+        return self._books[symbol]
+
+    async def _generate(self) -> AsyncGenerator[OrderBookDelta | None, None, None]:
+        from ccxt.base.errors import NetworkError
+
         while True:
-            result = await self._exchange.watch_order_book_for_symbols(list(self._symbols))
-            order_book = OrderBook.from_kwargs(**result)
-            yield order_book
+            try:
+                result = await self._exchange.watch_order_book_for_symbols(list(self._symbols), limit=self._depth)
+            except NetworkError as err:
+                await self._reconnect_after(err)
+                yield None
+                continue
+            self._mark_received()
+            if book := self._books.get(result["symbol"]):
+                delta = book.apply_snapshot(result["bids"], result["asks"], result["timestamp"], result["nonce"])
+                if delta.bids or delta.asks:
+                    yield delta
+                    continue
+            yield None
+
 
+def demo_order_book_stream():
+    from firengine.features.engine.runner import EngineRunner
 
-async def demo_order_book_stream():
-    ob_stream = OrderBookStream.from_supported_exchange(SupportedExchange.cryptocom)
+    runner = EngineRunner()
+    ob_stream = runner.add_stream(OrderBookStream.from_supported_exchange(SupportedExchange.cryptocom))
     ob_stream.add_symbol("BTC/USD")
     ob_stream.add_symbol("ETH/USD")
     ob_stream.add_symbol("SOL/USD")
-    task = asyncio.create_task(ob_stream.run())
-    await asyncio.sleep(500)
-    await asyncio.wait_for(task, None)
-    ob_stream.stop()
-    await ob_stream.close()
+    runner.run(duration=500)
 
 
-async def main():
-    await demo_order_book_stream()
+def main():
+    demo_order_book_stream()
 
 
 if __name__ == '__main__':
@@ -36,4 +72,4 @@ if __name__ == '__main__':
 
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(main())
+    main()
@@ -1,28 +1,33 @@
-import asyncio
 from collections.abc import AsyncGenerator
-
-import ccxt.pro as ccxt
+from typing import TYPE_CHECKING
 
 from firengine.features.stream.base_stream import BaseExchangeStream
 from firengine.model.data_model import Order
 
+if TYPE_CHECKING:
+    from ccxt.pro import Exchange
+
 
 class OrderStream(BaseExchangeStream[Order]):
-    def __init__(self, exchange: ccxt.Exchange):
+    def __init__(self, exchange: "Exchange"):
         super().__init__(exchange)
-        self._tasks: dict[str, asyncio.Task] = {}
+        self._watch_per_symbol(self._exchange.watch_orders)
 
+    async def _generate(self) -> AsyncGenerator[Order, None, None]:
+        async for orders in self._generate_batch():
+            for order in orders:
+                yield order
 
-    async def _generate(self) -> AsyncGenerator[Order | None, None, None]:
-        while True:
-            if results := await self._multi_symbol_handler(self._symbols, self._tasks, self._exchange.watch_orders):
-                for d in results:
-                    order = Order.from_kwargs(**d)
-                    yield order
-            else:
-                await asyncio.sleep(0.1)
-                yield None
+    async def _generate_batch(self) -> AsyncGenerator[list[Order], None, None]:
+        self._watchers.start()
+        try:
+            while True:
+                results = await self._watchers.get_batch()
+                self._mark_received()
+                yield [Order.from_dict(d) for _, dicts in results for d in dicts]
+        finally:
+            self._watchers.stop()
 
 
 if __name__ == "__main__":
-    pass
\ No newline at end of file
+    pass
@@ -1,25 +1,32 @@
-import asyncio
 from collections.abc import AsyncGenerator
-
-from ccxt.pro import Exchange
+from typing import TYPE_CHECKING
 
 from firengine.features.stream.base_stream import BaseExchangeStream
 from firengine.model.data_model import PrivateTrade
 
+if TYPE_CHECKING:
+    from ccxt.pro import Exchange
+
 
 class PrivateTradeStream(BaseExchangeStream[PrivateTrade]):
-    def __init__(self, exchange: Exchange):
+    def __init__(self, exchange: "Exchange"):
         super().__init__(exchange)
-        self._tasks: dict[str, asyncio.Task] = {}
-
-    async def _generate(self) -> AsyncGenerator[PrivateTrade | None, None, None]:
-        while True:
-            if dicts_ := await self._multi_symbol_handler(self._symbols, self._tasks, self._exchange.watch_my_trades):
-                for d in dicts_:
-                    yield PrivateTrade.from_kwargs(**d)
-            else:
-                await asyncio.sleep(0.1)
-                yield None
+        self._watch_per_symbol(self._exchange.watch_my_trades)
+
+    async def _generate(self) -> AsyncGenerator[PrivateTrade, None, None]:
+        async for trades in self._generate_batch():
+            for trade in trades:
+                yield trade
+
+    async def _generate_batch(self) -> AsyncGenerator[list[PrivateTrade], None, None]:
+        self._watchers.start()
+        try:
+            while True:
+                results = await self._watchers.get_batch()
+                self._mark_received()
+                yield [PrivateTrade.from_dict(d) for _, dicts in results for d in dicts]
+        finally:
+            self._watchers.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+import numpy as np
+
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.lib.fire_enum import MarketDataKind
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import OHLCV, OrderBookDelta, Trade
+
+TRADE_RECORD = np.dtype(
+    [
+        ("timestamp", np.int64),
+        ("price", np.float64),
+        ("amount", np.float64),
+        ("symbol_id", np.int32),
+        ("side", np.int8),
+    ],
+    align=True,
+)
+BOOK_LEVEL_RECORD = np.dtype(
+    [
+        ("timestamp", np.int64),
+        ("nonce", np.int64),
+        ("price", np.float64),
+        ("amount", np.float64),
+        ("symbol_id", np.int32),
+        ("side", np.int8),  # 1 bid, -1 ask
+        ("flags", np.uint8),
+    ],
+    align=True,
+)
+OHLCV_RECORD = np.dtype(
+    [
+        ("timestamp", np.int64),
+        ("open", np.float64),
+        ("high", np.float64),
+        ("low", np.float64),
+        ("close", np.float64),
+        ("volume", np.float64),
+        ("trades", np.int64),  # -1 if unknown
+        ("symbol_id", np.int32),
+        ("closed", np.int8),  # 1 closed, 0 forming, -1 unknown
+    ],
+    align=True,
+)
+FLAG_END = 1  # last level of a delta
+FLAG_RESET = 2  # the delta is a full snapshot, clear the book before applying it
+
+type RecordSink = Callable[[np.ndarray], None]
+
+
+class RecordCodec[T](ABC):
+    """Maps the data of a stream to fixed-width NumPy records and back.
+
+    Symbols travel as integer ids; the transport provides the mapping (``symbol_id`` when encoding, ``symbol`` when
+    decoding), e.g. the symbol table of a shared-memory ring or the topic of a bus message.
+    """
+
+    dtype: np.dtype
+
+    @abstractmethod
+    def bind(self, stream: AbstractBaseStream, write: RecordSink, symbol_id: Callable[[str], int]):
+        """Producer side: pass the records of everything ``stream`` acquires to ``write``."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode(self, records: np.ndarray, symbol: Callable[[int], str]) -> tuple[list[T], int]:
+        """Consumer side: items encoded in ``records`` and how many records they used (the rest is incomplete)."""
+        raise NotImplementedError
+
+
+class TradeRecordCodec(RecordCodec[Trade]):
+    dtype = TRADE_RECORD
+
+    def encode(self, batch: TradeBatch, symbol_id: Callable[[str], int]) -> np.ndarray:
+        symbol_ids = np.array([symbol_id(symbol) for symbol in batch.symbols], np.int32)
+        records = np.empty(len(batch), TRADE_RECORD)
+        records["timestamp"] = batch.timestamps
+        records["price"] = batch.prices
+        records["amount"] = batch.amounts
+        records["symbol_id"] = symbol_ids[batch.symbol_ids] if len(symbol_ids) else 0
+        records["side"] = batch.sides
+        return records
+
+    def bind(self, stream: AbstractBaseStream, write: RecordSink, symbol_id: Callable[[str], int]):
+        async def write_batch(batch: TradeBatch):
+            write(self.encode(batch, symbol_id))
+
+        async def write_trades(trades: list[Trade]):
+            await write_batch(TradeBatch.from_trades(trades))
+
+        if (signal := getattr(stream, "acquired_trade_batch", None)) is not None:
+            signal.connect(write_batch)
+        else:
+            stream.acquired_batch.connect(write_trades)
+
+    def decode_batch(self, records: np.ndarray, symbol: Callable[[int], str]) -> TradeBatch:
+        symbol_ids = records["symbol_id"]
+        n_symbols = int(symbol_ids.max()) + 1 if len(records) else 0
+        return TradeBatch(
+            timestamps=records["timestamp"],
+            prices=records["price"],
+            amounts=records["amount"],
+            sides=records["side"],
+            symbol_ids=symbol_ids,
+            symbols=tuple(symbol(i) for i in range(n_symbols)),
+        )
+
+    def decode(self, records: np.ndarray, symbol: Callable[[int], str]) -> tuple[list[Trade], int]:
+        return self.decode_batch(records, symbol).to_trades(), len(records)
+
+
+class BookDeltaRecordCodec(RecordCodec[OrderBookDelta]):
+    """One record per changed level; every ``snapshot_every`` deltas of a symbol the full book is sent instead."""
+
+    dtype = BOOK_LEVEL_RECORD
+
+    def __init__(self, snapshot_every: int = 1000):
+        self._snapshot_every = snapshot_every
+        self._counts: dict[str, int] = {}
+
+    def encode(self, delta: OrderBookDelta, symbol_id: Callable[[str], int]) -> np.ndarray:
+        n_bids = len(delta.bids)
+        records = np.zeros(n_bids + len(delta.asks), BOOK_LEVEL_RECORD)
+        if not len(records):
+            return records
+        levels = np.array([*delta.bids, *delta.asks], np.float64)
+        records["timestamp"] = delta.timestamp if delta.timestamp is not None else -1
+        records["nonce"] = delta.nonce if delta.nonce is not None else -1
+        records["price"] = levels[:, 0]
+        records["amount"] = levels[:, 1]
+        records["symbol_id"] = symbol_id(delta.symbol)
+        records["side"][:n_bids] = 1
+        records["side"][n_bids:] = -1
+        records["flags"][-1] = FLAG_END
+        if delta.snapshot:
+            records["flags"] |= FLAG_RESET
+        return records
+
+    def bind(self, stream: AbstractBaseStream, write: RecordSink, symbol_id: Callable[[str], int]):
+        async def write_delta(delta: OrderBookDelta):
+            count = self._counts.get(delta.symbol, 0)
+            self._counts[delta.symbol] = count + 1
+            if count % self._snapshot_every == 0 and hasattr(stream, "book"):
+                snapshot = stream.book(delta.symbol).snapshot()
+                full = OrderBookDelta(delta.symbol, delta.timestamp, snapshot.bids, snapshot.asks, delta.nonce, True)
+                write(self.encode(full, symbol_id))
+            else:
+                write(self.encode(delta, symbol_id))
+
+        stream.acquired.connect(write_delta)
+
+    def decode(self, records: np.ndarray, symbol: Callable[[int], str]) -> tuple[list[OrderBookDelta], int]:
+        ends = np.flatnonzero(records["flags"] & FLAG_END)
+        if not len(ends):
+            return [], 0
+        used = records[: ends[-1] + 1]
+        timestamps, nonces = used["timestamp"].tolist(), used["nonce"].tolist()
+        prices, amounts = used["price"].tolist(), used["amount"].tolist()
+        sides, flags, symbol_ids = used["side"].tolist(), used["flags"].tolist(), used["symbol_id"].tolist()
+        deltas, start = [], 0
+        for end in ends.tolist():
+            bids = [(prices[i], amounts[i]) for i in range(start, end + 1) if sides[i] > 0]
+            asks = [(prices[i], amounts[i]) for i in range(start, end + 1) if sides[i] < 0]
+            delta = OrderBookDelta(
+                symbol=symbol(symbol_ids[end]),
+                timestamp=timestamps[end] if timestamps[end] >= 0 else None,
+                bids=bids,
+                asks=asks,
+                nonce=nonces[end] if nonces[end] >= 0 else None,
+                snapshot=bool(flags[end] & FLAG_RESET),
+            )
+            deltas.append(delta)
+            start = end + 1
+        return deltas, len(used)
+
+
+class OHLCVRecordCodec(RecordCodec[OHLCV]):
+    """Candles; the timeframe is not encoded, so a record stream carries a single timeframe."""
+
+    dtype = OHLCV_RECORD
+
+    def __init__(self, timeframe: str | None = None):
+        self._timeframe = timeframe
+
+    def encode(self, ohlcvs: list[OHLCV], symbol_id: Callable[[str], int]) -> np.ndarray:
+        records = np.empty(len(ohlcvs), OHLCV_RECORD)
+        for i, c in enumerate(ohlcvs):
+            records[i] = (
+                c.timestamp,
+                c.open,
+                c.high,
+                c.low,
+                c.close,
+                c.volume,
+                -1 if c.trades is None else c.trades,
+                symbol_id(c.symbol),
+                -1 if c.closed is None else int(c.closed),
+            )
+        return records
+
+    def bind(self, stream: AbstractBaseStream, write: RecordSink, symbol_id: Callable[[str], int]):
+        async def write_ohlcvs(ohlcvs: list[OHLCV]):
+            write(self.encode(ohlcvs, symbol_id))
+
+        stream.acquired_batch.connect(write_ohlcvs)
+
+    def decode(self, records: np.ndarray, symbol: Callable[[int], str]) -> tuple[list[OHLCV], int]:
+        ohlcvs = [
+            OHLCV(
+                timestamp=ts,
+                open=o,
+                high=h,
+                low=low,
+                close=c,
+                volume=v,
+                trades=None if n < 0 else n,
+                symbol=symbol(symbol_id),
+                timeframe=self._timeframe,
+                closed=None if closed < 0 else bool(closed),
+            )
+            for ts, o, h, low, c, v, n, symbol_id, closed in records.tolist()
+        ]
+        return ohlcvs, len(records)
+
+
+def default_codec(kind: MarketDataKind, timeframe: str | None = None) -> RecordCodec | None:
+    """Record codec of ``kind``; orders are variable-sized and travel as JSON instead (``None``)."""
+    match kind:
+        case MarketDataKind.trade:
+            return TradeRecordCodec()
+        case MarketDataKind.book:
+            return BookDeltaRecordCodec()
+        case MarketDataKind.ohlcv:
+            return OHLCVRecordCodec(timeframe)
+    return None
@@ -1,5 +1,6 @@
 import asyncio
 from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from typing import TYPE_CHECKING
 
 from firengine.features.stream.base_stream import AbstractBaseStream
@@ -13,26 +14,52 @@ if TYPE_CHECKING:
 SupportDataType = OHLCV | Trade
 
 
-class OHLCVReplayStream(AbstractBaseStream[OHLCV]):
+class BaseReplayStream[T: SupportDataType](AbstractBaseStream[T]):
+    """Items of type ``dtype`` replayed by a ``MarketReplayer``, dispatched in the replayer's batches.
+
+    Symbols must be added before the replay starts. The stream stops once the replay ends.
+    """
+
+    dtype: type[T]
+    event_time_from_item = False
+
     def __init__(self, replayer: "MarketReplayer"):
         super().__init__()
         self._replayer = replayer
 
+    @property
+    def replayer(self) -> "MarketReplayer":
+        return self._replayer
+
     def add_symbol(self, symbol: str):
         if symbol not in self._symbols:
-            self._replayer.add_subscriber(symbol, OHLCV)
+            self._replayer.add_subscriber(symbol, self.dtype)
         super().add_symbol(symbol)
 
-    async def _generate(self) -> AsyncGenerator[OHLCV]:
-        while True:
-            if symbol := next(iter(self._symbols), None):
-                async with self._replayer.watch_data_point(symbol, dtype=OHLCV) as points:
-                    for point in points:
-                        print(point)
-                        yield point
+    async def _generate(self) -> AsyncGenerator[T]:
+        async for batch in self._generate_batch():
+            for item in batch:
+                yield item
+
+    async def _generate_batch(self) -> AsyncGenerator[list[T]]:
+        # Closed with this generator, so the replayer stops waiting on the stream once it stops
+        async with aclosing(self._replayer.watch(self.dtype)) as batches:
+            async for batch in batches:
+                yield batch
+        self.stop()
+        yield []
+
+
+class OHLCVReplayStream(BaseReplayStream[OHLCV]):
+    dtype = OHLCV
+
+
+class TradeReplayStream(BaseReplayStream[Trade]):
+    dtype = Trade
 
 
 async def main():
+    from firengine.features.data_handler import PrintDataHandler
     from firengine.features.market_simulator.replayer import MarketReplayer, TimeSeriesMarketData
 
     symbols = ["XBTUSD"]
@@ -42,15 +69,14 @@ async def main():
     replayer = MarketReplayer(ts_data=ts_data, speedup=60.0)
     stream = OHLCVReplayStream(replayer=replayer)
     stream.add_symbol("XBTUSD")
+    stream.acquired.connect(PrintDataHandler().handle)
 
-    asyncio.create_task(stream.run())
-    task1 = asyncio.create_task(replayer.run())
+    await asyncio.gather(stream.run(), replayer.run())
 
-    await asyncio.wait([task1])
 
-if __name__ == '__main__':
+if __name__ == "__main__":
     import sys
 
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import multiprocessing as mp
+from collections.abc import AsyncGenerator, Callable, Sequence
+from typing import Literal
+
+import numpy as np
+
+from firengine.features.order_book.l2_book import L2OrderBook
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.features.stream.record_codec import BookDeltaRecordCodec, RecordCodec
+from firengine.lib.com.shm_ring import ShmRingBuffer
+from firengine.model.data_model import OrderBookDelta
+
+logger = logging.getLogger(__name__)
+
+
+async def _publish(stream: AbstractBaseStream, stop_event):
+    task = asyncio.create_task(stream.run())
+    while not stop_event.is_set() and not task.done():
+        await asyncio.sleep(0.1)
+    stream.stop()
+    if not task.done():
+        task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    if close := getattr(stream, "close", None):
+        await close()
+
+
+def _publish_in_worker(
+    stream_factory: Callable[[], AbstractBaseStream],
+    codec: RecordCodec,
+    ring_name: str,
+    symbols: Sequence[str],
+    stop_event,
+):
+    ring = ShmRingBuffer.attach(ring_name, codec.dtype)
+    try:
+        stream = stream_factory()
+        for symbol in symbols:
+            stream.add_symbol(symbol)
+        codec.bind(stream, ring.write, ring.symbol_id)
+        asyncio.run(_publish(stream, stop_event))
+    finally:
+        ring.close()
+
+
+class ShmStreamPublisher:
+    """Runs a stream in a worker process and publishes what it acquires into a shared-memory ring.
+
+    The ring is created and owned by this object; consumers in any process attach to it by ``ring_name`` with a
+    ``ShmRingStream``. ``stream_factory`` is called in the worker (exchanges cannot be pickled), so it must be a
+    picklable callable such as ``functools.partial(TradeStream.from_supported_exchange, SupportedExchange.kraken)``.
+    """
+
+    def __init__(
+        self,
+        stream_factory: Callable[[], AbstractBaseStream],
+        codec: RecordCodec,
+        symbols: Sequence[str],
+        capacity: int = 1 << 16,
+        name: str | None = None,
+    ):
+        self._stream_factory = stream_factory
+        self._codec = codec
+        self._symbols = list(symbols)
+        self._ring = ShmRingBuffer.create(codec.dtype, capacity, name)
+        for symbol in self._symbols:
+            # Registered here so that symbol ids do not depend on the arrival order of the data
+            self._ring.symbol_id(symbol)
+        ctx = mp.get_context("spawn")
+        self._stop_event = ctx.Event()
+        self._process = ctx.Process(
+            target=_publish_in_worker,
+            args=(stream_factory, codec, self._ring.name, self._symbols, self._stop_event),
+            name=f"shm-publisher-{self._ring.name}",
+            daemon=True,
+        )
+
+    @property
+    def ring_name(self) -> str:
+        return self._ring.name
+
+    @property
+    def ring(self) -> ShmRingBuffer:
+        return self._ring
+
+    def start(self):
+        self._process.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        if self._process.pid is not None:
+            self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+
+    def close(self):
+        self._ring.close()
+        self._ring.unlink()
+
+
+class ShmRingStream[T](AbstractBaseStream[T]):
+    """Consumer side of a ``ShmStreamPublisher``: emits the published items through the usual stream signals.
+
+    The ring is polled with an adaptive backoff: a few bare loop yields after data, then sleeps doubling from
+    ``min_sleep`` up to ``max_sleep`` while it stays empty. Only symbols added with ``add_symbol`` are emitted, or all
+    of them if none was added.
+    """
+
+    def __init__(
+        self,
+        ring_name: str,
+        codec: RecordCodec[T],
+        start: Literal["latest", "oldest"] = "latest",
+        min_sleep: float = 50e-6,
+        max_sleep: float = 5e-3,
+        max_records: int = 4096,
+    ):
+        super().__init__()
+        self._ring = ShmRingBuffer.attach(ring_name, codec.dtype)
+        self._reader = self._ring.reader(start)
+        self._codec = codec
+        self._min_sleep = min_sleep
+        self._max_sleep = max_sleep
+        self._max_records = max_records
+        self._pending = np.empty(0, codec.dtype)
+
+    @property
+    def lost(self) -> int:
+        return self._reader.lost
+
+    def _on_lost(self, missed: int):
+        logger.warning("Consumer of %s was overrun, %d records lost", self._ring.name, missed)
+        self._pending = self._pending[:0]
+
+    def _accept(self, items: list[T]) -> list[T]:
+        if not self._symbols:
+            return items
+        return [item for item in items if item.symbol in self._symbols]
+
+    async def _generate(self) -> AsyncGenerator[T, None, None]:
+        async for items in self._generate_batch():
+            for item in items:
+                yield item
+
+    async def _generate_batch(self) -> AsyncGenerator[list[T], None, None]:
+        idle = 0
+        sleep = 0.0
+        while True:
+            lost = self._reader.lost
+            records = self._reader.read(self._max_records)
+            if self._reader.lost != lost:
+                self._on_lost(self._reader.lost - lost)
+            if len(records):
+                idle, sleep = 0, 0.0
+                if len(self._pending):
+                    records = np.concatenate((self._pending, records))
+                items, used = self._codec.decode(records, self._ring.symbol)
+                self._pending = records[used:]
+                yield self._accept(items)
+                continue
+            idle += 1
+            if idle > 3:
+                sleep = min(max(sleep * 2, self._min_sleep), self._max_sleep)
+            await asyncio.sleep(sleep)
+            yield []
+
+    async def close(self):
+        self._ring.close()
+
+
+class ShmOrderBookStream(ShmRingStream[OrderBookDelta]):
+    """Order book deltas from a ring, maintaining the books like ``OrderBookStream`` so ``book(symbol)`` works.
+
+    A book is stale until its first full snapshot, as the reader may join mid-stream, and every book becomes stale
+    again when the reader is overrun; deltas of a stale book are dropped until the publisher's next snapshot.
+    """
+
+    def __init__(self, ring_name: str, depth: int | None = None, **kwargs):
+        super().__init__(ring_name, BookDeltaRecordCodec(), **kwargs)
+        self._depth = depth
+        self._books: dict[str, L2OrderBook] = {}
+        self._stale: set[str] = set()
+
+    @property
+    def stale(self) -> set[str]:
+        """Symbols whose book is waiting for a snapshot."""
+        return self._stale
+
+    def book(self, symbol: str) -> L2OrderBook:
+        if (book := self._books.get(symbol)) is None:
+            book = self._books[symbol] = L2OrderBook(symbol, self._depth)
+            # Nothing is known about a book until its first snapshot
+            self._stale.add(symbol)
+        return book
+
+    def _on_lost(self, missed: int):
+        super()._on_lost(missed)
+        # The lost records may belong to any symbol
+        self._stale.update(self._books)
+
+    def _accept(self, items: list[OrderBookDelta]) -> list[OrderBookDelta]:
+        deltas = []
+        for delta in super()._accept(items):
+            book = self.book(delta.symbol)
+            if delta.snapshot:
+                book.bids.clear()
+                book.asks.clear()
+                self._stale.discard(delta.symbol)
+            elif delta.symbol in self._stale:
+                continue
+            book.apply_delta(delta)
+            deltas.append(delta)
+        return deltas
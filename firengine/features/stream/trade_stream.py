@@ -1,36 +1,76 @@
 import asyncio
+import time
 from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING
 
 from firengine.features.stream.base_stream import BaseExchangeStream
+from firengine.lib.com.signal import AsyncSignal
+from firengine.model.batch_model import TradeBatch
 from firengine.model.data_model import Trade
 
+if TYPE_CHECKING:
+    from ccxt.pro import Exchange
+
 
 class TradeStream(BaseExchangeStream[Trade]):
-    # def __init__(self, exchange: Exchange):
-    #     super().__init__(exchange)
+    def __init__(self, exchange: "Exchange", *args, **kwargs):
+        super().__init__(exchange, *args, **kwargs)
+        self._trade_batch_signal = AsyncSignal[TradeBatch]()
+
+    @property
+    def acquired_trade_batch(self) -> AsyncSignal[TradeBatch]:
+        """Columnar batch per exchange message; ``Trade`` objects are only built when other signals are connected."""
+        return self._trade_batch_signal
 
     async def _generate(self) -> AsyncGenerator[Trade, None, None]:
-        while True:
-            dicts = await self._exchange.watch_trades_for_symbols(list(self._symbols))
-            for d in dicts:
-                trade = Trade.from_kwargs(**d)
+        async for trades in self._generate_batch():
+            for trade in trades:
                 yield trade
 
+    async def _generate_batch(self) -> AsyncGenerator[list[Trade], None, None]:
+        from ccxt.base.errors import NetworkError
+
+        while True:
+            try:
+                dicts = await self._exchange.watch_trades_for_symbols(list(self._symbols))
+            except NetworkError as err:
+                await self._reconnect_after(err)
+                yield []
+                continue
+            received_ns = self._mark_received()
+            if self._has_consumers():
+                if self._trade_batch_signal.has_handlers:
+                    await self._trade_batch_signal.emit(TradeBatch.from_ccxt(dicts))
+                # Counted and latency recorded by ``run`` as the trades are dispatched
+                yield [Trade.from_dict(d) for d in dicts]
+            elif self._trade_batch_signal.has_handlers:
+                batch = TradeBatch.from_ccxt(dicts)
+                await self._trade_batch_signal.emit(batch)
+                self._record_batch(batch, received_ns, time.time_ns())
+                yield []
+            else:
+                yield []
+
+    def _record_batch(self, batch: TradeBatch, received_ns: int, handled_ns: int):
+        """Count and record the latency of trades only handled as a columnar batch, which ``run`` does not see."""
+        for symbol, trades in batch.split_by_symbol().items():
+            self._count_events(symbol, len(trades))
+            if self._latency is not None:
+                self._latency.record_array(symbol, trades.timestamps, received_ns, handled_ns)
+
 
-async def main():
+def main():
     from firengine.features.data_handler import PrintDataHandler
+    from firengine.features.engine.runner import EngineRunner
     from firengine.lib.fire_enum import SupportedExchange
 
     handler = PrintDataHandler[Trade]()
-    stream = TradeStream.from_supported_exchange(SupportedExchange.cryptocom)
+    runner = EngineRunner()
+    stream = runner.add_stream(TradeStream.from_supported_exchange(SupportedExchange.cryptocom))
     stream.acquired.connect(handler.handle)
     stream.add_symbol("BTC/USD")
     stream.add_symbol("ETH/USD")
-    task = asyncio.create_task(stream.run())
-    await asyncio.sleep(20)
-    stream.stop()
-    await asyncio.wait_for(task, timeout=None)
-    await stream.close()
+    runner.run(duration=20)
 
 
 if __name__ == "__main__":
@@ -38,4 +78,4 @@ if __name__ == "__main__":
 
     if sys.platform == "win32":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(main())
+    main()
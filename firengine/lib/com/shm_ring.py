@@ -0,0 +1,189 @@
+from multiprocessing.shared_memory import SharedMemory
+from typing import Literal, Self
+
+import numpy as np
+
+MAX_SYMBOLS = 1024
+SYMBOL_BYTES = 32
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("write_seq", np.uint64),
+        ("writing_seq", np.uint64),
+        ("capacity", np.uint64),
+        ("itemsize", np.uint64),
+        ("n_symbols", np.uint64),
+        ("symbols", f"S{SYMBOL_BYTES}", (MAX_SYMBOLS,)),
+    ],
+    align=True,
+)
+
+
+class ShmRingBuffer:
+    """Single-producer, multi-consumer ring of fixed-width NumPy records in ``multiprocessing.shared_memory``.
+
+    The block holds a header (write sequence, capacity, record size and a symbol table) followed by ``capacity``
+    records. Like a seqlock, the producer first claims the slots of a write in ``writing_seq``, copies the records into
+    them and then publishes the new ``write_seq``; each consumer keeps its own read sequence (see ``ShmRingReader``)
+    and checks ``writing_seq`` after copying, so consumers never block the producer nor each other and never return
+    slots a write had started to overwrite. Slow consumers are overrun and told how many records they lost. Header fields are aligned 8-byte words, which x86-64
+    and ARM64 store and load atomically.
+    """
+
+    def __init__(self, shm: SharedMemory, dtype: np.dtype, owner: bool):
+        self._shm = shm
+        self._dtype = np.dtype(dtype)
+        self._owner = owner
+        self._header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        if owner:
+            self._header["itemsize"] = self._dtype.itemsize
+        elif self._header["itemsize"] != self._dtype.itemsize:
+            raise ValueError(f"record size {self._dtype.itemsize} does not match the ring's {self._header['itemsize']}")
+        self._capacity = int(self._header["capacity"])
+        self._records = np.ndarray((self._capacity,), self._dtype, buffer=shm.buf, offset=HEADER_DTYPE.itemsize)
+        self._symbols: list[str] = []
+        self._symbol_ids: dict[str, int] = {}
+
+    @classmethod
+    def create(cls, dtype: np.dtype, capacity: int, name: str | None = None) -> Self:
+        size = HEADER_DTYPE.itemsize + np.dtype(dtype).itemsize * capacity
+        shm = SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        header["write_seq"] = 0
+        header["writing_seq"] = 0
+        header["capacity"] = capacity
+        header["n_symbols"] = 0
+        return cls(shm, dtype, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, dtype: np.dtype) -> Self:
+        return cls(SharedMemory(name=name, track=False), dtype, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def write_seq(self) -> int:
+        return int(self._header["write_seq"])
+
+    @property
+    def writing_seq(self) -> int:
+        """End of the write in progress (``write_seq`` between writes): slots below ``writing_seq - capacity`` may
+        already hold newer records."""
+        return int(self._header["writing_seq"])
+
+    def symbol_id(self, symbol: str) -> int:
+        """Id of ``symbol`` in the shared symbol table, registering it if needed (producer side)."""
+        if (symbol_id := self._symbol_ids.get(symbol)) is not None:
+            return symbol_id
+        self._refresh_symbols()
+        if (symbol_id := self._symbol_ids.get(symbol)) is not None:
+            return symbol_id
+        symbol_id = len(self._symbols)
+        if symbol_id >= MAX_SYMBOLS:
+            raise ValueError(f"symbol table is full ({MAX_SYMBOLS} symbols)")
+        self._header["symbols"][symbol_id] = symbol.encode()
+        self._header["n_symbols"] = symbol_id + 1
+        self._symbols.append(symbol)
+        self._symbol_ids[symbol] = symbol_id
+        return symbol_id
+
+    def symbol(self, symbol_id: int) -> str:
+        if symbol_id >= len(self._symbols):
+            self._refresh_symbols()
+        return self._symbols[symbol_id]
+
+    def _refresh_symbols(self):
+        n_symbols = int(self._header["n_symbols"])
+        for symbol_id in range(len(self._symbols), n_symbols):
+            symbol = self._header["symbols"][symbol_id].decode()
+            self._symbols.append(symbol)
+            self._symbol_ids[symbol] = symbol_id
+
+    def write(self, records: np.ndarray):
+        """Append records (producer side); only the last ``capacity`` records of an oversized write are kept."""
+        n = len(records)
+        if not n:
+            return
+        seq = int(self._header["write_seq"])
+        capacity = self._capacity
+        if n > capacity:
+            seq += n - capacity
+            records, n = records[-capacity:], capacity
+        start = seq % capacity
+        first = min(n, capacity - start)
+        # Claim the slots before overwriting them, so readers copying them notice
+        self._header["writing_seq"] = seq + n
+        self._records[start : start + first] = records[:first]
+        if first < n:
+            self._records[: n - first] = records[first:]
+        self._header["write_seq"] = seq + n
+
+    def reader(self, start: Literal["latest", "oldest"] = "latest") -> "ShmRingReader":
+        return ShmRingReader(self, start)
+
+    def close(self):
+        # Views into the buffer must be released before the mapping can be closed
+        self._header = self._records = None
+        self._shm.close()
+
+    def unlink(self):
+        if self._owner:
+            self._shm.unlink()
+
+
+class ShmRingReader:
+    """Read cursor of one consumer on a ``ShmRingBuffer``."""
+
+    def __init__(self, ring: ShmRingBuffer, start: Literal["latest", "oldest"] = "latest"):
+        self._ring = ring
+        write_seq = ring.write_seq
+        self._seq = write_seq if start == "latest" else max(write_seq - ring.capacity, 0)
+        self._lost = 0
+
+    @property
+    def lost(self) -> int:
+        """Records overwritten by the producer before this reader got to them."""
+        return self._lost
+
+    @property
+    def lag(self) -> int:
+        return self._ring.write_seq - self._seq
+
+    def read(self, max_records: int | None = None) -> np.ndarray:
+        """Copy out the records published since the last read, oldest first (one ``memcpy`` per contiguous run)."""
+        ring = self._ring
+        capacity = ring.capacity
+        write_seq = ring.write_seq
+        seq = self._seq
+        if write_seq - seq > capacity:
+            self._lost += write_seq - capacity - seq
+            seq = write_seq - capacity
+        n = write_seq - seq
+        if max_records is not None:
+            n = min(n, max_records)
+        if n <= 0:
+            return np.empty(0, ring.dtype)
+        start = seq % capacity
+        first = min(n, capacity - start)
+        records = ring._records
+        if first == n:
+            out = records[start : start + n].copy()
+        else:
+            out = np.concatenate((records[start:], records[: n - first]))
+        # Slots a write claimed while (or before) copying may hold newer or torn records, drop them
+        overwritten = ring.writing_seq - capacity - seq
+        if overwritten > 0:
+            self._lost += min(overwritten, n)
+            out = out[overwritten:]
+        self._seq = seq + n
+        return out
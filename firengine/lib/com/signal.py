@@ -1,6 +1,8 @@
 import asyncio
+import inspect
 from collections.abc import Awaitable, Callable
-from datetime import datetime
+
+from firengine.lib.fire_enum import DispatchMode
 
 
 class Signal[T]:
@@ -19,17 +21,78 @@ class Signal[T]:
 
 
 class AsyncSignal[T]:
-    def __init__(self):
-        self._handlers: list[Callable[[T], Awaitable]] = []
+    """Signal whose handlers are dispatched according to a ``DispatchMode``.
 
-    async def emit(self, value: T):
-        print(datetime.now(), value)
-        async with asyncio.TaskGroup() as tg:
+    - ``concurrent``: one task per handler inside a ``TaskGroup`` (handlers run concurrently).
+    - ``inline``: handlers are awaited one after another on the emitting task, no task is created.
+    - ``direct``: handlers are plain callables and are called synchronously.
+
+    ``debug_hook`` is called with every emitted value before dispatch, e.g. ``firengine.lib.logger.debug_logger.debug``.
+    """
+
+    def __init__(
+        self,
+        mode: DispatchMode = DispatchMode.concurrent,
+        debug_hook: Callable[[T], None] | None = None,
+    ):
+        self._handlers: list[Callable[[T], Awaitable | None]] = []
+        self._snapshot: tuple[Callable[[T], Awaitable | None], ...] = ()
+        self._mode = DispatchMode(mode)
+        self._debug_hook = debug_hook
+
+    @property
+    def mode(self) -> DispatchMode:
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode: DispatchMode):
+        mode = DispatchMode(mode)
+        if mode is DispatchMode.direct:
             for handler in self._handlers:
-                tg.create_task(handler(value))
+                self._check_direct_handler(handler)
+        self._mode = mode
 
-    def connect(self, func: Callable[[T], Awaitable]):
+    @property
+    def has_handlers(self) -> bool:
+        return bool(self._snapshot)
+
+    def set_debug_hook(self, hook: Callable[[T], None] | None):
+        self._debug_hook = hook
+
+    async def emit(self, value: T):
+        if self._debug_hook is not None:
+            self._debug_hook(value)
+        handlers = self._snapshot
+        if not handlers:
+            return
+        mode = self._mode
+        if mode is DispatchMode.direct:
+            for handler in handlers:
+                handler(value)
+        elif mode is DispatchMode.inline:
+            for handler in handlers:
+                await handler(value)
+        else:
+            async with asyncio.TaskGroup() as tg:
+                for handler in handlers:
+                    tg.create_task(handler(value))
+
+    def connect(self, func: Callable[[T], Awaitable | None]):
+        if self._mode is DispatchMode.direct:
+            self._check_direct_handler(func)
         self._handlers.append(func)
+        self._snapshot = tuple(self._handlers)
+
+    def disconnect(self, func: Callable[[T], Awaitable | None]):
+        if func in self._handlers:
+            self._handlers.remove(func)
+            self._snapshot = tuple(self._handlers)
 
     def disconnect_all(self):
         self._handlers.clear()
+        self._snapshot = ()
+
+    @staticmethod
+    def _check_direct_handler(func: Callable):
+        if inspect.iscoroutinefunction(func):
+            raise TypeError(f"{func!r} is a coroutine function and cannot be dispatched in direct mode")
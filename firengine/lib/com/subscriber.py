@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+
+from firengine.lib.fire_enum import OverflowPolicy
+
+logger = logging.getLogger(__name__)
+
+
+def symbol_key(item) -> Hashable:
+    return getattr(item, "symbol", None)
+
+
+class OverflowQueue[T]:
+    """Bounded queue applying an ``OverflowPolicy`` when full.
+
+    - ``block``: ``put`` waits for free space.
+    - ``drop_oldest``: the oldest queued item is discarded to make room.
+    - ``drop_newest``: the incoming item is discarded.
+    - ``conflate``: only the latest item per ``key`` is kept; ``maxsize`` bounds the number of distinct keys.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        policy: OverflowPolicy = OverflowPolicy.block,
+        key: Callable[[T], Hashable] = symbol_key,
+    ):
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._policy = OverflowPolicy(policy)
+        self._key = key
+        self._latest: dict[Hashable, T] = {}
+        self._dropped = 0
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        return self._policy
+
+    @property
+    def maxsize(self) -> int:
+        return self._queue.maxsize
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def put(self, item: T):
+        if self._policy is OverflowPolicy.block:
+            await self._queue.put(item)
+        else:
+            self.put_nowait(item)
+
+    def put_nowait(self, item: T):
+        queue = self._queue
+        match self._policy:
+            case OverflowPolicy.drop_newest:
+                if queue.full():
+                    self._dropped += 1
+                else:
+                    queue.put_nowait(item)
+            case OverflowPolicy.drop_oldest:
+                if queue.full():
+                    queue.get_nowait()
+                    self._dropped += 1
+                queue.put_nowait(item)
+            case OverflowPolicy.conflate:
+                key = self._key(item)
+                if key in self._latest:
+                    self._latest[key] = item
+                    self._dropped += 1
+                    return
+                if queue.full():
+                    self._latest.pop(queue.get_nowait(), None)
+                    self._dropped += 1
+                self._latest[key] = item
+                queue.put_nowait(key)
+            case _:
+                queue.put_nowait(item)
+
+    async def get(self) -> T:
+        item = await self._queue.get()
+        if self._policy is OverflowPolicy.conflate:
+            return self._latest.pop(item)
+        return item
+
+
+@dataclass(slots=True)
+class SubscriberStats:
+    name: str
+    policy: OverflowPolicy
+    depth: int
+    maxsize: int
+    dropped: int
+    processed: int
+
+
+class QueuedSubscriber[T]:
+    """Handler fed from its own ``OverflowQueue`` by a dedicated consumer task."""
+
+    def __init__(
+        self,
+        handler: Callable[[T], Awaitable],
+        maxsize: int = 1024,
+        policy: OverflowPolicy = OverflowPolicy.block,
+        key: Callable[[T], Hashable] = symbol_key,
+        name: str | None = None,
+    ):
+        self._handler = handler
+        self._queue = OverflowQueue[T](maxsize, policy, key)
+        self._name = name or getattr(handler, "__qualname__", repr(handler))
+        self._processed = 0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def dropped(self) -> int:
+        return self._queue.dropped
+
+    @property
+    def processed(self) -> int:
+        return self._processed
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def put(self, item: T):
+        await self._queue.put(item)
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._consume(), name=f"subscriber-{self._name}")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> SubscriberStats:
+        return SubscriberStats(
+            name=self._name,
+            policy=self._queue.policy,
+            depth=self._queue.qsize(),
+            maxsize=self._queue.maxsize,
+            dropped=self._queue.dropped,
+            processed=self._processed,
+        )
+
+    async def _consume(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._handler(item)
+            except Exception:
+                logger.exception("Subscriber %s failed to handle %r", self._name, item)
+            self._processed += 1
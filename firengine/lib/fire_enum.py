@@ -54,3 +54,40 @@ class EventType(StrEnum):
 
 class Currency(StrEnum):
     pass
+
+
+class DispatchMode(StrEnum):
+    concurrent = auto()
+    inline = auto()
+    direct = auto()
+
+
+class OverflowPolicy(StrEnum):
+    block = auto()
+    drop_oldest = auto()
+    drop_newest = auto()
+    conflate = auto()
+
+
+class MarketDataKind(StrEnum):
+    trade = auto()
+    book = auto()
+    ohlcv = auto()
+    order = auto()
+
+
+class LatencyKind(StrEnum):
+    exchange = auto()  # exchange event time to local receive time
+    processing = auto()  # receive time to handler completion
+    end_to_end = auto()  # exchange event time to handler completion
+
+
+class MetricKind(StrEnum):
+    counter = auto()
+    gauge = auto()
+    summary = auto()
+
+
+class JournalFormat(StrEnum):
+    parquet = auto()
+    ipc = auto()  # Arrow IPC (Feather v2)
@@ -0,0 +1,125 @@
+from collections.abc import Iterable
+from itertools import accumulate
+from math import ceil
+
+import numpy as np
+
+
+class LogHistogram:
+    """HDR-style histogram of non-negative integers (e.g. latencies in microseconds).
+
+    Values below ``2 ** sub_bucket_bits`` get a bucket each; above, every power of two is split into
+    ``2 ** (sub_bucket_bits - 1)`` equal buckets, so a value is known within a relative error of
+    ``2 ** (1 - sub_bucket_bits)`` (under 1.6% by default) at any magnitude. Values above ``max_value`` are clamped.
+    Recording is a few integer operations and a list increment.
+    """
+
+    __slots__ = ("_sub_bits", "_sub_count", "_half", "_max_value", "_counts", "_count", "_total", "_min", "_max")
+
+    def __init__(self, sub_bucket_bits: int = 7, max_value: int = 2**40):
+        self._sub_bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._half = self._sub_count >> 1
+        self._max_value = max_value
+        self._counts = [0] * (self._index(max_value) + 1)
+        self._count = 0
+        self._total = 0
+        self._min: int | None = None
+        self._max: int | None = None
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def min(self) -> int | None:
+        return self._min
+
+    @property
+    def max(self) -> int | None:
+        return self._max
+
+    @property
+    def mean(self) -> float | None:
+        return self._total / self._count if self._count else None
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        return self._sub_count + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Largest value counted in bucket ``index``."""
+        if index < self._sub_count:
+            return index
+        shift, offset = divmod(index - self._sub_count, self._half)
+        shift += 1
+        return ((offset + self._half + 1) << shift) - 1
+
+    def record(self, value: int, count: int = 1):
+        value = min(max(value, 0), self._max_value)
+        self._counts[self._index(value)] += count
+        self._count += count
+        self._total += value * count
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def record_array(self, values: np.ndarray):
+        if not len(values):
+            return
+        values = np.clip(values.astype(np.int64, copy=False), 0, self._max_value)
+        # ``frexp`` exponent is the bit length (exact below 2**53)
+        shifts = np.maximum(np.frexp(values.astype(np.float64))[1] - self._sub_bits, 0)
+        indices = np.where(
+            shifts == 0,
+            values,
+            self._sub_count + (shifts - 1) * self._half + (values >> shifts) - self._half,
+        )
+        counts = self._counts
+        bincount = np.bincount(indices)
+        for index in np.flatnonzero(bincount).tolist():
+            counts[index] += int(bincount[index])
+        self._count += len(values)
+        self._total += int(values.sum())
+        lo, hi = int(values.min()), int(values.max())
+        self._min = lo if self._min is None else min(self._min, lo)
+        self._max = hi if self._max is None else max(self._max, hi)
+
+    def percentiles(self, qs: Iterable[float]) -> list[int | None]:
+        """Value at each percentile in ``qs`` (0-100): the largest value equivalent to the one at that rank, within
+        the recorded range."""
+        qs = list(qs)
+        if not self._count:
+            return [None] * len(qs)
+        results = []
+        cumulative = list(accumulate(self._counts))
+        for q in qs:
+            # The epsilon keeps e.g. 99.9% of 50000 at rank 49950 despite float rounding
+            rank = max(1, ceil(q * self._count / 100 - 1e-9))
+            index = int(np.searchsorted(cumulative, rank))
+            results.append(max(min(self._highest_equivalent(index), self._max), self._min))
+        return results
+
+    def percentile(self, q: float) -> int | None:
+        return self.percentiles((q,))[0]
+
+    def merge(self, other: "LogHistogram"):
+        if (other._sub_bits, other._max_value) != (self._sub_bits, self._max_value):
+            raise ValueError("Cannot merge histograms of different layouts")
+        self._counts = [a + b for a, b in zip(self._counts, other._counts, strict=True)]
+        self._count += other._count
+        self._total += other._total
+        for value in (other._min, other._max):
+            if value is not None:
+                self._min = value if self._min is None else min(self._min, value)
+                self._max = value if self._max is None else max(self._max, value)
+
+    def reset(self):
+        self._counts = [0] * len(self._counts)
+        self._count = 0
+        self._total = 0
+        self._min = None
+        self._max = None
@@ -0,0 +1,158 @@
+import weakref
+from dataclasses import asdict, dataclass
+from typing import ClassVar, Self
+
+import numpy as np
+
+from firengine.lib.fire_enum import LatencyKind
+from firengine.lib.metrics.histogram import LogHistogram
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+_KIND_INDEX = {kind: i for i, kind in enumerate(LatencyKind)}
+
+
+@dataclass(frozen=True, slots=True)
+class LatencySummary:
+    """Percentiles of one latency histogram, in microseconds."""
+
+    stream: str
+    symbol: str
+    kind: LatencyKind
+    count: int
+    mean: float | None
+    max: int | None
+    percentiles: dict[float, int | None]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class StreamLatency:
+    """Latency histograms of one stream, per symbol and ``LatencyKind``.
+
+    Each item contributes three timestamps: its exchange event time (``timestamp``, in ms), when the stream received
+    it and when the handlers of ``acquired`` were done with it (both wall-clock ns). Items without an event time only
+    contribute to ``processing``. Timestamps are buffered as recorded and bucketed with NumPy every ``flush_size``
+    items or when queried, keeping the cost per item to a few list appends.
+    """
+
+    def __init__(self, name: str, sub_bucket_bits: int = 7, flush_size: int = 4096):
+        self.name = name
+        self._sub_bucket_bits = sub_bucket_bits
+        self._flush_size = flush_size
+        self._histograms: dict[str, tuple[LogHistogram, LogHistogram, LogHistogram]] = {}
+        self._symbols: list[str] = []
+        self._events: list[int | None] = []
+        self._received: list[int] = []
+        self._handled: list[int] = []
+
+    @property
+    def symbols(self) -> list[str]:
+        self.flush()
+        return list(self._histograms)
+
+    def _symbol_histograms(self, symbol: str) -> tuple[LogHistogram, LogHistogram, LogHistogram]:
+        if (histograms := self._histograms.get(symbol)) is None:
+            histograms = self._histograms[symbol] = tuple(LogHistogram(self._sub_bucket_bits) for _ in LatencyKind)
+        return histograms
+
+    def histogram(self, symbol: str, kind: LatencyKind) -> LogHistogram:
+        self.flush()
+        return self._symbol_histograms(symbol)[_KIND_INDEX[kind]]
+
+    def record(self, symbol: str, event_ms: int | None, received_ns: int, handled_ns: int):
+        self._symbols.append(symbol)
+        self._events.append(event_ms)
+        self._received.append(received_ns)
+        self._handled.append(handled_ns)
+        if len(self._handled) >= self._flush_size:
+            self.flush()
+
+    def record_batch(self, symbols: list[str], event_ms: list[int | None], received_ns: int, handled_ns: list[int]):
+        """Record items received together, ``handled_ns`` holding when each was done."""
+        self._symbols += symbols
+        self._events += event_ms
+        self._received += [received_ns] * len(handled_ns)
+        self._handled += handled_ns
+        if len(self._handled) >= self._flush_size:
+            self.flush()
+
+    def record_array(self, symbol: str, event_ms: np.ndarray, received_ns: int, handled_ns: int):
+        """Record items of ``symbol`` received and handled together, bypassing the buffer."""
+        exchange, processing, end_to_end = self._symbol_histograms(symbol)
+        event_us = event_ms.astype(np.int64) * 1000
+        exchange.record_array(received_ns // 1000 - event_us)
+        end_to_end.record_array(handled_ns // 1000 - event_us)
+        processing.record((handled_ns - received_ns) // 1000, len(event_ms))
+
+    def flush(self):
+        if not self._handled:
+            return
+        ids: dict[str, int] = {}
+        symbol_ids = np.array([ids.setdefault(symbol, len(ids)) for symbol in self._symbols])
+        # Missing event times become NaN; ms timestamps are exact in float64
+        events = np.array(self._events, np.float64)
+        received_us = np.array(self._received, np.int64) // 1000
+        handled_us = np.array(self._handled, np.int64) // 1000
+        self._symbols, self._events, self._received, self._handled = [], [], [], []
+        for symbol, i in ids.items():
+            exchange, processing, end_to_end = self._symbol_histograms(symbol)
+            mask = symbol_ids == i if len(ids) > 1 else np.ones(len(symbol_ids), bool)
+            processing.record_array(handled_us[mask] - received_us[mask])
+            mask &= ~np.isnan(events)
+            event_us = events[mask].astype(np.int64) * 1000
+            exchange.record_array(received_us[mask] - event_us)
+            end_to_end.record_array(handled_us[mask] - event_us)
+
+    def summaries(self, percentiles: tuple[float, ...] = DEFAULT_PERCENTILES) -> list[LatencySummary]:
+        self.flush()
+        summaries = []
+        for symbol, histograms in self._histograms.items():
+            for kind, histogram in zip(LatencyKind, histograms, strict=True):
+                if not histogram.count:
+                    continue
+                values = histogram.percentiles(percentiles)
+                summaries.append(
+                    LatencySummary(
+                        stream=self.name,
+                        symbol=symbol,
+                        kind=kind,
+                        count=histogram.count,
+                        mean=histogram.mean,
+                        max=histogram.max,
+                        percentiles=dict(zip(percentiles, values, strict=True)),
+                    )
+                )
+        return summaries
+
+    def reset(self):
+        self._histograms.clear()
+        self._symbols, self._events, self._received, self._handled = [], [], [], []
+
+
+class LatencyRegistry:
+    """Every live ``StreamLatency`` of the process, for querying and exporting; streams register themselves."""
+
+    _default: ClassVar[Self | None] = None
+
+    def __init__(self):
+        self._latencies: weakref.WeakSet[StreamLatency] = weakref.WeakSet()
+
+    @classmethod
+    def default(cls) -> Self:
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def register(self, latency: StreamLatency):
+        self._latencies.add(latency)
+
+    def unregister(self, latency: StreamLatency):
+        self._latencies.discard(latency)
+
+    @property
+    def latencies(self) -> list[StreamLatency]:
+        return sorted(self._latencies, key=lambda latency: latency.name)
+
+    def summaries(self, percentiles: tuple[float, ...] = DEFAULT_PERCENTILES) -> list[LatencySummary]:
+        return [summary for latency in self.latencies for summary in latency.summaries(percentiles)]
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+from collections.abc import Callable, Iterable
+from typing import ClassVar, Self
+
+from firengine.lib.fire_enum import MetricKind
+from firengine.lib.metrics.histogram import LogHistogram
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricValue:
+    """One labelled counter or gauge.
+
+    Updates are a single attribute add: the engine runs on one event loop thread, so no lock is needed, and a child
+    resolved once with ``labels`` is reused without building label tuples on the hot path.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class MetricFamily:
+    """Counter or gauge with a fixed set of label names; ``labels`` returns (and caches) the child of some values."""
+
+    def __init__(self, name: str, documentation: str, kind: MetricKind, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.kind = MetricKind(kind)
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], MetricValue] = {}
+
+    def labels(self, *values: str) -> MetricValue:
+        if (child := self._children.get(values)) is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = MetricValue()
+        return child
+
+    def remove(self, *values: str):
+        self._children.pop(values, None)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._children.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}")
+        return lines
+
+
+class SummaryFamily:
+    """Summary whose children are ``LogHistogram``s, exported multiplied by ``scale`` (e.g. microseconds exported as
+    seconds with ``scale=1e-6``)."""
+
+    kind = MetricKind.summary
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        scale: float = 1.0,
+        quantiles: tuple[float, ...] = SUMMARY_QUANTILES,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.scale = scale
+        self.quantiles = quantiles
+        self._children: dict[tuple[str, ...], LogHistogram] = {}
+
+    def labels(self, *values: str) -> LogHistogram:
+        if (child := self._children.get(values)) is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = LogHistogram()
+        return child
+
+    def add(self, histogram: LogHistogram, *values: str):
+        """Export an existing histogram under ``values``."""
+        self._children[values] = histogram
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} summary"]
+        for values, histogram in self._children.items():
+            if histogram.count:
+                percentiles = histogram.percentiles(q * 100 for q in self.quantiles)
+                for q, value in zip(self.quantiles, percentiles, strict=True):
+                    labels = _format_labels(self.labelnames, values, f'quantile="{q}"')
+                    lines.append(f"{self.name}{labels} {_format_value(value * self.scale)}")
+            labels = _format_labels(self.labelnames, values)
+            total = (histogram.mean or 0.0) * histogram.count
+            lines.append(f"{self.name}_sum{labels} {_format_value(total * self.scale)}")
+            lines.append(f"{self.name}_count{labels} {histogram.count}")
+        return lines
+
+
+type Family = MetricFamily | SummaryFamily
+type Collector = Callable[[], Iterable[Family]]
+
+
+class MetricsRegistry:
+    """Metrics of the process, rendered in the Prometheus text format.
+
+    Metrics updated on the hot path are created once with ``counter``, ``gauge`` or ``summary``. Anything that
+    already exists as state elsewhere (queue depths, reconnect counts, latency histograms) is instead read at scrape
+    time by a collector, a callable returning freshly built families, so it costs nothing between scrapes.
+    """
+
+    _default: ClassVar[Self | None] = None
+
+    def __init__(self):
+        self._families: dict[str, Family] = {}
+        self._collectors: list[Collector] = []
+
+    @classmethod
+    def default(cls) -> Self:
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def _register(self, family: Family) -> Family:
+        if (existing := self._families.get(family.name)) is not None:
+            if existing.kind != family.kind or existing.labelnames != family.labelnames:
+                raise ValueError(f"Metric {family.name} is already registered differently")
+            return existing
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, documentation, MetricKind.counter, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, documentation, MetricKind.gauge, labelnames))
+
+    def summary(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), scale: float = 1.0
+    ) -> SummaryFamily:
+        return self._register(SummaryFamily(name, documentation, labelnames, scale))
+
+    def register_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Collector):
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines += family.render()
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                logger.exception("Metrics collector %r failed", collector)
+                continue
+            for family in families:
+                lines += family.render()
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Minimal HTTP endpoint serving ``registry.render()`` on ``GET /metrics`` for Prometheus to scrape."""
+
+    def __init__(self, registry: MetricsRegistry | None = None, host: str = "0.0.0.0", port: int = 9464):
+        self._registry = registry or MetricsRegistry.default()
+        self._host = host
+        self._port = port
+        self._server: asyncio.Server | None = None
+
+    @property
+    def port(self) -> int:
+        """Bound port, useful with ``port=0``."""
+        if self._server is None:
+            return self._port
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self._host, self._port)
+        logger.info("Serving metrics on http://%s:%d/metrics", self._host, self.port)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+            method, path, *_ = request.split(b"\r\n", 1)[0].decode("latin-1").split(" ")
+            if method != "GET":
+                status, body, content_type = "405 Method Not Allowed", b"", "text/plain"
+            elif path.split("?", 1)[0] in ("/metrics", "/"):
+                status, body, content_type = "200 OK", self._registry.render().encode(), CONTENT_TYPE
+            else:
+                status, body, content_type = "404 Not Found", b"", "text/plain"
+            header = f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            writer.write(header.encode() + b"Connection: close\r\n\r\n" + body)
+            await writer.drain()
+        except (TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
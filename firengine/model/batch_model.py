@@ -0,0 +1,145 @@
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Self
+
+import numpy as np
+
+from firengine.lib.fire_enum import TradeSide
+from firengine.model.data_model import Trade
+
+SIDE_CODES: dict[str | None, int] = {TradeSide.buy: 1, TradeSide.sell: -1}
+SIDE_NAMES: dict[int, str | None] = {1: TradeSide.buy, -1: TradeSide.sell, 0: None}
+
+
+@dataclass(frozen=True, slots=True)
+class TradeBatch:
+    """Struct-of-arrays trades; ``symbol_ids`` index into ``symbols`` and ``sides`` holds 1 buy, -1 sell, 0 unknown."""
+
+    timestamps: np.ndarray  # int64, ms
+    prices: np.ndarray  # float64
+    amounts: np.ndarray  # float64
+    sides: np.ndarray  # int8
+    symbol_ids: np.ndarray  # int32
+    symbols: tuple[str, ...] = ()
+
+    @classmethod
+    def empty(cls, symbols: Sequence[str] = ()) -> Self:
+        return cls(
+            timestamps=np.empty(0, np.int64),
+            prices=np.empty(0, np.float64),
+            amounts=np.empty(0, np.float64),
+            sides=np.empty(0, np.int8),
+            symbol_ids=np.empty(0, np.int32),
+            symbols=tuple(symbols),
+        )
+
+    @classmethod
+    def from_ccxt(cls, dicts: Sequence[Mapping], symbols: Sequence[str] = ()) -> Self:
+        """Build from ccxt trade structures; symbols not in ``symbols`` get ids appended in order of appearance."""
+        n = len(dicts)
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        symbol_ids = np.fromiter((index.setdefault(d["symbol"], len(index)) for d in dicts), np.int32, n)
+        return cls(
+            timestamps=np.fromiter((d["timestamp"] for d in dicts), np.int64, n),
+            prices=np.fromiter((d["price"] for d in dicts), np.float64, n),
+            amounts=np.fromiter((d["amount"] for d in dicts), np.float64, n),
+            sides=np.fromiter((SIDE_CODES.get(d.get("side"), 0) for d in dicts), np.int8, n),
+            symbol_ids=symbol_ids,
+            symbols=tuple(index),
+        )
+
+    @classmethod
+    def from_trades(cls, trades: Sequence[Trade], symbols: Sequence[str] = ()) -> Self:
+        return cls.from_ccxt([_trade_dict(trade) for trade in trades], symbols)
+
+    @classmethod
+    def concat(cls, batches: Sequence[Self]) -> Self:
+        if not batches:
+            return cls.empty()
+        index: dict[str, int] = {}
+        symbol_ids = []
+        for batch in batches:
+            remap = np.array([index.setdefault(symbol, len(index)) for symbol in batch.symbols], np.int32)
+            symbol_ids.append(remap[batch.symbol_ids] if len(remap) else batch.symbol_ids)
+        return cls(
+            timestamps=np.concatenate([b.timestamps for b in batches]),
+            prices=np.concatenate([b.prices for b in batches]),
+            amounts=np.concatenate([b.amounts for b in batches]),
+            sides=np.concatenate([b.sides for b in batches]),
+            symbol_ids=np.concatenate(symbol_ids),
+            symbols=tuple(index),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __iter__(self) -> Iterator[Trade]:
+        for i in range(len(self)):
+            yield self.trade(i)
+
+    @property
+    def costs(self) -> np.ndarray:
+        return self.prices * self.amounts
+
+    def volume(self) -> float:
+        return float(self.amounts.sum())
+
+    def vwap(self) -> float | None:
+        volume = self.amounts.sum()
+        return float(self.costs.sum() / volume) if volume else None
+
+    def select(self, mask: np.ndarray) -> Self:
+        return TradeBatch(
+            timestamps=self.timestamps[mask],
+            prices=self.prices[mask],
+            amounts=self.amounts[mask],
+            sides=self.sides[mask],
+            symbol_ids=self.symbol_ids[mask],
+            symbols=self.symbols,
+        )
+
+    def for_symbol(self, symbol: str) -> Self:
+        if symbol not in self.symbols:
+            return self.empty(self.symbols)
+        if len(self.symbols) == 1:
+            return self
+        return self.select(self.symbol_ids == self.symbols.index(symbol))
+
+    def split_by_symbol(self) -> dict[str, Self]:
+        if len(self.symbols) == 1 and len(self):
+            return {self.symbols[0]: self}
+        return {
+            symbol: self.select(mask) for i, symbol in enumerate(self.symbols) if (mask := self.symbol_ids == i).any()
+        }
+
+    def trade(self, i: int) -> Trade:
+        price = float(self.prices[i])
+        amount = float(self.amounts[i])
+        return Trade(
+            timestamp=int(self.timestamps[i]),
+            price=price,
+            amount=amount,
+            symbol=self.symbols[self.symbol_ids[i]],
+            side=SIDE_NAMES[int(self.sides[i])],
+            cost=price * amount,
+        )
+
+    def to_trades(self) -> list[Trade]:
+        sides = [SIDE_NAMES[side] for side in self.sides.tolist()]
+        symbols = [self.symbols[i] for i in self.symbol_ids.tolist()]
+        return [
+            Trade(timestamp=ts, price=price, amount=amount, symbol=symbol, side=side, cost=price * amount)
+            for ts, price, amount, symbol, side in zip(
+                self.timestamps.tolist(), self.prices.tolist(), self.amounts.tolist(), symbols, sides, strict=True
+            )
+        ]
+
+
+def _trade_dict(trade: Trade) -> dict:
+    return {
+        "timestamp": trade.timestamp,
+        "price": trade.price,
+        "amount": trade.amount,
+        "symbol": trade.symbol,
+        "side": trade.side,
+    }
@@ -1,16 +1,47 @@
+from collections.abc import Mapping
 from dataclasses import dataclass, fields
 from typing import Self
 
+import orjson
+
 from firengine.lib.fire_enum import OrderStatus, OrderType, TimeInForce, TradeSide
 
 
 class FromDictMixin:
+    __slots__ = ()
+
     @classmethod
     def from_kwargs(cls, **kwargs) -> Self:
-        return cls(**{f.name: kwargs.get(f.name) for f in fields(cls)})
+        return cls.from_dict(kwargs)
+
+    @classmethod
+    def from_dict(cls, d: Mapping) -> Self:
+        return cls(**{f.name: d.get(f.name) for f in fields(cls)})
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> Self:
+        return cls.from_dict(orjson.loads(data))
 
+    def to_json(self) -> bytes:
+        return orjson.dumps(self)
 
-@dataclass
+
+def ccxt_model[C: FromDictMixin](cls: type[C]) -> type[C]:
+    """Replace ``from_dict`` with a converter generated once for the fields of ``cls``.
+
+    Like ``from_kwargs``, missing keys map to ``None``; arguments are passed positionally.
+    """
+    args = ", ".join(f"get({f.name!r})" for f in fields(cls) if f.init)
+    namespace = {}
+    exec(f"def from_dict(cls, d):\n    get = d.get\n    return cls({args})\n", {}, namespace)
+    from_dict = namespace["from_dict"]
+    from_dict.__qualname__ = f"{cls.__qualname__}.from_dict"
+    cls.from_dict = classmethod(from_dict)
+    return cls
+
+
+@ccxt_model
+@dataclass(slots=True)
 class Ticker(FromDictMixin):
     symbol: str
     timestamp: int
@@ -33,7 +64,8 @@ class Ticker(FromDictMixin):
     quoteVolume: float
 
 
-@dataclass
+@ccxt_model
+@dataclass(slots=True)
 class Trade(FromDictMixin):
     timestamp: int  # ms
     price: float
@@ -45,7 +77,7 @@ class Trade(FromDictMixin):
     cost: float | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeAbridged:
     timestamp: int
     price: float
@@ -53,8 +85,9 @@ class TradeAbridged:
     symbol: str | None = None
 
 
-@dataclass(frozen=True)
-class OHLCV:
+@ccxt_model
+@dataclass(frozen=True, slots=True)
+class OHLCV(FromDictMixin):
     timestamp: int
     open: float
     high: float
@@ -64,9 +97,11 @@ class OHLCV:
     trades: int | None = None
     symbol: str | None = None
     timeframe: str | None = None
+    closed: bool | None = None  # False while the bar is still forming
 
 
-@dataclass
+@ccxt_model
+@dataclass(slots=True)
 class OrderBook(FromDictMixin):
     bids: list[list[float]]
     asks: list[list[float]]
@@ -76,7 +111,55 @@ class OrderBook(FromDictMixin):
     nonce: int
 
 
-@dataclass
+@ccxt_model
+@dataclass(slots=True)
+class OrderBookDelta(FromDictMixin):
+    symbol: str
+    timestamp: int
+    bids: list[tuple[float, float]]  # (price, amount), amount 0 removes the level
+    asks: list[tuple[float, float]]
+    nonce: int | None = None
+    snapshot: bool = False  # the delta holds the full book, clear it before applying
+
+
+@ccxt_model
+@dataclass(frozen=True, slots=True)
+class BookFeatures(FromDictMixin):
+    symbol: str
+    timestamp: int
+    depth: int
+    mid: float
+    microprice: float
+    spread: float
+    imbalance: float  # top-N (weighted) volume imbalance in [-1, 1]
+    bid_depth: float
+    ask_depth: float
+    bid_vwap: float  # depth-weighted price of the top-N bid levels
+    ask_vwap: float
+
+
+@ccxt_model
+@dataclass(frozen=True, slots=True)
+class RollingStats(FromDictMixin):
+    symbol: str
+    timestamp: int  # last trade in the window
+    window_ms: int
+    count: int
+    volume: float
+    buy_volume: float
+    sell_volume: float
+    vwap: float
+    open: float
+    high: float
+    low: float
+    close: float
+    price_variance: float
+    return_variance: float  # of trade-to-trade log returns
+    realized_volatility: float  # sqrt of the sum of squared log returns
+
+
+@ccxt_model
+@dataclass(slots=True)
 class PrivateTrade(FromDictMixin):
     id: str
     timestamp: int
@@ -93,7 +176,8 @@ class PrivateTrade(FromDictMixin):
     fees: dict
 
 
-@dataclass
+@ccxt_model
+@dataclass(slots=True)
 class OrderRequest(FromDictMixin):
     symbol: str
     type: str
@@ -102,7 +186,8 @@ class OrderRequest(FromDictMixin):
     price: float
 
 
-@dataclass
+@ccxt_model
+@dataclass(slots=True)
 class Order(FromDictMixin):
     id: str
     clientOrderId: str
@@ -124,7 +209,8 @@ class Order(FromDictMixin):
     fee: dict
 
 
-@dataclass
+@ccxt_model
+@dataclass(slots=True)
 class OrderInfo(FromDictMixin):
     id: str
     symbol: str
@@ -137,7 +223,8 @@ class OrderInfo(FromDictMixin):
     status: OrderStatus = OrderStatus.pending
 
 
-@dataclass
+@ccxt_model
+@dataclass(slots=True)
 class OTOCO(FromDictMixin):
     id: str
     symbol: str
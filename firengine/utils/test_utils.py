@@ -9,7 +9,7 @@ tickers: dict[(str, str), Ticker] = {}
 
 
 async def fetch_ticker(ex: ccxt.Exchange, symbol: str) -> Ticker:
-    ticker = tickers.get((ex.name, symbol)) or Ticker.from_kwargs(**await ex.fetch_ticker(symbol))
+    ticker = tickers.get((ex.name, symbol)) or Ticker.from_dict(await ex.fetch_ticker(symbol))
     tickers[(ex.name, symbol)] = ticker
     return ticker
 
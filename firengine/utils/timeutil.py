@@ -1,5 +1,5 @@
 import time
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 
 
 def time_ms() -> int:
@@ -10,6 +10,12 @@ def dt_to_time_ms(dt: datetime) -> int:
     return int(dt.timestamp() * 1000)
 
 
+def iso8601(timestamp_ms: int) -> str:
+    """``2024-01-01T00:00:00.000Z``, like ``ccxt.Exchange.iso8601``."""
+    dt = datetime.fromtimestamp(timestamp_ms // 1000, UTC)
+    return f"{dt:%Y-%m-%dT%H:%M:%S}.{timestamp_ms % 1000:03d}Z"
+
+
 def parse_timeframe_to_ms(timeframe: str) -> int:
     amount = int(timeframe[0:-1])
     unit = timeframe[-1]
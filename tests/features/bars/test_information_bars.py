@@ -0,0 +1,128 @@
+import random
+
+import numpy as np
+import pytest
+
+from firengine.features.bars.information_bars import (
+    DollarBarBuilder,
+    ImbalanceBarBuilder,
+    TickBarBuilder,
+    VolumeBarBuilder,
+    build_bars,
+    read_kraken_trades,
+)
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import Trade
+
+
+def random_trades(n: int, seed: int = 0) -> list[Trade]:
+    rng = random.Random(seed)
+    return [
+        Trade(
+            timestamp=i * 10,
+            price=round(rng.uniform(95, 105), 2),
+            amount=round(rng.uniform(0.0001, 4), 4),
+            symbol="BTC/USD",
+            side=rng.choice(["buy", "sell", None]),
+        )
+        for i in range(n)
+    ]
+
+
+def bar_tuples(bars):
+    return [(b.timestamp, b.open, b.high, b.low, b.close, b.volume, b.trades) for b in bars]
+
+
+def test_tick_bars():
+    trades = random_trades(10)
+    builder = TickBarBuilder("BTC/USD", 3)
+    bars = builder.process(TradeBatch.from_trades(trades))
+    assert [bar.trades for bar in bars] == [3, 3, 3]
+    assert bars[1].timestamp == trades[3].timestamp and bars[1].close == trades[5].price
+    assert bars[0].timeframe == "tick:3" and bars[0].closed
+    assert builder.partial().trades == 1 and not builder.partial().closed
+
+
+def test_volume_bars_match_sequential_reference():
+    trades = random_trades(500)
+    expected, accumulated, count = [], 0.0, 0
+    for trade in trades:
+        accumulated += trade.amount
+        count += 1
+        if accumulated >= 10:
+            expected.append(count)
+            accumulated, count = 0.0, 0
+    bars = VolumeBarBuilder("BTC/USD", 10).process(TradeBatch.from_trades(trades))
+    assert [bar.trades for bar in bars] == expected
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        lambda s: TickBarBuilder(s, 7),
+        lambda s: VolumeBarBuilder(s, 12.5),
+        lambda s: DollarBarBuilder(s, 2_000),
+        lambda s: ImbalanceBarBuilder(s, 20),
+        lambda s: ImbalanceBarBuilder(s, 20, volume_weighted=True),
+    ],
+)
+def test_live_batches_match_historical_run(factory):
+    trades = random_trades(3000, seed=7)
+    historical = build_bars(TradeBatch.from_trades(trades), factory)["BTC/USD"]
+    assert len(historical) > 10
+
+    rng = random.Random(1)
+    builder, live, start = factory("BTC/USD"), [], 0
+    while start < len(trades):
+        size = rng.randint(1, 40)
+        live += builder.process(TradeBatch.from_trades(trades[start : start + size]))
+        start += size
+    assert bar_tuples(live) == bar_tuples(historical)
+
+
+def test_first_imbalance_bar_uses_expected_ticks():
+    trades = random_trades(100)
+    bars = ImbalanceBarBuilder("BTC/USD", 25).process(TradeBatch.from_trades(trades))
+    assert bars[0].trades == 25
+    assert bars[0].timeframe == "tib:25"
+
+
+def test_read_kraken_trades(tmp_path):
+    path = tmp_path / "XBTUSD.csv"
+    path.write_text("1381095255,122.0,0.1\n1381179030,123.61,0.1\n")
+    batch = read_kraken_trades(path, "BTC/USD")
+    assert batch.timestamps.tolist() == [1381095255000, 1381179030000]
+    assert batch.prices.tolist() == [122.0, 123.61]
+    assert batch.symbols == ("BTC/USD",)
+
+
+def test_many_small_batches_match_one_batch():
+    rng = np.random.default_rng(3)
+    n = 200_000
+    batch = TradeBatch(
+        timestamps=np.arange(n, dtype=np.int64),
+        prices=np.full(n, 100.0),
+        amounts=np.round(rng.uniform(0.0001, 0.1, n), 4),
+        sides=np.zeros(n, np.int8),
+        symbol_ids=np.zeros(n, np.int32),
+        symbols=("BTC/USD",),
+    )
+    historical = VolumeBarBuilder("BTC/USD", 1.0).process(batch)
+
+    builder, live, start = VolumeBarBuilder("BTC/USD", 1.0), [], 0
+    for size in rng.integers(1, 50, n):
+        live += builder.process(batch.select(slice(start, start + size)))
+        start += size
+        if start >= n:
+            break
+    assert bar_tuples(live) == bar_tuples(historical)
+
+
+def test_balanced_imbalance_bars_keep_expected_ticks():
+    trades = [
+        Trade(timestamp=i, price=100.0, amount=1.0, symbol="BTC/USD", side="buy" if i % 2 else "sell")
+        for i in range(40)
+    ]
+    bars = ImbalanceBarBuilder("BTC/USD", 4).process(TradeBatch.from_trades(trades))
+    # Without an imbalance estimate, bars go on being 4 trades long rather than one trade each
+    assert [bar.trades for bar in bars] == [4] * 10
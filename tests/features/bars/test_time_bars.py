@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from firengine.features.bars.time_bars import MultiTimeframeBarScheduler
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import Trade
+
+
+def make_scheduler(*timeframes: str, lateness_ms: int = 0) -> MultiTimeframeBarScheduler:
+    scheduler = MultiTimeframeBarScheduler(timeframes, lateness_ms)
+    scheduler.add_symbol("BTC/USD")
+    return scheduler
+
+
+def test_trade_of_next_interval_closes_bar():
+    scheduler = make_scheduler("1s")
+    assert scheduler.on_trade("BTC/USD", 100, 10.0, 1.0) == []
+    assert scheduler.on_trade("BTC/USD", 900, 12.0, 2.0) == []
+    (bar,) = scheduler.on_trade("BTC/USD", 1000, 11.0, 1.0)
+    assert (bar.timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume, bar.trades) == (
+        0,
+        10.0,
+        12.0,
+        10.0,
+        12.0,
+        3.0,
+        2,
+    )
+    assert bar.closed and bar.timeframe == "1s" and bar.symbol == "BTC/USD"
+
+
+def test_timer_closes_on_boundary_with_lateness():
+    scheduler = make_scheduler("1s", lateness_ms=50)
+    scheduler.on_trade("BTC/USD", 100, 10.0, 1.0)
+    assert scheduler.next_deadline() == 1050
+    assert scheduler.advance(1049) == []
+    assert [bar.timestamp for bar in scheduler.advance(1050)] == [0]
+    assert scheduler.next_deadline() is None
+
+
+def test_late_trade_is_folded_into_current_bar():
+    scheduler = make_scheduler("1s")
+    scheduler.on_trade("BTC/USD", 100, 10.0, 1.0)
+    scheduler.advance(1000)
+    scheduler.on_trade("BTC/USD", 999, 9.0, 1.0)
+    (bar,) = scheduler.advance(2000)
+    assert bar.timestamp == 1000 and bar.low == 9.0
+
+
+def test_roll_up_closes_parent_without_trades_in_last_child():
+    scheduler = make_scheduler("1m", "1s")
+    assert scheduler.timeframes == ["1s", "1m"]
+    scheduler.on_trade("BTC/USD", 1_500, 10.0, 1.0)
+    scheduler.on_trade("BTC/USD", 30_200, 15.0, 2.0)
+    closed = scheduler.advance(60_000)
+    assert [(bar.timeframe, bar.timestamp) for bar in closed] == [("1s", 30_000), ("1m", 0)]
+    minute = closed[-1]
+    assert (minute.open, minute.high, minute.low, minute.close, minute.volume, minute.trades) == (
+        10.0,
+        15.0,
+        10.0,
+        15.0,
+        3.0,
+        2,
+    )
+
+
+def test_rejects_timeframes_not_multiple_of_base():
+    with pytest.raises(ValueError):
+        MultiTimeframeBarScheduler(["2m", "3m"])
+
+
+def test_batch_matches_single_trades_and_brute_force():
+    rng = random.Random(1)
+    trades, ts = [], 0
+    for _ in range(2000):
+        ts += rng.randint(0, 400)
+        trades.append(Trade(timestamp=ts, price=float(rng.randint(90, 110)), amount=rng.random(), symbol="BTC/USD"))
+    end = trades[-1].timestamp + 3_600_000
+
+    single = make_scheduler("1s", "1m", "1h")
+    expected = [
+        bar for trade in trades for bar in single.on_trade("BTC/USD", trade.timestamp, trade.price, trade.amount)
+    ]
+    expected += single.advance(end)
+
+    batched = make_scheduler("1s", "1m", "1h")
+    actual = []
+    for start in range(0, len(trades), 97):
+        actual += batched.on_trade_batch(TradeBatch.from_trades(trades[start : start + 97]))
+    actual += batched.advance(end)
+
+    assert [(b.timeframe, b.timestamp, b.open, b.high, b.low, b.close, b.trades) for b in expected] == [
+        (b.timeframe, b.timestamp, b.open, b.high, b.low, b.close, b.trades) for b in actual
+    ]
+    for a, b in zip(expected, actual, strict=True):
+        assert a.volume == pytest.approx(b.volume)
+
+    for timeframe, interval in (("1s", 1000), ("1m", 60_000), ("1h", 3_600_000)):
+        buckets: dict[int, list[Trade]] = {}
+        for trade in trades:
+            buckets.setdefault(trade.timestamp - trade.timestamp % interval, []).append(trade)
+        bars = [bar for bar in expected if bar.timeframe == timeframe]
+        assert [bar.timestamp for bar in bars] == sorted(buckets)
+        for bar in bars:
+            bucket = buckets[bar.timestamp]
+            assert bar.open == bucket[0].price and bar.close == bucket[-1].price
+            assert bar.high == max(t.price for t in bucket) and bar.low == min(t.price for t in bucket)
+            assert bar.trades == len(bucket)
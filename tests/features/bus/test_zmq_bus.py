@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+import zmq
+import zmq.asyncio
+
+from firengine.features.bus.zmq_bus import HEADER, WIRE_VERSION, ZmqBusPublisher, ZmqBusStream, topic
+from firengine.features.stream.record_codec import TradeRecordCodec
+from firengine.lib.com.signal import AsyncSignal
+from firengine.lib.fire_enum import MarketDataKind
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import Trade
+
+
+class FakeTradeStream:
+    """Only the signal the trade codec binds to."""
+
+    def __init__(self):
+        self.acquired_trade_batch = AsyncSignal[TradeBatch]()
+
+
+def make_trades(n: int, symbol: str, start: int = 0) -> list[Trade]:
+    return [
+        Trade(timestamp=i, price=100.0 + i, amount=1.0, symbol=symbol, side="sell") for i in range(start, start + n)
+    ]
+
+
+async def receive(stream: ZmqBusStream, publish, n: int) -> list:
+    received = []
+
+    async def handler(item):
+        received.append(item)
+
+    stream.acquired.connect(handler)
+    task = asyncio.create_task(stream.run())
+    async with asyncio.timeout(10):
+        # PUB drops messages until the subscription has propagated, so publish until something arrives
+        while not received:
+            await publish()
+            await asyncio.sleep(0.05)
+        while len(received) < n:
+            await asyncio.sleep(0.01)
+    stream.stop()
+    await task
+    return received
+
+
+@pytest.mark.asyncio
+async def test_trades_are_routed_by_symbol_topic():
+    publisher = ZmqBusPublisher("tcp://127.0.0.1:*", "kraken")
+    source = FakeTradeStream()
+    publisher.attach(source, MarketDataKind.trade)
+    subscriber = ZmqBusStream(publisher.endpoint, "kraken", MarketDataKind.trade)
+    subscriber.add_symbol("BTC/USD")
+
+    async def publish():
+        trades = make_trades(3, "BTC/USD") + make_trades(2, "BTC/USDT")
+        await source.acquired_trade_batch.emit(TradeBatch.from_trades(trades))
+
+    try:
+        received = await receive(subscriber, publish, 3)
+    finally:
+        publisher.close()
+        await subscriber.close()
+    assert {trade.symbol for trade in received} == {"BTC/USD"}
+    assert [(t.timestamp, t.price, t.side) for t in received[:3]] == [(i, 100.0 + i, "sell") for i in range(3)]
+    assert subscriber.gaps == 0
+
+
+def test_sequence_gap_is_detected():
+    stream = ZmqBusStream("tcp://127.0.0.1:1", "kraken", MarketDataKind.trade)
+    codec = TradeRecordCodec()
+    payload = codec.encode(TradeBatch.from_trades(make_trades(1, "BTC/USD")), lambda _: 0).tobytes()
+    topic_ = topic(MarketDataKind.trade, "kraken", "BTC/USD")
+    for seq in (0, 1, 4):
+        (trade,) = stream._receive([topic_, HEADER.pack(WIRE_VERSION, seq, 1), payload])
+        assert trade.symbol == "BTC/USD"
+    assert stream.gaps == 1
+    stream._socket.close()
+
+
+def drain_seqs(socket: zmq.Socket) -> list[int]:
+    seqs = []
+    while True:
+        try:
+            frames = socket.recv_multipart(flags=zmq.NOBLOCK)
+        except zmq.Again:
+            return seqs
+        seqs.append(HEADER.unpack(frames[1])[1])
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_only_drops_its_own_messages():
+    context = zmq.asyncio.Context()
+    publisher = ZmqBusPublisher("inproc://slow-subscriber", "kraken", context=context, sndhwm=10)
+    slow = zmq.Context.shadow(context.underlying).socket(zmq.SUB)
+    slow.setsockopt(zmq.RCVHWM, 1)
+    slow.setsockopt(zmq.LINGER, 0)
+    slow.connect(publisher.endpoint)
+    slow.subscribe(b"")
+    healthy = ZmqBusStream(publisher.endpoint, "kraken", MarketDataKind.trade, context=context)
+    healthy.add_symbol("BTC/USD")
+    payload = TradeRecordCodec().encode(TradeBatch.from_trades(make_trades(1, "BTC/USD")), lambda _: 0).tobytes()
+    received = []
+
+    async def handler(trade):
+        received.append(trade)
+
+    def publish(n: int):
+        for _ in range(n):
+            publisher.send(MarketDataKind.trade, "BTC/USD", payload, 1)
+
+    healthy.acquired.connect(handler)
+    task = asyncio.create_task(healthy.run())
+    try:
+        # The slow subscriber never reads while its queues fill up; the healthy one keeps up
+        async with asyncio.timeout(10):
+            while len(received) < 200:
+                publish(5)
+                await asyncio.sleep(0.005)
+        seqs = drain_seqs(slow)
+        publish(1)
+        await asyncio.sleep(0.05)
+        seqs += drain_seqs(slow)
+    finally:
+        healthy.stop()
+        await task
+        await healthy.close()
+        slow.close()
+        publisher.close()
+    assert healthy.gaps == 0
+    assert seqs != list(range(seqs[0], seqs[0] + len(seqs)))
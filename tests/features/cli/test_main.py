@@ -0,0 +1,44 @@
+import pytest
+
+from firengine.features.cli.import_time import import_cost_us, loaded_heavy_modules, measure_import, parse_importtime
+
+# Generous for slow CI machines; the CLI imports in about 50 ms and ccxt alone takes about a second
+STARTUP_BUDGET_US = 500_000
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        420 |   io
+import time:      1000 |       1420 | firengine.features.cli.main
+"""
+
+
+def test_parse_importtime():
+    timings = parse_importtime(SAMPLE)
+    assert [(t.module, t.self_us, t.cumulative_us, t.depth) for t in timings] == [
+        ("_io", 120, 120, 2),
+        ("io", 300, 420, 1),
+        ("firengine.features.cli.main", 1000, 1420, 0),
+    ]
+    assert import_cost_us(timings, "io") == 420
+
+
+def test_cli_startup_budget():
+    timings = measure_import("firengine.features.cli.main")
+    assert loaded_heavy_modules(timings) == []
+    assert import_cost_us(timings, "firengine.features.cli.main") < STARTUP_BUDGET_US
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "firengine.config",
+        "firengine.features.stream.trade_stream",
+        "firengine.features.stream.ohlcv_stream",
+        "firengine.features.stream.order_book_stream",
+        "firengine.features.stream.order_stream",
+        "firengine.features.bars.information_bars",
+        "firengine.features.exchange.exchange_utility",
+    ],
+)
+def test_stream_modules_import_without_heavy_dependencies(module):
+    assert loaded_heavy_modules(measure_import(module)) == []
@@ -0,0 +1,84 @@
+import os
+
+import polars as pl
+
+from firengine.features.data_storage.ohlcvt import OHLCVTCache, scan_ohlcvt
+
+
+def csv_rows(seconds: range, close: float = 1.5) -> str:
+    return "".join(f"{s},1.0,2.0,0.5,{close},0.25,{s % 7}\n" for s in seconds)
+
+
+def test_csv_is_converted_once(tmp_path):
+    csv = tmp_path / "XBTUSD_1.csv"
+    csv.write_text(csv_rows(range(0, 600, 60)))
+    cache = OHLCVTCache(tmp_path / "cache")
+    frame = cache.scan(csv).collect()
+    assert frame["timestamp"].to_list() == list(range(0, 600_000, 60_000))
+    assert frame.schema["trades"] == pl.Int64 and frame.schema["volume"] == pl.Float64
+
+    [part] = cache.update(csv)
+    mtime = part.stat().st_mtime_ns
+    assert cache.update(csv) == [part]
+    assert part.stat().st_mtime_ns == mtime
+
+
+def test_appended_rows_are_parsed_alone(tmp_path, monkeypatch):
+    csv = tmp_path / "XBTUSD_1.csv"
+    csv.write_text(csv_rows(range(0, 600, 60)))
+    cache = OHLCVTCache(tmp_path / "cache")
+    [first] = cache.update(csv)
+    mtime = first.stat().st_mtime_ns
+    with open(csv, "a") as f:
+        f.write(csv_rows(range(600, 720, 60)))
+    parsed = []
+    parse = cache._parse
+    monkeypatch.setattr(cache, "_parse", lambda source: parsed.append(source) or parse(source))
+    frame = cache.scan(csv).collect()
+    assert parsed == [csv_rows(range(600, 720, 60)).encode()]
+    assert frame["timestamp"].to_list() == list(range(0, 720_000, 60_000))
+    # Written as a new part, the cached rows are left alone
+    assert len(cache.update(csv)) == 2 and first.stat().st_mtime_ns == mtime
+
+
+def test_parts_are_compacted(tmp_path):
+    csv = tmp_path / "XBTUSD_1.csv"
+    csv.write_text(csv_rows(range(0, 60, 60)))
+    cache = OHLCVTCache(tmp_path / "cache", max_parts=3)
+    for minute in range(1, 7):
+        with open(csv, "a") as f:
+            f.write(csv_rows(range(minute * 60, (minute + 1) * 60, 60)))
+        assert len(cache.update(csv)) <= 3
+    # Overlapping rows merge into a single part, the later row winning
+    with open(csv, "a") as f:
+        f.write(csv_rows(range(360, 420, 60), close=2.5))
+    parts = cache.update(csv)
+    assert len(parts) == 1 and sorted(path.name for path in parts[0].parent.glob("*.parquet")) == [parts[0].name]
+    frame = cache.scan(csv).collect()
+    assert frame["timestamp"].to_list() == list(range(0, 420_000, 60_000))
+    assert frame["close"][-1] == 2.5
+
+
+def test_rewritten_csv_is_converted_again(tmp_path):
+    csv = tmp_path / "XBTUSD_1.csv"
+    csv.write_text(csv_rows(range(0, 600, 60)))
+    cache = OHLCVTCache(tmp_path / "cache", verify_hash=True)
+    cache.update(csv)
+    stat = csv.stat()
+    # Same size and mtime, different content: only the hash tells
+    csv.write_text(csv_rows(range(0, 600, 60), close=2.5))
+    os.utime(csv, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.scan(csv).collect()["close"].unique().to_list() == [2.5]
+
+
+def test_symbols_are_merged_by_timestamp(tmp_path):
+    files = {"XBTUSD": tmp_path / "XBTUSD_1.csv", "ETHUSD": tmp_path / "ETHUSD_1.csv"}
+    files["XBTUSD"].write_text(csv_rows(range(0, 600, 60)))
+    files["ETHUSD"].write_text(csv_rows(range(30, 600, 60)))
+    frame = scan_ohlcvt(files, 60_000, 150_000, OHLCVTCache(tmp_path / "cache")).collect()
+    assert frame.select("timestamp", "symbol").rows() == [
+        (60_000, "XBTUSD"),
+        (90_000, "ETHUSD"),
+        (120_000, "XBTUSD"),
+        (150_000, "ETHUSD"),
+    ]
@@ -0,0 +1,79 @@
+import polars as pl
+import pytest
+
+from firengine.features.data_storage.recorder import MarketDataRecorder, partition_dir, scan_journal
+from firengine.lib.com.signal import AsyncSignal
+from firengine.lib.fire_enum import JournalFormat, MarketDataKind
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import Trade
+
+DAY_MS = 86_400_000
+
+
+class FakeTradeStream:
+    """Only the signal the trade codec binds to."""
+
+    def __init__(self):
+        self.acquired_trade_batch = AsyncSignal[TradeBatch]()
+
+
+def make_trades(timestamps: list[int], symbol: str) -> list[Trade]:
+    return [
+        Trade(timestamp=ts, price=100.0 + i, amount=1.0, symbol=symbol, side="buy") for i, ts in enumerate(timestamps)
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", list(JournalFormat))
+async def test_trades_are_partitioned_by_symbol_and_day(tmp_path, fmt):
+    recorder = MarketDataRecorder("kraken", tmp_path, fmt=fmt)
+    stream = FakeTradeStream()
+    recorder.record(stream, MarketDataKind.trade)
+    trades = make_trades([1, 2, DAY_MS + 1], "BTC/USD") + make_trades([3], "ETH/USD")
+    await stream.acquired_trade_batch.emit(TradeBatch.from_trades(trades))
+    assert recorder.buffered(MarketDataKind.trade) == 4
+    await recorder.close()
+
+    assert partition_dir(tmp_path, MarketDataKind.trade, "kraken", "BTC/USD", "1970-01-02").is_dir()
+    frame = scan_journal(tmp_path, MarketDataKind.trade, fmt).sort("symbol", "timestamp").collect()
+    assert frame["symbol"].to_list() == ["BTC/USD"] * 3 + ["ETH/USD"]
+    assert frame["timestamp"].to_list() == [1, 2, DAY_MS + 1, 3]
+    assert frame["exchange"].unique().to_list() == ["kraken"]
+    assert frame["date"].cast(pl.String).to_list() == ["1970-01-01", "1970-01-01", "1970-01-02", "1970-01-01"]
+
+    stats = recorder.stats(MarketDataKind.trade)
+    assert (stats.rows, stats.files, stats.segments, stats.errors) == (4, 3, 1, 0)
+    assert stats.bytes > 0 and stats.flush_latency.count == 1
+
+
+@pytest.mark.asyncio
+async def test_segments_rotate_on_size(tmp_path):
+    # A trade record is 32 bytes: every second batch of one trade fills a segment
+    recorder = MarketDataRecorder("kraken", tmp_path, segment_bytes=64)
+    stream = FakeTradeStream()
+    recorder.record(stream, MarketDataKind.trade)
+    for ts in range(5):
+        await stream.acquired_trade_batch.emit(TradeBatch.from_trades(make_trades([ts], "BTC/USD")))
+    assert recorder.buffered(MarketDataKind.trade) == 1
+    await recorder.flush()
+    assert recorder.stats(MarketDataKind.trade).segments == 3
+    assert sorted(scan_journal(tmp_path).collect()["timestamp"].to_list()) == list(range(5))
+    await recorder.close()
+
+
+@pytest.mark.asyncio
+async def test_segments_rotate_on_age(tmp_path):
+    recorder = MarketDataRecorder("kraken", tmp_path, segment_seconds=0)
+    stream = FakeTradeStream()
+    recorder.record(stream, MarketDataKind.trade)
+    await stream.acquired_trade_batch.emit(TradeBatch.from_trades(make_trades([1], "BTC/USD")))
+    assert recorder.buffered(MarketDataKind.trade) == 0
+    await recorder.close()
+    assert recorder.stats(MarketDataKind.trade).rows == 1
+    assert "firengine_recorder_rows_total" in [family.name for family in recorder.collect()]
+
+
+def test_orders_cannot_be_recorded(tmp_path):
+    recorder = MarketDataRecorder("kraken", tmp_path)
+    with pytest.raises(ValueError):
+        recorder.record(FakeTradeStream(), MarketDataKind.order)
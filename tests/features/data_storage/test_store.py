@@ -0,0 +1,93 @@
+import polars as pl
+import pytest
+
+from firengine.features.data_storage.store import FileCatalog, MarketDataStore, Snapshot
+from firengine.lib.fire_enum import MarketDataKind
+
+DAY_MS = 86_400_000
+
+
+def ohlcv_frame(start_ms: int, n: int, step_ms: int = 3_600_000) -> pl.DataFrame:
+    timestamps = [start_ms + i * step_ms for i in range(n)]
+    return pl.DataFrame(
+        {
+            "timestamp": timestamps,
+            "open": [1.0] * n,
+            "high": [2.0] * n,
+            "low": [0.5] * n,
+            "close": [1.5] * n,
+            "volume": [float(i) for i in range(n)],
+        }
+    )
+
+
+def test_scan_prunes_files_by_symbol_and_time_range(tmp_path):
+    store = MarketDataStore(tmp_path)
+    for symbol in ("BTC/USD", "ETH/USD"):
+        # Three days of hourly candles, one file per day
+        store.append(MarketDataKind.ohlcv, ohlcv_frame(0, 72), "kraken", symbol, "1h")
+    files = store.files(MarketDataKind.ohlcv, "kraken", "BTC/USD", "1h", DAY_MS + 1, 2 * DAY_MS - 1)
+    assert [(f.symbol, f.date) for f in files] == [("BTC/USD", "1970-01-02")]
+
+    frame = store.scan(MarketDataKind.ohlcv, "kraken", "BTC/USD", "1h", DAY_MS, 2 * DAY_MS - 1).collect()
+    assert frame["timestamp"].to_list() == [DAY_MS + h * 3_600_000 for h in range(24)]
+    assert set(frame["symbol"]) == {"BTC/USD"} and set(frame["timeframe"]) == {"1h"}
+    assert store.scan(MarketDataKind.ohlcv, symbols=["BTC/USD", "ETH/USD"]).collect().height == 144
+
+
+def test_append_is_idempotent_and_checks_the_schema(tmp_path):
+    store = MarketDataStore(tmp_path)
+    trades = pl.DataFrame({"timestamp": [1, 2], "price": [1.0, 2.0], "amount": [0.1, 0.2], "symbol": ["A", "B"]})
+    assert store.append(MarketDataKind.trade, trades, "kraken") == 2
+    assert store.append(MarketDataKind.trade, trades, "kraken") == 0
+    assert store.append(MarketDataKind.trade, trades.head(1), "kraken", batch_id="first") == 1
+    assert store.append(MarketDataKind.trade, trades.head(1), "kraken", batch_id="first") == 0
+    assert store.scan(MarketDataKind.trade).collect().height == 3
+    with pytest.raises(ValueError):
+        store.append(MarketDataKind.trade, trades.drop("amount"), "kraken")
+    with pytest.raises(ValueError):
+        store.append(MarketDataKind.ohlcv, ohlcv_frame(0, 1), "kraken", "A")
+
+
+def test_compaction_merges_small_files_of_a_partition(tmp_path):
+    store = MarketDataStore(tmp_path)
+    for hour in range(5):
+        store.append(MarketDataKind.ohlcv, ohlcv_frame(hour * 3_600_000, 1), "kraken", "BTC/USD", "1h")
+    store.append(MarketDataKind.ohlcv, ohlcv_frame(DAY_MS, 1), "kraken", "BTC/USD", "1h")
+    before = store.scan(MarketDataKind.ohlcv).sort("timestamp").collect()
+    assert len(store.files(MarketDataKind.ohlcv)) == 6
+
+    assert store.compact(MarketDataKind.ohlcv) == 5
+    files = store.files(MarketDataKind.ohlcv)
+    assert [(f.date, f.rows) for f in files] == [("1970-01-01", 5), ("1970-01-02", 1)]
+    assert store.scan(MarketDataKind.ohlcv).sort("timestamp").collect().equals(before)
+    assert len(list(tmp_path.rglob("*.parquet"))) == 2
+    assert store.compact(MarketDataKind.ohlcv) == 0
+
+
+def test_concurrent_commits_conflict(tmp_path):
+    catalog = FileCatalog(tmp_path)
+    base = catalog.load("trade")
+    catalog.commit("trade", Snapshot(base.version, batches={"a"}))
+    with pytest.raises(Exception, match="already exists"):
+        catalog.commit("trade", Snapshot(base.version, batches={"b"}))
+    assert catalog.load("trade").batches == {"a"}
+    # Nothing but the published version is left behind
+    assert [path.name for path in (tmp_path / "_catalog" / "trade").iterdir()] == ["v0000000001.json"]
+
+
+def test_catalog_keeps_the_latest_versions(tmp_path):
+    catalog = FileCatalog(tmp_path, keep_versions=3)
+    for i in range(10):
+        catalog.commit("trade", Snapshot(catalog.load("trade").version, batches={str(i)}))
+    names = sorted(path.name for path in (tmp_path / "_catalog" / "trade").iterdir())
+    assert names == ["v0000000008.json", "v0000000009.json", "v0000000010.json"]
+    assert catalog.load("trade").batches == {"9"}
+
+
+def test_batch_id_is_a_stable_hash_of_the_data():
+    trades = pl.DataFrame({"timestamp": [1, 2], "price": [1.0, 2.5], "symbol": ["A", "BC"], "side": [1, None]})
+    # Persisted in the catalog: must not change with the polars version
+    assert MarketDataStore.batch_id(trades) == "cf789cbc0d6d792eadd7ca47a7c1597369664810aa01ef73f18ba1c6a0fba796"
+    assert MarketDataStore.batch_id(trades.select(reversed(trades.columns))) == MarketDataStore.batch_id(trades)
+    assert MarketDataStore.batch_id(trades.with_columns(pl.col("price") + 1)) != MarketDataStore.batch_id(trades)
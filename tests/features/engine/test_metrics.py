@@ -0,0 +1,149 @@
+import asyncio
+import urllib.request
+
+from ccxt.base.errors import NetworkError
+
+from firengine.features.engine.metrics import EngineMetrics
+from firengine.features.engine.runner import EngineRunner
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.features.stream.trade_stream import TradeStream
+from firengine.lib.fire_enum import OrderStatus
+from firengine.lib.metrics.prometheus import MetricsRegistry
+from firengine.model.data_model import Order, Trade
+
+
+class SyntheticTradeStream(AbstractBaseStream[Trade]):
+    """``n_batches`` batches of 10 trades, then stops; forever with ``n_batches=None``."""
+
+    def __init__(self, n_batches: int | None):
+        super().__init__()
+        self._n_batches = n_batches
+
+    async def _generate(self):
+        raise NotImplementedError
+
+    async def _generate_batch(self):
+        i = 0
+        while self._n_batches is None or i < self._n_batches:
+            yield [Trade(timestamp=i, price=1.0, amount=1.0, symbol="BTC/USD") for _ in range(10)]
+            i += 1
+            await asyncio.sleep(0)
+        self.stop()
+        yield []
+
+
+def make_order(order_id: str, status: OrderStatus) -> Order:
+    return Order(
+        id=order_id,
+        clientOrderId=order_id,
+        datetime="",
+        timestamp=0,
+        lastTradeTimestamp=0,
+        status=status,
+        symbol="BTC/USD",
+        type="limit",
+        timeInForce="GTC",
+        side="buy",
+        price=1.0,
+        average=0.0,
+        amount=1.0,
+        filled=0.0,
+        remaining=1.0,
+        cost=0.0,
+        trades=[],
+        fee={},
+    )
+
+
+def test_collects_stream_order_and_handler_metrics():
+    registry = MetricsRegistry()
+    metrics = EngineMetrics(registry)
+    runner = EngineRunner()
+    stream = runner.add_stream(SyntheticTradeStream(5))
+    metrics.add_stream(stream)
+    stream.subscribe(lambda trade: asyncio.sleep(0), name="slow")
+
+    async def handler(trade):
+        pass
+
+    stream.acquired.connect(metrics.timed(handler, "strategy"))
+    runner.run(duration=10)
+
+    orders = SyntheticTradeStream(0)
+    tracker = metrics.track_orders(orders)
+    for order in (make_order("1", OrderStatus.open), make_order("2", OrderStatus.open)):
+        asyncio.run(tracker.handle(order))
+    asyncio.run(tracker.handle(make_order("1", OrderStatus.canceled)))
+
+    text = registry.render()
+    assert 'firengine_stream_events_total{stream="SyntheticTradeStream",symbol="BTC/USD"} 50' in text
+    assert (
+        'firengine_stream_latency_seconds_count{stream="SyntheticTradeStream",symbol="BTC/USD",kind="processing"} 50'
+        in text
+    )
+    assert 'firengine_subscriber_queue_depth{stream="SyntheticTradeStream",subscriber="slow"}' in text
+    assert 'firengine_handler_duration_seconds_count{handler="strategy"} 50' in text
+    assert 'firengine_open_orders{symbol="BTC/USD"} 1' in text
+
+
+def test_events_are_counted_without_latency():
+    registry = MetricsRegistry()
+    metrics = EngineMetrics(registry)
+    stream = SyntheticTradeStream(3)
+    stream.enable_latency(False)
+    metrics.add_stream(stream)
+    asyncio.run(stream.run())
+    text = registry.render()
+    assert 'firengine_stream_events_total{stream="SyntheticTradeStream",symbol="BTC/USD"} 30' in text
+    assert "firengine_stream_latency_seconds_count" not in text
+
+
+def test_runner_serves_metrics():
+    registry = MetricsRegistry()
+    runner = EngineRunner()
+    runner.add_stream(SyntheticTradeStream(None))
+    runner.serve_metrics(port=0, host="127.0.0.1", registry=registry)
+    bodies = []
+
+    async def scrape():
+        await asyncio.sleep(0.3)
+        url = f"http://127.0.0.1:{runner._metrics_server.port}/metrics"
+        bodies.append(await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=5).read().decode()))
+        runner.stop()
+
+    runner.add_task(scrape)
+    runner.run(duration=10)
+    assert "firengine_stream_events_total" in bodies[0]
+    assert "firengine_event_loop_lag_seconds_count" in bodies[0]
+    # Shutdown unregisters the collector, so a later run on the registry does not export the streams twice
+    assert "firengine_stream_events_total" not in registry.render()
+
+
+class FlakyTradeExchange:
+    id = "flaky"
+
+    def __init__(self, failures: int):
+        self._failures = failures
+
+    async def watch_trades_for_symbols(self, symbols: list[str]) -> list[dict]:
+        if self._failures:
+            self._failures -= 1
+            raise NetworkError("connection reset")
+        return [{"timestamp": 0, "symbol": "BTC/USD", "price": 1.0, "amount": 1.0}]
+
+
+def test_trade_stream_reconnects_are_exported():
+    registry = MetricsRegistry()
+    metrics = EngineMetrics(registry)
+    stream = TradeStream(FlakyTradeExchange(failures=2))
+    stream.retry_delay = 0.0
+    stream.add_symbol("BTC/USD")
+    metrics.add_stream(stream)
+
+    async def handler(trade: Trade):
+        stream.stop()
+
+    stream.acquired.connect(handler)
+    asyncio.run(stream.run())
+    assert stream.reconnects == 2
+    assert 'firengine_stream_reconnects_total{stream="TradeStream.flaky"} 2' in registry.render()
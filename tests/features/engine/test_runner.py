@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+import uvloop
+
+from firengine.features.engine.runner import EngineRunner, new_event_loop
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.model.data_model import Trade
+
+
+class SyntheticTradeStream(AbstractBaseStream[Trade]):
+    """``n_batches`` batches of ``batch_size`` trades, then stops; forever with ``n_batches=None``."""
+
+    def __init__(self, n_batches: int | None, batch_size: int = 10, fail: bool = False):
+        super().__init__()
+        self._n_batches = n_batches
+        self._batch_size = batch_size
+        self._fail = fail
+        self.closed = False
+
+    async def _generate(self):
+        raise NotImplementedError
+
+    async def _generate_batch(self):
+        i = 0
+        while self._n_batches is None or i < self._n_batches:
+            if self._fail:
+                raise RuntimeError("feed failed")
+            yield [Trade(timestamp=i, price=1.0, amount=1.0, symbol="BTC/USD") for _ in range(self._batch_size)]
+            i += 1
+            await asyncio.sleep(0)
+        self.stop()
+        yield []
+
+    async def close(self):
+        self.closed = True
+
+
+class HangingStream(SyntheticTradeStream):
+    async def _generate_batch(self):
+        await asyncio.Event().wait()
+        yield []
+
+
+@pytest.mark.parametrize("use_uvloop", [False, True])
+@pytest.mark.parametrize("eager_tasks", [False, True])
+def test_new_event_loop(use_uvloop, eager_tasks):
+    loop = new_event_loop(use_uvloop, eager_tasks)
+    try:
+        assert isinstance(loop, uvloop.Loop) == use_uvloop
+        assert (loop.get_task_factory() is asyncio.eager_task_factory) == eager_tasks
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize("use_uvloop", [False, True])
+@pytest.mark.parametrize("eager_tasks", [False, True])
+def test_runs_streams_to_completion_and_shuts_down(use_uvloop, eager_tasks):
+    runner = EngineRunner(use_uvloop, eager_tasks)
+    stream = runner.add_stream(SyntheticTradeStream(50))
+    received, shutdown = [], []
+
+    async def handler(trade: Trade):
+        received.append(trade)
+
+    async def on_shutdown():
+        shutdown.append(stream.closed)
+
+    stream.acquired.connect(handler)
+    runner.on_shutdown(on_shutdown)
+    runner.run(duration=10)
+    assert len(received) == 500
+    assert stream.closed
+    assert shutdown == [True]
+
+
+def test_stop_cancels_streams_that_do_not_finish():
+    runner = EngineRunner(stop_timeout=0.05)
+    endless = runner.add_stream(SyntheticTradeStream(None))
+    hanging = runner.add_stream(HangingStream(None))
+
+    async def stop_soon():
+        await asyncio.sleep(0.05)
+        runner.stop()
+
+    runner.add_task(stop_soon)
+    runner.run(duration=10)
+    assert endless.closed and hanging.closed
+
+
+def test_stream_failure_is_raised_after_shutdown():
+    runner = EngineRunner()
+    failing = runner.add_stream(SyntheticTradeStream(None, fail=True))
+    other = runner.add_stream(SyntheticTradeStream(None))
+    with pytest.raises(RuntimeError, match="feed failed"):
+        runner.run(duration=10)
+    assert failing.closed and other.closed
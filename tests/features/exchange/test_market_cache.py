@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+
+from firengine.features.exchange.market_cache import MarketCache
+
+MARKETS = {"BTC/USD": {"id": "XBTUSD", "symbol": "BTC/USD", "spot": True}}
+
+
+class FakeExchange:
+    id = "fake"
+
+    def __init__(self):
+        self.markets = None
+        self.currencies = None
+        self.loads = 0
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+        return markets
+
+    def load_markets(self, reload=False):
+        self.loads += 1
+        return self.set_markets(MARKETS, {"BTC": {"id": "XBT"}})
+
+
+class FakeAsyncExchange(FakeExchange):
+    async def load_markets(self, reload=False):
+        return super().load_markets(reload)
+
+
+def test_second_client_warm_starts_from_disk(tmp_path):
+    cache = MarketCache(tmp_path)
+    first = FakeExchange()
+    assert cache.load_markets(first) == MARKETS
+    assert first.loads == 1
+
+    second = FakeExchange()
+    assert cache.load_markets(second) == MARKETS
+    assert second.loads == 0
+    assert second.currencies == {"BTC": {"id": "XBT"}}
+
+
+def test_stale_snapshot_is_refreshed_in_background(tmp_path):
+    cache = MarketCache(tmp_path, ttl=60)
+    cache.write("fake", MARKETS, None, fetched_at=time.time() - 3600)
+
+    ex = FakeExchange()
+    assert cache.load_markets(ex) == MARKETS
+    deadline = time.time() + 5
+    while not cache.is_fresh(cache.read("fake")) and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.is_fresh(cache.read("fake"))
+    # Refreshed on another client: the one in use is not touched from the refresh thread
+    assert ex.loads == 0
+
+
+@pytest.mark.asyncio
+async def test_async_client_loads_once_then_warm_starts(tmp_path):
+    cache = MarketCache(tmp_path)
+    first = FakeAsyncExchange()
+    await cache.load_markets_async(first)
+    second = FakeAsyncExchange()
+    await cache.load_markets_async(second)
+    await asyncio.sleep(0)
+    assert (first.loads, second.loads) == (1, 0)
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from firengine.features.exchange.market_cache import MarketCache
+from firengine.features.exchange.session_registry import ExchangeSessionRegistry
+from firengine.features.stream.trade_stream import TradeStream
+from firengine.lib.fire_enum import SupportedExchange
+
+MARKETS = {
+    "BTC/USD": {
+        "id": "XBTUSD",
+        "symbol": "BTC/USD",
+        "base": "BTC",
+        "quote": "USD",
+        "baseId": "XBT",
+        "quoteId": "USD",
+        "spot": True,
+    }
+}
+
+
+@pytest.mark.asyncio
+async def test_streams_share_one_client_until_last_close():
+    registry = ExchangeSessionRegistry()
+    trades = TradeStream.from_supported_exchange(SupportedExchange.kraken, registry=registry)
+    more_trades = TradeStream.from_supported_exchange(SupportedExchange.kraken, registry=registry)
+    demo = TradeStream.from_supported_exchange(SupportedExchange.bybit, demo=True, registry=registry)
+    client = trades._exchange
+    assert more_trades._exchange is client
+    assert demo._exchange is not client
+    assert registry.refcount(client) == 2
+
+    closed = []
+
+    async def close():
+        closed.append(True)
+
+    client.close = close
+    await trades.close()
+    await trades.close()  # closing twice releases once
+    assert registry.refcount(client) == 1 and not closed
+    await more_trades.close()
+    assert closed == [True]
+    assert TradeStream.from_supported_exchange(SupportedExchange.kraken, registry=registry)._exchange is not client
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_only_with_the_same_config():
+    registry = ExchangeSessionRegistry()
+    config = {"apiKey": "key", "secret": "secret", "options": {"defaultType": "spot", "adjustForTimeDifference": True}}
+    client = registry.acquire(SupportedExchange.kraken, config)
+    reordered = {
+        "options": {"adjustForTimeDifference": True, "defaultType": "spot"},
+        "secret": "secret",
+        "apiKey": "key",
+    }
+    assert registry.acquire(SupportedExchange.kraken, reordered) is client
+    futures = {**config, "options": {"defaultType": "future"}}
+    assert registry.acquire(SupportedExchange.kraken, futures) is not client
+    assert registry.acquire(SupportedExchange.kraken, {**config, "secret": "other"}) is not client
+    assert registry.refcount(client) == 2
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_load_markets_share_one_request():
+    registry = ExchangeSessionRegistry()
+    client = registry.acquire(SupportedExchange.kraken)
+    calls = []
+
+    async def load_markets(reload=False):
+        calls.append(reload)
+        await asyncio.sleep(0.01)
+        return {"BTC/USD": {}}
+
+    client.load_markets = load_markets
+    results = await asyncio.gather(*(registry.load_markets(client) for _ in range(5)))
+    assert calls == [False]
+    assert all(result == {"BTC/USD": {}} for result in results)
+    await registry.load_markets(client, reload=True)
+    assert calls == [False, True]
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_warm_starts_markets_from_a_fresh_cache(tmp_path):
+    cache = MarketCache(tmp_path)
+    cache.write("kraken", MARKETS, None)
+    registry = ExchangeSessionRegistry(cache)
+    stream = TradeStream.from_supported_exchange(SupportedExchange.kraken, registry=registry)
+    stream.add_symbol("BTC/USD")
+    client = stream._exchange
+    requests = []
+
+    async def fetch_markets(params=None):
+        requests.append("markets")
+        return []
+
+    async def watch_trades_for_symbols(symbols):
+        # As ccxt.pro's watch methods do
+        await client.load_markets()
+        stream.stop()
+        return []
+
+    client.fetch_markets = fetch_markets
+    client.watch_trades_for_symbols = watch_trades_for_symbols
+    await stream.run()
+    assert requests == []
+    assert list(client.markets) == ["BTC/USD"]
+    await stream.close()
@@ -0,0 +1,185 @@
+import asyncio
+import time
+
+import polars as pl
+import pytest
+
+from firengine.features.data_storage.ohlcvt import OHLCVTCache
+from firengine.features.data_storage.recorder import MarketDataRecorder
+from firengine.features.market_simulator.replayer import (
+    MarketReplayer,
+    SourceCursor,
+    TimeSeriesMarketData,
+    merge_sources,
+    ordered_chunks,
+)
+from firengine.features.stream.replay_stream import OHLCVReplayStream, TradeReplayStream
+from firengine.lib.com.signal import AsyncSignal
+from firengine.lib.fire_enum import MarketDataKind
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import OHLCV, Trade
+
+
+def write_ohlcvt(directory, symbol: str, seconds: range):
+    lines = [f"{s},{s}.0,{s + 1}.0,{s - 1}.0,{s}.5,1.0,3" for s in seconds]
+    (directory / f"{symbol}_1.csv").write_text("\n".join(lines) + "\n")
+
+
+class FakeTradeStream:
+    def __init__(self):
+        self.acquired_trade_batch = AsyncSignal[TradeBatch]()
+
+
+async def write_trades(directory, trades: list[Trade]):
+    recorder = MarketDataRecorder("kraken", directory)
+    source = FakeTradeStream()
+    recorder.record(source, MarketDataKind.trade)
+    await source.acquired_trade_batch.emit(TradeBatch.from_trades(trades))
+    await recorder.close()
+
+
+async def replay(replayer: MarketReplayer, *streams) -> list[list]:
+    batches = []
+
+    async def handler(batch):
+        batches.append(batch)
+
+    for stream in streams:
+        stream.acquired_batch.connect(handler)
+    async with asyncio.timeout(10):
+        await asyncio.gather(replayer.run(), *(stream.run() for stream in streams))
+    return batches
+
+
+@pytest.mark.asyncio
+async def test_symbols_and_types_are_merged_in_timestamp_order(tmp_path):
+    write_ohlcvt(tmp_path, "XBTUSD", range(0, 600, 60))
+    write_ohlcvt(tmp_path, "ETHUSD", range(30, 630, 60))
+    trades = [
+        Trade(timestamp=ts, price=1.0, amount=2.0, symbol="XBTUSD", side="buy") for ts in range(0, 600_000, 7_000)
+    ]
+    await write_trades(tmp_path, trades)
+    ts_data = TimeSeriesMarketData(
+        "XBTUSD",
+        "ETHUSD",
+        start_ms=60_000,
+        ohlcvt_dir=tmp_path,
+        ohlcvt_cache=OHLCVTCache(tmp_path / "cache"),
+        journal_dir=tmp_path,
+        chunk_rows=4,
+    )
+    replayer = MarketReplayer(ts_data)
+    ohlcv_stream, trade_stream = OHLCVReplayStream(replayer), TradeReplayStream(replayer)
+    ohlcv_stream.add_symbol("XBTUSD")
+    ohlcv_stream.add_symbol("ETHUSD")
+    trade_stream.add_symbol("XBTUSD")
+
+    batches = await replay(replayer, ohlcv_stream, trade_stream)
+    items = [item for batch in batches for item in batch]
+    ohlcvs = [item for item in items if isinstance(item, OHLCV)]
+    assert [(c.timestamp, c.symbol) for c in ohlcvs] == sorted(
+        [(s * 1000, "XBTUSD") for s in range(60, 600, 60)] + [(s * 1000, "ETHUSD") for s in range(90, 630, 60)]
+    )
+    assert ohlcvs[0] == OHLCV(60_000, 60.0, 61.0, 59.0, 60.5, 1.0, 3, "XBTUSD", "1m", True)
+    assert [t.timestamp for t in items if isinstance(t, Trade)] == [
+        t.timestamp for t in trades if t.timestamp >= 60_000
+    ]
+    # Each batch comes from one stream, in order across the two
+    assert all(len({type(item) for item in batch}) == 1 for batch in batches)
+    assert [item.timestamp for item in items] == sorted(item.timestamp for item in items)
+    assert len(batches) < len(items)
+    assert replayer.time_ms == 595_000
+
+
+@pytest.mark.asyncio
+async def test_speedup_paces_the_replay(tmp_path):
+    write_ohlcvt(tmp_path, "XBTUSD", range(0, 120, 60))
+    replayer = MarketReplayer(
+        TimeSeriesMarketData(
+            "XBTUSD", exclude_trade=True, ohlcvt_dir=tmp_path, ohlcvt_cache=OHLCVTCache(tmp_path / "cache")
+        ),
+        speedup=300.0,
+    )
+    stream = OHLCVReplayStream(replayer)
+    stream.add_symbol("XBTUSD")
+    start = time.perf_counter()
+    batches = await replay(replayer, stream)
+    # 60 s of data at 300x
+    assert time.perf_counter() - start >= 0.19
+    assert [[c.timestamp for c in batch] for batch in batches] == [[0], [60_000]]
+
+
+@pytest.mark.asyncio
+async def test_overlapping_segments_are_replayed_in_order(tmp_path):
+    def make(timestamps):
+        return [Trade(timestamp=ts, price=1.0, amount=1.0, symbol="XBTUSD", side="buy") for ts in timestamps]
+
+    # Two segments, each out of order and overlapping the other
+    await write_trades(tmp_path, make([5_000, 1_000, 3_000, 7_000]))
+    await write_trades(tmp_path, make([6_000, 2_000, 8_000, 4_000]))
+    replayer = MarketReplayer(TimeSeriesMarketData("XBTUSD", exclude_ohlcv=True, journal_dir=tmp_path, chunk_rows=2))
+    stream = TradeReplayStream(replayer)
+    stream.add_symbol("XBTUSD")
+    batches = await replay(replayer, stream)
+    assert [t.timestamp for batch in batches for t in batch] == list(range(1_000, 9_000, 1_000))
+
+
+def test_files_crossing_each_other_are_merged():
+    def source(*files: list[int]) -> SourceCursor:
+        frames = [pl.LazyFrame({"timestamp": file}) for file in files]
+        return SourceCursor(ordered_chunks(frames, 1), lambda frame: frame["timestamp"].to_list(), 0)
+
+    merged = merge_sources([source([1, 5], [3, 7]), source([2, 4], [6, 8])])
+    assert [ts for timestamps, _, _ in merged for ts in timestamps.tolist()] == list(range(1, 9))
+
+
+@pytest.mark.asyncio
+async def test_stopping_a_stream_ends_the_replay(tmp_path):
+    write_ohlcvt(tmp_path, "XBTUSD", range(0, 600, 60))
+    replayer = MarketReplayer(
+        TimeSeriesMarketData(
+            "XBTUSD", exclude_trade=True, ohlcvt_dir=tmp_path, ohlcvt_cache=OHLCVTCache(tmp_path / "cache")
+        ),
+        batch_size=2,
+    )
+    stream = OHLCVReplayStream(replayer)
+    stream.add_symbol("XBTUSD")
+    received = []
+
+    async def stop_after_first(batch):
+        received.append(batch)
+        stream.stop()
+
+    stream.acquired_batch.connect(stop_after_first)
+    async with asyncio.timeout(5):
+        await asyncio.gather(replayer.run(), stream.run())
+    assert [[c.timestamp for c in batch] for batch in received] == [[0, 60_000]]
+    assert replayer.time_ms == 60_000
+
+
+@pytest.mark.asyncio
+async def test_failing_source_ends_the_replay_streams(tmp_path):
+    replayer = MarketReplayer(
+        TimeSeriesMarketData(
+            "XBTUSD", exclude_trade=True, ohlcvt_dir=tmp_path, ohlcvt_cache=OHLCVTCache(tmp_path / "cache")
+        )
+    )
+    stream = OHLCVReplayStream(replayer)
+    stream.add_symbol("XBTUSD")
+    # No OHLCVT file of XBTUSD
+    async with asyncio.timeout(5):
+        results = await asyncio.gather(replayer.run(), stream.run(), return_exceptions=True)
+    assert isinstance(results[0], FileNotFoundError)
+    assert results[1] is None
+
+
+def test_unknown_subscriptions_are_rejected(tmp_path):
+    replayer = MarketReplayer(
+        TimeSeriesMarketData(
+            "XBTUSD", exclude_trade=True, ohlcvt_dir=tmp_path, ohlcvt_cache=OHLCVTCache(tmp_path / "cache")
+        )
+    )
+    with pytest.raises(ValueError):
+        replayer.add_subscriber("ETHUSD", OHLCV)
+    with pytest.raises(ValueError):
+        replayer.add_subscriber("XBTUSD", Trade)
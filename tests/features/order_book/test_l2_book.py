@@ -0,0 +1,47 @@
+import random
+
+from firengine.features.order_book.l2_book import L2OrderBook
+
+
+def random_levels(rng: random.Random, mid: float, is_bid: bool) -> list[list[float]]:
+    offsets = sorted(rng.sample(range(1, 40), rng.randint(0, 20)))
+    return [[mid - o if is_bid else mid + o, float(rng.randint(1, 5))] for o in offsets]
+
+
+def test_apply_snapshot_matches_levels_and_deltas_replay():
+    rng = random.Random(7)
+    book = L2OrderBook("BTC/USD")
+    mirror = L2OrderBook("BTC/USD")
+    for _ in range(200):
+        bids, asks = random_levels(rng, 100.0, True), random_levels(rng, 100.0, False)
+        delta = book.apply_snapshot(bids, asks, timestamp=1)
+        mirror.apply_delta(delta)
+        assert book.bids.top() == bids
+        assert book.asks.top() == asks
+        assert mirror.snapshot() == book.snapshot()
+
+
+def test_lookups():
+    book = L2OrderBook("BTC/USD")
+    book.apply_snapshot([[99.0, 1.0], [98.0, 2.0], [97.0, 3.0]], [[101.0, 1.5], [102.0, 2.5]])
+    assert book.best_bid() == (99.0, 1.0)
+    assert book.best_ask() == (101.0, 1.5)
+    assert book.mid() == 100.0
+    assert book.spread() == 2.0
+    assert book.bids.amount_at(98.0) == 2.0
+    assert book.bids.amount_at(98.5) == 0.0
+    assert book.bids.depth_at(98.0) == 3.0
+    assert book.asks.depth_at(102.0) == 4.0
+    assert book.bids.top(2) == [[99.0, 1.0], [98.0, 2.0]]
+
+
+def test_unchanged_snapshot_yields_empty_delta():
+    book = L2OrderBook("BTC/USD", depth=2)
+    bids, asks = [[99.0, 1.0], [98.0, 2.0], [97.0, 3.0]], [[101.0, 1.5]]
+    book.apply_snapshot(bids, asks)
+    assert len(book.bids) == 2
+    delta = book.apply_snapshot(bids, asks)
+    assert delta.bids == [] and delta.asks == []
+    delta = book.apply_snapshot([[99.0, 4.0], [98.0, 2.0]], [])
+    assert delta.bids == [(99.0, 4.0)]
+    assert delta.asks == [(101.0, 0.0)]
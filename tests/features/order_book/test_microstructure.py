@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from firengine.features.order_book.microstructure import OrderBookFeatureEngine
+from firengine.features.stream.order_book_stream import OrderBookStream
+from firengine.model.data_model import BookFeatures
+
+BIDS = [[99.0, 1.0], [98.0, 3.0], [97.0, 5.0]]
+ASKS = [[101.0, 3.0], [102.0, 1.0], [103.0, 5.0]]
+
+
+def make_engine(depth: int = 2, throttle_ms: float = 0.0) -> tuple[OrderBookStream, OrderBookFeatureEngine]:
+    stream = OrderBookStream(None)
+    stream.add_symbol("BTC/USD")
+    return stream, OrderBookFeatureEngine(stream, depth=depth, throttle_ms=throttle_ms)
+
+
+@pytest.mark.asyncio
+async def test_features_of_top_levels():
+    stream, engine = make_engine()
+    await engine.on_delta(stream.book("BTC/USD").apply_snapshot(BIDS, ASKS, timestamp=1))
+    features = engine.features("BTC/USD")
+    assert features.mid == 100.0
+    assert features.spread == 2.0
+    assert features.microprice == pytest.approx((99.0 * 3.0 + 101.0 * 1.0) / 4.0)
+    assert features.imbalance == pytest.approx(0.0)
+    assert features.bid_vwap == pytest.approx((99.0 + 98.0 * 3.0) / 4.0)
+
+
+@pytest.mark.asyncio
+async def test_deep_changes_are_skipped():
+    stream, engine = make_engine()
+    received: list[BookFeatures] = []
+
+    async def on_features(features: BookFeatures):
+        received.append(features)
+
+    engine.updated("BTC/USD").connect(on_features)
+    book = stream.book("BTC/USD")
+    await engine.on_delta(book.apply_snapshot(BIDS, ASKS, timestamp=1))
+    await engine.on_delta(book.apply_snapshot([*BIDS[:2], [97.0, 9.0]], ASKS, timestamp=2))
+    assert len(received) == 1
+    await engine.on_delta(book.apply_snapshot([[99.0, 2.0], *BIDS[1:]], ASKS, timestamp=3))
+    assert len(received) == 2
+
+
+@pytest.mark.asyncio
+async def test_throttle_conflates_to_latest():
+    stream, engine = make_engine(throttle_ms=20)
+    received: list[BookFeatures] = []
+
+    async def on_features(features: BookFeatures):
+        received.append(features)
+
+    engine.updated("BTC/USD").connect(on_features)
+    book = stream.book("BTC/USD")
+    for i in range(5):
+        await engine.on_delta(book.apply_snapshot([[99.0, 1.0 + i], *BIDS[1:]], ASKS, timestamp=i))
+    assert [f.timestamp for f in received] == [0]
+    await asyncio.sleep(0.05)
+    assert [f.timestamp for f in received] == [0, 4]
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_pending_publications():
+    stream, engine = make_engine(throttle_ms=20)
+    stream.add_symbol("ETH/USD")
+    received: list[BookFeatures] = []
+
+    async def on_features(features: BookFeatures):
+        received.append(features)
+
+    for symbol in ("BTC/USD", "ETH/USD"):
+        engine.updated(symbol).connect(on_features)
+        book = stream.book(symbol)
+        for i in range(2):
+            await engine.on_delta(book.apply_snapshot([[99.0, 1.0 + i], *BIDS[1:]], ASKS, timestamp=i))
+    stream.remove_symbol("ETH/USD")
+    engine.remove_symbol("ETH/USD")
+    assert engine.features("ETH/USD") is None
+    await asyncio.sleep(0.05)
+    # Only BTC/USD's throttled update is published
+    assert [(f.symbol, f.timestamp) for f in received] == [("BTC/USD", 0), ("ETH/USD", 0), ("BTC/USD", 1)]
+
+    book = stream.book("BTC/USD")
+    await engine.on_delta(book.apply_snapshot(BIDS, ASKS, timestamp=2))
+    await engine.on_delta(book.apply_snapshot([[99.0, 5.0], *BIDS[1:]], ASKS, timestamp=3))
+    engine.close()
+    await asyncio.sleep(0.05)
+    assert [f.timestamp for f in received[3:]] == [2]
+    assert not stream.acquired.has_handlers
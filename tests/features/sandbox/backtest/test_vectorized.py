@@ -0,0 +1,124 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from firengine.features.async_stream.base_stream import BaseStream
+from firengine.features.sandbox.backtest.backtest_trader import BacktestEngine
+from firengine.features.sandbox.backtest.vectorized import (
+    OrderIntents,
+    first_at_most,
+    min_tree,
+    run_vectorized_backtest,
+    target_position,
+)
+from firengine.lib.fire_enum import OrderType
+from firengine.model.data_model import OHLCV, Order, PrivateTrade
+
+
+def make_bars(n: int, symbols: tuple[str, ...], seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    frames = []
+    for symbol in symbols:
+        close = 100 + np.cumsum(rng.normal(0, 1, n))
+        frames.append(
+            pl.DataFrame(
+                {
+                    "timestamp": 60_000 * np.arange(n),
+                    "open": close,
+                    "high": close + rng.random(n),
+                    "low": close - rng.random(n),
+                    "close": close,
+                    "volume": 1.0,
+                    "trades": 1,
+                    "symbol": symbol,
+                }
+            )
+        )
+    return pl.concat(frames).sort("timestamp", maintain_order=True)
+
+
+class RecordingEngine(BacktestEngine):
+    def __init__(self, order_stream: BaseStream[Order]):
+        super().__init__(order_stream)
+        self.fills: list[PrivateTrade] = []
+
+    async def handle_trade(self, trade: PrivateTrade):
+        await super().handle_trade(trade)
+        self.fills.append(trade)
+
+
+def test_first_at_most_matches_a_linear_search():
+    rng = np.random.default_rng(1)
+    for n in (1, 2, 5, 8, 9, 100):
+        values = rng.normal(size=n)
+        start = rng.integers(0, n + 2, 200)
+        limit = rng.normal(size=200)
+        expected = [next((j for j in range(s, n) if values[j] <= x), -1) for s, x in zip(start, limit, strict=True)]
+        assert first_at_most(min_tree(values), start, limit).tolist() == expected
+
+
+@pytest.mark.asyncio
+async def test_reference_strategy_fills_as_the_event_driven_engine():
+    bars = make_bars(300, ("XBTUSD", "ETHUSD"))
+
+    order_stream = BaseStream[Order]()
+    engine = RecordingEngine(order_stream)
+    orders: dict[str, Order] = {}
+
+    async def collect_order(order: Order):
+        orders[order.id] = order
+
+    await order_stream.subscribe_async(engine.handle_order)
+    await order_stream.subscribe_async(collect_order)
+    for row in bars.iter_rows(named=True):
+        ohlcv = OHLCV(**row)
+        await engine.handle_ohlcv(ohlcv)
+        await engine.match_open_order(ohlcv)
+    expected = sorted(
+        (trade.symbol, orders[trade.order].timestamp, trade.timestamp, trade.price, trade.amount)
+        for trade in engine.fills
+    )
+
+    # BacktestEngine.handle_ohlcv: a 0.01 limit buy at the low of every bar
+    result = run_vectorized_backtest(bars, OrderIntents(side=pl.lit("buy"), amount=0.01, price=pl.col("low")))
+    fills = result.fills.select("symbol", "timestamp", "fill_timestamp", "fill_price", "amount")
+    assert len(result.orders) == len(bars)
+    assert sorted(fills.iter_rows()) == expected
+    assert len(expected) > 0 and len(result.fills) < len(result.orders)
+
+
+def test_market_and_sell_orders():
+    bars = pl.DataFrame(
+        {
+            "timestamp": [0, 1, 2, 3],
+            "open": [10.0, 11.0, 12.0, 11.0],
+            "high": [11.0, 12.0, 13.0, 12.0],
+            "low": [9.0, 10.0, 11.0, 10.0],
+            "close": [10.0, 11.0, 12.0, 11.0],
+        }
+    )
+    sells = OrderIntents(
+        side=pl.when(pl.col("timestamp") == 0).then(pl.lit("sell")), amount=1.0, price=12.5, type=OrderType.limit
+    )
+    buys = OrderIntents(side=pl.lit("buy"), amount=2.0, price=pl.col("close"), type=OrderType.market)
+    orders = run_vectorized_backtest(bars, sells, buys).orders
+    assert orders.select("timestamp", "side", "fill_timestamp", "fill_price", "taker_or_maker").rows() == [
+        (0, "sell", 2, 12.5, "maker"),
+        (0, "buy", 1, 10.0, "taker"),
+        (1, "buy", 2, 11.0, "taker"),
+        (2, "buy", 3, 12.0, "taker"),
+        (3, "buy", None, None, None),
+    ]
+
+
+def test_target_positions():
+    bars = make_bars(50, ("XBTUSD",), seed=2)
+    target = (pl.col("close") > pl.col("close").rolling_mean(5)).cast(pl.Float64).fill_null(0.0)
+    result = run_vectorized_backtest(bars, target_position(target))
+    positions = result.positions()
+
+    expected = bars.select(target).to_series().shift(1, fill_value=0.0)
+    assert positions["position"].to_list() == expected.to_list()
+    assert positions["equity"][-1] == pytest.approx(
+        positions["cash"][-1] + positions["position"][-1] * bars["close"][-1]
+    )
@@ -0,0 +1,91 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from firengine.features.statistics.rolling_window import RollingStatistics
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import Trade
+
+
+def random_trades(n: int, seed: int = 0) -> list[Trade]:
+    rng = random.Random(seed)
+    trades, ts = [], 0
+    for _ in range(n):
+        ts += rng.randint(0, 300)
+        side = rng.choice(["buy", "sell", None])
+        trades.append(
+            Trade(timestamp=ts, price=60_000 + rng.uniform(-50, 50), amount=rng.random(), symbol="BTC/USD", side=side)
+        )
+    return trades
+
+
+def brute_force(trades: list[Trade], now: int, window_ms: int) -> dict:
+    rows = [t for t in trades if t.timestamp > now - window_ms]
+    prices = np.array([t.price for t in rows])
+    amounts = np.array([t.amount for t in rows])
+    returns = np.diff(np.log(prices))
+    return {
+        "count": len(rows),
+        "volume": amounts.sum(),
+        "buy_volume": sum(t.amount for t in rows if t.side == "buy"),
+        "sell_volume": sum(t.amount for t in rows if t.side == "sell"),
+        "vwap": prices @ amounts / amounts.sum(),
+        "high": prices.max(),
+        "low": prices.min(),
+        "open": prices[0],
+        "close": prices[-1],
+        "price_variance": prices.var(),
+        "return_variance": returns.var() if len(returns) > 1 else 0.0,
+        "realized_volatility": math.sqrt(returns @ returns),
+    }
+
+
+def assert_matches(statistics: RollingStatistics, trades: list[Trade], window_ms: int):
+    now = trades[-1].timestamp
+    stats = statistics.stats(window_ms)
+    expected = brute_force(trades, now, window_ms)
+    assert stats.count == expected.pop("count")
+    for name, value in expected.items():
+        assert getattr(stats, name) == pytest.approx(value, rel=1e-6, abs=1e-9), name
+
+
+@pytest.mark.parametrize("batch_size", [1, 53])
+def test_windows_match_brute_force(batch_size):
+    trades = random_trades(3000)
+    windows = [5_000, 60_000, 300_000]
+    statistics = RollingStatistics("BTC/USD", windows)
+    for start in range(0, len(trades), batch_size):
+        chunk = trades[start : start + batch_size]
+        if batch_size == 1:
+            trade = chunk[0]
+            statistics.put(trade.timestamp, trade.price, trade.amount, {"buy": 1, "sell": -1}.get(trade.side, 0))
+        else:
+            statistics.put_batch(TradeBatch.from_trades(chunk))
+        if start % 500 < batch_size:
+            for window_ms in windows:
+                assert_matches(statistics, trades[: start + len(chunk)], window_ms)
+
+
+def test_windows_share_one_compacted_buffer():
+    trades = random_trades(5000, seed=3)
+    statistics = RollingStatistics("BTC/USD", [1_000, 10_000])
+    statistics.put_batch(TradeBatch.from_trades(trades))
+    buffer = statistics.buffer
+    assert len(buffer) == len(trades)
+    # Only rows still in the longest window (plus at most as many evicted ones) are kept
+    assert len(buffer.prices) <= 2 * statistics.window(10_000).count + 1
+
+
+def test_wall_clock_advance_empties_window():
+    statistics = RollingStatistics("BTC/USD", [1_000])
+    statistics.put(0, 100.0, 1.0, 1)
+    statistics.put(500, 101.0, 1.0, -1)
+    statistics.advance(1_400)
+    assert statistics.stats(1_000).count == 1
+    statistics.advance(1_500)
+    assert statistics.stats(1_000) is None
+    statistics.put(2_000, 50.0, 2.0)
+    stats = statistics.stats(1_000)
+    assert (stats.count, stats.volume, stats.price_variance, stats.realized_volatility) == (1, 2.0, 0.0, 0.0)
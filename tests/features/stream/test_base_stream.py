@@ -0,0 +1,119 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.lib.fire_enum import OverflowPolicy
+from firengine.model.data_model import Trade
+
+
+class ListStream(AbstractBaseStream[Trade]):
+    def __init__(self, items: list[Trade]):
+        super().__init__()
+        self._items = items
+
+    async def _generate(self) -> AsyncGenerator[Trade | None]:
+        for item in self._items:
+            yield item
+        while True:
+            await asyncio.sleep(0.001)
+            yield None
+
+
+def make_trades(n: int, symbol: str = "BTC/USD") -> list[Trade]:
+    return [Trade(timestamp=i, price=100.0 + i, amount=1.0, symbol=symbol) for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_stall_fast_one():
+    stream = ListStream(make_trades(100))
+    fast, slow = [], []
+    release = asyncio.Event()
+
+    async def fast_handler(trade: Trade):
+        fast.append(trade)
+
+    async def slow_handler(trade: Trade):
+        await release.wait()
+        slow.append(trade)
+
+    stream.subscribe(fast_handler)
+    slow_subscriber = stream.subscribe(slow_handler, maxsize=10, policy=OverflowPolicy.drop_oldest)
+    task = asyncio.create_task(stream.run())
+    await asyncio.sleep(0.01)
+    assert len(fast) == 100
+    stats = {s.name: s for s in stream.subscriber_stats()}
+    assert stats[slow_subscriber.name].dropped > 0
+    assert stats[slow_subscriber.name].depth <= 10
+    release.set()
+    stream.stop()
+    await task
+
+
+class BatchStream(ListStream):
+    async def _generate_batch(self) -> AsyncGenerator[list[Trade]]:
+        yield self._items
+        while True:
+            await asyncio.sleep(0.001)
+            yield []
+
+
+@pytest.mark.asyncio
+async def test_batch_signals_receive_whole_message():
+    trades = make_trades(3, "BTC/USD") + make_trades(2, "ETH/USD")
+    stream = BatchStream(trades)
+    stream.add_symbol("BTC/USD")
+    stream.add_symbol("ETH/USD")
+    batches, eth_batches, items = [], [], []
+
+    async def on_batch(batch: list[Trade]):
+        batches.append(batch)
+
+    async def on_eth_batch(batch: list[Trade]):
+        eth_batches.append(batch)
+
+    async def on_item(trade: Trade):
+        items.append(trade)
+
+    stream.acquired_batch.connect(on_batch)
+    stream.acquired_batch_per_symbol("ETH/USD").connect(on_eth_batch)
+    stream.acquired.connect(on_item)
+    task = asyncio.create_task(stream.run())
+    await asyncio.sleep(0.01)
+    stream.stop()
+    await task
+    assert batches == [trades]
+    assert eth_batches == [trades[3:]]
+    assert items == trades
+
+
+@pytest.mark.asyncio
+async def test_unsubscribing_during_a_blocked_put_skips_no_subscriber():
+    trades = make_trades(3)
+    stream = ListStream(trades)
+    release = asyncio.Event()
+    last = []
+
+    async def ignore(trade: Trade):
+        pass
+
+    async def blocked_handler(trade: Trade):
+        await release.wait()
+
+    async def last_handler(trade: Trade):
+        last.append(trade)
+
+    first = stream.subscribe(ignore)
+    stream.subscribe(blocked_handler, maxsize=1)
+    stream.subscribe(last_handler)
+    task = asyncio.create_task(stream.run())
+    await asyncio.sleep(0.01)
+    # The stream waits on the blocked subscriber's full queue with the last trade
+    assert last == trades[:2]
+    stream.unsubscribe(first)
+    release.set()
+    await asyncio.sleep(0.01)
+    stream.stop()
+    await task
+    assert last == trades
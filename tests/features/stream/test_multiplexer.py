@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from firengine.features.stream.multiplexer import SymbolWatcherMultiplexer
+from firengine.features.stream.order_stream import OrderStream
+from firengine.model.data_model import Order
+
+
+class FakeFeed:
+    def __init__(self):
+        self.queues: dict[str, asyncio.Queue] = {}
+        self.failures: list[BaseException] = []
+
+    def push(self, symbol: str, value):
+        self.queues.setdefault(symbol, asyncio.Queue()).put_nowait(value)
+
+    async def watch(self, symbol: str):
+        if self.failures:
+            raise self.failures.pop(0)
+        return await self.queues.setdefault(symbol, asyncio.Queue()).get()
+
+
+@pytest.mark.asyncio
+async def test_results_are_handed_off_as_they_arrive():
+    feed = FakeFeed()
+    mux = SymbolWatcherMultiplexer(feed.watch)
+    mux.add("BTC/USD")
+    mux.start()
+    feed.push("BTC/USD", 1)
+    assert await asyncio.wait_for(mux.get_batch(), 0.1) == [("BTC/USD", 1)]
+
+    mux.add("ETH/USD")
+    feed.push("ETH/USD", 2)
+    assert await asyncio.wait_for(mux.get_batch(), 0.1) == [("ETH/USD", 2)]
+
+    mux.remove("BTC/USD")
+    feed.push("BTC/USD", 3)
+    feed.push("ETH/USD", 4)
+    assert await asyncio.wait_for(mux.get_batch(), 0.1) == [("ETH/USD", 4)]
+
+    waiting = asyncio.create_task(mux.get_batch())
+    await asyncio.sleep(0)
+    mux.stop()
+    assert await asyncio.wait_for(waiting, 0.1) == []
+
+
+@pytest.mark.asyncio
+async def test_retry_and_error_propagation():
+    feed = FakeFeed()
+    feed.failures = [ConnectionError("reset")]
+    mux = SymbolWatcherMultiplexer(feed.watch, retry_on=(ConnectionError,), retry_delay=0.0)
+    mux.add("BTC/USD")
+    mux.start()
+    feed.push("BTC/USD", 1)
+    assert await asyncio.wait_for(mux.get_batch(), 0.1) == [("BTC/USD", 1)]
+    assert mux.reconnects == 1
+
+    feed.failures = [ValueError("bad")]
+    feed.push("BTC/USD", 2)
+    assert await asyncio.wait_for(mux.get_batch(), 0.1) == [("BTC/USD", 2)]
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(mux.get_batch(), 0.1)
+    mux.stop()
+
+
+class FakeExchange:
+    def __init__(self, feed: FakeFeed):
+        self.watch_orders = feed.watch
+
+
+@pytest.mark.asyncio
+async def test_order_stream_emits_without_polling():
+    feed = FakeFeed()
+    stream = OrderStream(FakeExchange(feed))
+    stream.add_symbol("BTC/USDT")
+    received = []
+
+    async def on_order(order: Order):
+        received.append(order)
+
+    stream.acquired.connect(on_order)
+    task = asyncio.create_task(stream.run())
+    feed.push("BTC/USDT", [{"id": "1", "symbol": "BTC/USDT", "status": "open"}])
+    await asyncio.sleep(0.01)
+    assert [order.id for order in received] == ["1"]
+    stream.stop()
+    await asyncio.wait_for(task, 0.1)
@@ -0,0 +1,22 @@
+from firengine.features.stream.ohlcv_stream import CandleIndex
+
+
+def test_candle_index_emits_only_changes():
+    index = CandleIndex()
+    history = [[0, 1.0, 2.0, 0.5, 1.5, 10.0], [60, 1.5, 1.6, 1.4, 1.5, 1.0]]
+    first = index.update("BTC/USD", "1m", history)
+    assert [(c.timestamp, c.closed) for c in first] == [(0, True), (60, False)]
+
+    assert index.update("BTC/USD", "1m", history) == []
+
+    forming = [*history[:1], [60, 1.5, 1.7, 1.4, 1.7, 2.0]]
+    changes = index.update("BTC/USD", "1m", forming)
+    assert [(c.timestamp, c.close, c.closed) for c in changes] == [(60, 1.7, False)]
+
+    rolled = [*forming, [120, 1.7, 1.7, 1.7, 1.7, 0.1]]
+    changes = index.update("BTC/USD", "1m", rolled)
+    assert [(c.timestamp, c.closed) for c in changes] == [(60, True), (120, False)]
+
+    # Only the new bar is delivered: the previous one is closed with its last seen values
+    changes = index.update("BTC/USD", "1m", [[180, 1.7, 1.8, 1.7, 1.8, 0.2]])
+    assert [(c.timestamp, c.closed) for c in changes] == [(120, True), (180, False)]
@@ -0,0 +1,141 @@
+import asyncio
+import functools
+from collections.abc import AsyncGenerator
+
+import pytest
+
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.features.stream.record_codec import BookDeltaRecordCodec, TradeRecordCodec
+from firengine.features.stream.shm_stream import ShmOrderBookStream, ShmRingStream, ShmStreamPublisher
+from firengine.lib.com.shm_ring import ShmRingBuffer
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import OrderBookDelta, Trade
+
+
+def make_trades(n: int, symbol: str = "BTC/USD") -> list[Trade]:
+    return [Trade(timestamp=i, price=100.0 + i, amount=1.0, symbol=symbol, side="buy") for i in range(n)]
+
+
+class ListStream(AbstractBaseStream[Trade]):
+    def __init__(self, items: list[Trade]):
+        super().__init__()
+        self._items = items
+
+    async def _generate_batch(self) -> AsyncGenerator[list[Trade]]:
+        yield self._items
+        while True:
+            await asyncio.sleep(0.01)
+            yield []
+
+    async def _generate(self) -> AsyncGenerator[Trade | None]:
+        raise NotImplementedError
+
+
+async def collect(stream: AbstractBaseStream, n: int, timeout: float = 10.0) -> list:
+    received = []
+
+    async def handler(item):
+        received.append(item)
+
+    stream.acquired.connect(handler)
+    task = asyncio.create_task(stream.run())
+    async with asyncio.timeout(timeout):
+        while len(received) < n:
+            await asyncio.sleep(0.01)
+    stream.stop()
+    await task
+    return received
+
+
+@pytest.mark.asyncio
+async def test_trades_round_trip_through_ring():
+    codec = TradeRecordCodec()
+    ring = ShmRingBuffer.create(codec.dtype, capacity=64)
+    try:
+        consumer = ShmRingStream(ring.name, codec)
+        consumer.add_symbol("ETH/USD")
+        trades = make_trades(5) + make_trades(3, "ETH/USD")
+        ring.write(codec.encode(TradeBatch.from_trades(trades), ring.symbol_id))
+        received = await collect(consumer, 3)
+        assert [(t.timestamp, t.price, t.symbol, t.side) for t in received] == [
+            (t.timestamp, t.price, t.symbol, t.side) for t in trades[5:]
+        ]
+        await consumer.close()
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+@pytest.mark.asyncio
+async def test_order_book_consumer_rebuilds_book():
+    codec = BookDeltaRecordCodec()
+    ring = ShmRingBuffer.create(codec.dtype, capacity=64)
+    try:
+        consumer = ShmOrderBookStream(ring.name, start="oldest")
+        deltas = [
+            OrderBookDelta("BTC/USD", 1, [(99.0, 1.0), (98.0, 2.0)], [(101.0, 1.0)], 1, snapshot=True),
+            OrderBookDelta("BTC/USD", 2, [(99.0, 0.0)], [], 2),
+            OrderBookDelta("BTC/USD", 3, [], [(100.5, 3.0)], 3),
+        ]
+        encoded = [codec.encode(delta, ring.symbol_id) for delta in deltas]
+        # A delta split across two writes is only decoded once complete
+        ring.write(encoded[0][:1])
+        ring.write(encoded[0][1:])
+        ring.write(encoded[1])
+        ring.write(encoded[2])
+        received = await collect(consumer, 3)
+        assert received == deltas
+        book = consumer.book("BTC/USD")
+        assert book.best_bid() == (98.0, 2.0)
+        assert book.best_ask() == (100.5, 3.0)
+        await consumer.close()
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+@pytest.mark.asyncio
+async def test_order_book_is_stale_until_a_snapshot():
+    codec = BookDeltaRecordCodec()
+    ring = ShmRingBuffer.create(codec.dtype, capacity=16)
+    try:
+        consumer = ShmOrderBookStream(ring.name)
+
+        def write(*deltas: OrderBookDelta):
+            for delta in deltas:
+                ring.write(codec.encode(delta, ring.symbol_id))
+
+        snapshot = OrderBookDelta("BTC/USD", 2, [(99.0, 1.0)], [(101.0, 1.0)], 2, snapshot=True)
+        update = OrderBookDelta("BTC/USD", 3, [(99.0, 2.0)], [], 3)
+        # Joined mid-stream: the first delta has no book to apply to
+        write(OrderBookDelta("BTC/USD", 1, [(98.0, 1.0)], [], 1), snapshot, update)
+        assert await collect(consumer, 2) == [snapshot, update]
+        assert consumer.stale == set()
+        assert consumer.book("BTC/USD").best_bid() == (99.0, 2.0)
+
+        # Overrun: deltas after the loss are dropped until the next snapshot
+        write(*(OrderBookDelta("BTC/USD", 4 + i, [(97.0, float(i))], [], 4 + i) for i in range(20)))
+        write(snapshot, update)
+        assert await collect(consumer, 2) == [snapshot, update]
+        assert consumer.lost > 0
+        assert consumer.stale == set()
+        assert consumer.book("BTC/USD").best_bid() == (99.0, 2.0)
+        await consumer.close()
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+@pytest.mark.asyncio
+async def test_publisher_runs_stream_in_worker_process():
+    trades = make_trades(50)
+    publisher = ShmStreamPublisher(functools.partial(ListStream, trades), TradeRecordCodec(), ["BTC/USD"], capacity=128)
+    consumer = ShmRingStream(publisher.ring_name, TradeRecordCodec(), start="oldest")
+    publisher.start()
+    try:
+        received = await collect(consumer, 50, timeout=30.0)
+    finally:
+        publisher.stop()
+        await consumer.close()
+        publisher.close()
+    assert [t.price for t in received] == [t.price for t in trades]
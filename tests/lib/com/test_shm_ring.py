@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from firengine.lib.com.shm_ring import ShmRingBuffer
+
+RECORD = np.dtype([("seq", np.int64), ("value", np.float64)])
+
+
+def records(start: int, n: int) -> np.ndarray:
+    out = np.empty(n, RECORD)
+    out["seq"] = np.arange(start, start + n)
+    out["value"] = out["seq"] * 0.5
+    return out
+
+
+@pytest.fixture
+def ring():
+    ring = ShmRingBuffer.create(RECORD, capacity=8)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_readers_see_writes_across_wraparound(ring):
+    consumer = ShmRingBuffer.attach(ring.name, RECORD)
+    first, second = consumer.reader(), consumer.reader()
+    ring.write(records(0, 5))
+    assert first.read()["seq"].tolist() == [0, 1, 2, 3, 4]
+    ring.write(records(5, 6))
+    assert first.read()["seq"].tolist() == [5, 6, 7, 8, 9, 10]
+    assert second.read(max_records=3)["seq"].tolist() == [3, 4, 5]
+    assert second.lost == 3
+    assert len(first.read()) == 0
+    consumer.close()
+
+
+def test_overrun_reader_skips_to_oldest_available(ring):
+    reader = ring.reader()
+    ring.write(records(0, 20))
+    assert reader.read()["seq"].tolist() == list(range(12, 20))
+    assert reader.lost == 12
+
+
+def test_slots_claimed_by_a_write_in_progress_are_dropped(ring):
+    reader = ring.reader("oldest")
+    ring.write(records(0, 8))
+    # A producer that has claimed the next 3 slots, overwriting records 0-2, but not published them yet
+    ring._header["writing_seq"] = 11
+    assert reader.read()["seq"].tolist() == list(range(3, 8))
+    assert reader.lost == 3
+
+
+def test_symbol_table_is_shared(ring):
+    assert ring.symbol_id("BTC/USD") == 0
+    assert ring.symbol_id("ETH/USD") == 1
+    consumer = ShmRingBuffer.attach(ring.name, RECORD)
+    assert consumer.symbol(1) == "ETH/USD"
+    assert consumer.symbol_id("BTC/USD") == 0
+    consumer.close()
+
+
+def test_attach_rejects_other_record_size(ring):
+    with pytest.raises(ValueError):
+        ShmRingBuffer.attach(ring.name, np.dtype([("seq", np.int64)]))
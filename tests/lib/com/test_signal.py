@@ -0,0 +1,60 @@
+import pytest
+
+from firengine.lib.com.signal import AsyncSignal
+from firengine.lib.fire_enum import DispatchMode
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", [DispatchMode.concurrent, DispatchMode.inline])
+async def test_async_modes_call_every_handler(mode: DispatchMode):
+    signal = AsyncSignal[int](mode=mode)
+    received = []
+
+    async def handler_a(value: int):
+        received.append(("a", value))
+
+    async def handler_b(value: int):
+        received.append(("b", value))
+
+    signal.connect(handler_a)
+    signal.connect(handler_b)
+    await signal.emit(1)
+    assert sorted(received) == [("a", 1), ("b", 1)]
+
+
+@pytest.mark.asyncio
+async def test_direct_mode_calls_sync_handlers():
+    signal = AsyncSignal[int](mode=DispatchMode.direct)
+    received = []
+    signal.connect(received.append)
+    await signal.emit(1)
+    await signal.emit(2)
+    assert received == [1, 2]
+
+
+def test_direct_mode_rejects_coroutine_handlers():
+    async def handler(value: int):
+        pass
+
+    signal = AsyncSignal[int](mode=DispatchMode.direct)
+    with pytest.raises(TypeError):
+        signal.connect(handler)
+
+    signal = AsyncSignal[int]()
+    signal.connect(handler)
+    with pytest.raises(TypeError):
+        signal.mode = DispatchMode.direct
+
+
+@pytest.mark.asyncio
+async def test_debug_hook_and_disconnect():
+    hooked = []
+    received = []
+    signal = AsyncSignal[int](mode=DispatchMode.direct, debug_hook=hooked.append)
+    signal.connect(received.append)
+    await signal.emit(1)
+    signal.disconnect(received.append)
+    assert not signal.has_handlers
+    await signal.emit(2)
+    assert hooked == [1, 2]
+    assert received == [1]
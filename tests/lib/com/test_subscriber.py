@@ -0,0 +1,53 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from firengine.lib.com.subscriber import OverflowQueue
+from firengine.lib.fire_enum import OverflowPolicy
+
+
+@dataclass
+class Tick:
+    symbol: str
+    value: int
+
+
+async def drain[T](queue: OverflowQueue[T]) -> list[T]:
+    return [await queue.get() for _ in range(queue.qsize())]
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_latest_items():
+    queue = OverflowQueue[int](2, OverflowPolicy.drop_oldest)
+    for i in range(5):
+        await queue.put(i)
+    assert queue.dropped == 3
+    assert await drain(queue) == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_drop_newest_keeps_first_items():
+    queue = OverflowQueue[int](2, OverflowPolicy.drop_newest)
+    for i in range(5):
+        await queue.put(i)
+    assert queue.dropped == 3
+    assert await drain(queue) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_conflate_keeps_latest_per_symbol():
+    queue = OverflowQueue[Tick](4, OverflowPolicy.conflate)
+    for i in range(3):
+        await queue.put(Tick("BTC/USD", i))
+        await queue.put(Tick("ETH/USD", i))
+    assert queue.qsize() == 2
+    assert queue.dropped == 4
+    assert await drain(queue) == [Tick("BTC/USD", 2), Tick("ETH/USD", 2)]
+
+
+def test_block_put_nowait_raises_when_full():
+    queue = OverflowQueue[int](1, OverflowPolicy.block)
+    queue.put_nowait(0)
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait(1)
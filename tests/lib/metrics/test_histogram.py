@@ -0,0 +1,49 @@
+from fractions import Fraction
+from math import ceil
+
+import numpy as np
+import pytest
+
+from firengine.lib.metrics.histogram import LogHistogram
+
+
+def test_percentiles_are_within_relative_error():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(8, 2, 50_000).astype(np.int64)
+    histogram = LogHistogram()
+    for value in values.tolist():
+        histogram.record(value)
+    ordered = np.sort(values)
+    qs = [1, 50, 90, 99, 99.9, 100]
+    for q, estimate in zip(qs, histogram.percentiles(qs), strict=True):
+        exact = ordered[ceil(Fraction(str(q)) * len(values) / 100) - 1]
+        assert estimate >= exact
+        assert estimate <= exact * (1 + 2**-6) + 1
+    assert histogram.count == len(values)
+    assert histogram.max == values.max()
+    assert histogram.min == values.min()
+    assert histogram.mean == pytest.approx(values.mean())
+
+
+def test_record_array_matches_record():
+    values = np.array([0, 1, 127, 128, 129, 255, 256, 10_000, 123_456_789, -5, 2**41])
+    one_by_one, vectorized = LogHistogram(), LogHistogram()
+    for value in values.tolist():
+        one_by_one.record(value)
+    vectorized.record_array(values)
+    assert vectorized._counts == one_by_one._counts
+    assert (vectorized.count, vectorized.min, vectorized.max) == (one_by_one.count, 0, 2**40)
+
+
+def test_merge_and_reset():
+    a, b = LogHistogram(), LogHistogram()
+    a.record_array(np.arange(100))
+    b.record(1000, count=100)
+    a.merge(b)
+    assert a.count == 200
+    assert a.percentile(50) == 99
+    assert a.percentile(100) == 1000
+    a.reset()
+    assert a.count == 0 and a.percentile(50) is None
+    with pytest.raises(ValueError):
+        a.merge(LogHistogram(sub_bucket_bits=5))
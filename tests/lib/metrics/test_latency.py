@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from firengine.features.stream.base_stream import AbstractBaseStream
+from firengine.features.stream.trade_stream import TradeStream
+from firengine.lib.fire_enum import LatencyKind
+from firengine.lib.metrics.latency import LatencyRegistry, StreamLatency
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import Trade
+
+
+def test_exchange_and_processing_latency_are_separated():
+    latency = StreamLatency("test", flush_size=3)
+    received_ns = 1_000_000_000_000_000  # 1e6 s
+    for i in range(5):
+        # 20 ms on the wire, 100 us in our handlers
+        latency.record(
+            "BTC/USD", 1_000_000_000 - 20 + i, received_ns + i * 1_000_000, received_ns + i * 1_000_000 + 100_000
+        )
+    latency.record("ETH/USD", None, received_ns, received_ns + 50_000)
+    assert latency.histogram("BTC/USD", LatencyKind.exchange).percentiles([0, 100]) == [20_000, 20_000]
+    assert latency.histogram("BTC/USD", LatencyKind.processing).percentile(50) == 100
+    assert latency.histogram("BTC/USD", LatencyKind.end_to_end).percentile(50) == 20_100
+    by_kind = {(s.symbol, s.kind): s for s in latency.summaries()}
+    assert by_kind["ETH/USD", LatencyKind.processing].count == 1
+    assert ("ETH/USD", LatencyKind.exchange) not in by_kind
+
+
+def test_record_array():
+    latency = StreamLatency("test")
+    latency.record_array("BTC/USD", np.array([990, 995]), 1_000 * 1_000_000, 1_001 * 1_000_000)
+    exchange = latency.histogram("BTC/USD", LatencyKind.exchange)
+    assert (exchange.min, exchange.max, exchange.percentile(100)) == (5_000, 10_000, 10_000)
+    assert latency.histogram("BTC/USD", LatencyKind.processing).count == 2
+
+
+class OneShotStream(AbstractBaseStream[Trade]):
+    def __init__(self, trades: list[Trade]):
+        super().__init__()
+        self._trades = trades
+
+    async def _generate(self):
+        raise NotImplementedError
+
+    async def _generate_batch(self):
+        yield self._trades
+        self.stop()
+        yield []
+
+
+@pytest.mark.asyncio
+async def test_stream_records_latency_per_symbol():
+    now_ms = asyncio.get_running_loop().time()  # any clock; only counts are checked
+    trades = [Trade(timestamp=int(now_ms), price=1.0, amount=1.0, symbol=s) for s in ("BTC/USD", "ETH/USD", "BTC/USD")]
+    stream = OneShotStream(trades)
+
+    async def handler(trade: Trade):
+        await asyncio.sleep(0)
+
+    stream.acquired.connect(handler)
+    await stream.run()
+    assert stream.latency in LatencyRegistry.default().latencies
+    assert sorted(stream.latency.symbols) == ["BTC/USD", "ETH/USD"]
+    assert stream.latency.histogram("BTC/USD", LatencyKind.processing).count == 2
+    stream.enable_latency(False)
+    assert stream.latency is None
+
+
+class FakeTradeExchange:
+    id = "fake"
+
+    def __init__(self, trades: list[dict]):
+        self._trades = trades
+
+    async def watch_trades_for_symbols(self, symbols: list[str]) -> list[dict]:
+        return self._trades
+
+
+@pytest.mark.asyncio
+async def test_handler_time_is_not_exchange_latency():
+    now_ms = time.time_ns() // 1_000_000
+    stream = TradeStream(FakeTradeExchange([{"timestamp": now_ms, "symbol": "BTC/USD", "price": 1.0, "amount": 1.0}]))
+    stream.add_symbol("BTC/USD")
+
+    async def slow_batch_handler(batch: TradeBatch):
+        await asyncio.sleep(0.05)
+
+    async def handler(trade: Trade):
+        stream.stop()
+
+    stream.acquired_trade_batch.connect(slow_batch_handler)
+    stream.acquired.connect(handler)
+    await stream.run()
+    assert stream.latency.histogram("BTC/USD", LatencyKind.processing).min >= 50_000
+    assert stream.latency.histogram("BTC/USD", LatencyKind.exchange).max < 50_000
+
+
+@pytest.mark.asyncio
+async def test_streams_without_event_times_record_processing_only():
+    class HistoricalStream(OneShotStream):
+        event_time_from_item = False
+
+    stream = HistoricalStream([Trade(timestamp=0, price=1.0, amount=1.0, symbol="BTC/USD")])
+    stream.acquired.connect(lambda trade: asyncio.sleep(0))
+    await stream.run()
+    assert stream.latency.histogram("BTC/USD", LatencyKind.processing).count == 1
+    assert stream.latency.histogram("BTC/USD", LatencyKind.exchange).count == 0
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from firengine.lib.metrics.prometheus import MetricFamily, MetricsRegistry, MetricsServer
+
+
+def test_render_counters_gauges_and_summaries():
+    registry = MetricsRegistry()
+    events = registry.counter("events_total", "Events", ["stream", "symbol"])
+    events.labels("trades", "BTC/USD").inc(3)
+    registry.gauge("depth", "Queue depth").labels().set(2.5)
+    latency = registry.summary("latency_seconds", "Latency", ["symbol"], scale=1e-6)
+    for us in (100, 200, 300, 400):
+        latency.labels('A"B').record(us)
+
+    text = registry.render()
+    assert "# TYPE events_total counter" in text
+    assert 'events_total{stream="trades",symbol="BTC/USD"} 3' in text
+    assert "depth 2.5" in text
+    assert 'latency_seconds{symbol="A\\"B",quantile="0.5"} 0.0002' in text
+    assert 'latency_seconds_count{symbol="A\\"B"} 4' in text
+    assert text.endswith("\n")
+
+
+def test_registering_twice_returns_the_same_family():
+    registry = MetricsRegistry()
+    assert registry.counter("x_total", "X", ["a"]) is registry.counter("x_total", "X", ["a"])
+    with pytest.raises(ValueError):
+        registry.gauge("x_total", "X", ["a"])
+    with pytest.raises(ValueError):
+        registry.counter("x_total", "X", ["a"]).labels("1", "2")
+
+
+def test_collectors_run_at_scrape_time():
+    registry = MetricsRegistry()
+    state = {"depth": 1}
+
+    def collect():
+        family = MetricFamily("depth", "Depth", "gauge")
+        family.labels().set(state["depth"])
+        return [family]
+
+    registry.register_collector(collect)
+    assert "depth 1" in registry.render()
+    state["depth"] = 7
+    assert "depth 7" in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_server_serves_metrics():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits").labels().inc()
+    server = MetricsServer(registry, "127.0.0.1", 0)
+    await server.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+    finally:
+        await server.close()
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert b"hits_total 1" in response
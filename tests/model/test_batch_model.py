@@ -0,0 +1,36 @@
+import numpy as np
+
+from firengine.model.batch_model import TradeBatch
+from firengine.model.data_model import Trade
+
+CCXT_TRADES = [
+    {"timestamp": 1, "price": 100.0, "amount": 0.5, "symbol": "BTC/USD", "side": "buy"},
+    {"timestamp": 2, "price": 10.0, "amount": 2.0, "symbol": "ETH/USD", "side": "sell"},
+    {"timestamp": 3, "price": 101.0, "amount": 1.0, "symbol": "BTC/USD", "side": None},
+]
+
+
+def test_from_ccxt_builds_columns():
+    batch = TradeBatch.from_ccxt(CCXT_TRADES)
+    assert len(batch) == 3
+    assert batch.symbols == ("BTC/USD", "ETH/USD")
+    np.testing.assert_array_equal(batch.symbol_ids, [0, 1, 0])
+    np.testing.assert_array_equal(batch.sides, [1, -1, 0])
+    assert batch.vwap() == (50.0 + 20.0 + 101.0) / 3.5
+
+
+def test_split_and_materialise():
+    batch = TradeBatch.from_ccxt(CCXT_TRADES)
+    per_symbol = batch.split_by_symbol()
+    np.testing.assert_array_equal(per_symbol["BTC/USD"].timestamps, [1, 3])
+    assert len(batch.for_symbol("XRP/USD")) == 0
+    trades = batch.to_trades()
+    assert trades[1] == Trade(timestamp=2, price=10.0, amount=2.0, symbol="ETH/USD", side="sell", cost=20.0)
+    assert list(batch) == trades
+
+
+def test_concat_remaps_symbol_ids():
+    first = TradeBatch.from_ccxt(CCXT_TRADES[:1])
+    second = TradeBatch.from_ccxt(CCXT_TRADES[1:])
+    merged = TradeBatch.concat([first, second])
+    assert merged.to_trades() == TradeBatch.from_ccxt(CCXT_TRADES).to_trades()
@@ -0,0 +1,28 @@
+from dataclasses import fields
+
+import pytest
+
+from firengine.lib.fire_enum import OrderStatus
+from firengine.model.data_model import OHLCV, Order, OrderInfo, Trade
+
+
+def test_from_dict_ignores_unknown_and_defaults_missing_to_none():
+    trade = Trade.from_dict({"timestamp": 1, "price": 2.0, "amount": 3.0, "symbol": "BTC/USD", "info": {}})
+    assert trade == Trade(timestamp=1, price=2.0, amount=3.0, symbol="BTC/USD")
+    assert OrderInfo.from_kwargs(id="a").timeInForce is None
+    assert Trade.from_kwargs(timestamp=1, price=2.0, amount=3.0) == Trade.from_dict(
+        {"timestamp": 1, "price": 2.0, "amount": 3.0}
+    )
+
+
+@pytest.mark.parametrize("cls", [Trade, Order, OHLCV])
+def test_models_are_slotted(cls):
+    obj = cls.from_dict({f.name: None for f in fields(cls)})
+    assert not hasattr(obj, "__dict__")
+
+
+def test_json_round_trip():
+    order = Order.from_dict({"id": "1", "status": OrderStatus.open, "price": 1.5, "trades": []})
+    assert Order.from_json(order.to_json()) == order
+    ohlcv = OHLCV(1, 2.0, 3.0, 1.0, 2.5, 10.0, symbol="BTC/USD", timeframe="1m")
+    assert OHLCV.from_json(ohlcv.to_json()) == ohlcv